@@ -0,0 +1,105 @@
+"""
+Analog clock canvas benchmark.
+
+Ticks MainWindow's analog clock on a large canvas and reports, per tick,
+the canvas items created and deleted and the time to update and redraw
+the canvas. Two modes are compared:
+
+- in place: update_analog_clock() moves the three existing hands
+- full redraw: draw_clock_face() before every tick, which deletes and
+  recreates every item the way the clock used to each second
+
+The clock methods are MainWindow's own, run on a bare Tk root so no
+database or network is involved. The app clock is a stopped
+core.VirtualClock advanced one second per tick, so the hands move.
+
+Needs a display; on Linux without $DISPLAY an Xvfb server is started
+if one is installed.
+
+Usage:
+    python benchmarks/clock_canvas_benchmark.py [--size 1080] [--ticks 600]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+
+from startup_benchmark import ensure_display
+
+
+def make_clock_host(size):
+    """A Tk root carrying MainWindow's clock widgets and methods."""
+    import tkinter as tk
+    from src.gui import MainWindow, TkScheduler
+
+    class ClockHost:
+        PRIMARY_COLOR = MainWindow.PRIMARY_COLOR
+        CLOCK_HANDS = MainWindow.CLOCK_HANDS
+        draw_clock_face = MainWindow.draw_clock_face
+        update_analog_clock = MainWindow.update_analog_clock
+
+    root = tk.Tk()
+    host = ClockHost()
+    host.scheduler = TkScheduler(root)
+    host.analog_canvas_size = size
+    host.analog_clock = tk.Canvas(root, width=size, height=size, bg=MainWindow.BG_COLOR, highlightthickness=0)
+    host.analog_clock.pack()
+    host.clock_label = tk.Label(root, text="")
+    host.clock_label.pack()
+    host.draw_clock_face()
+    root.update()
+    return root, host
+
+
+def bench(root, host, clock, ticks, full_redraw):
+    """(items created per tick, items deleted per tick, tick times in ms)."""
+    canvas = host.analog_clock
+    created = deleted = 0
+    times = []
+    for _ in range(ticks):
+        clock.advance(1)
+        before = canvas.find_all()
+        start = time.perf_counter()
+        if full_redraw:
+            host.draw_clock_face()
+        host.update_analog_clock()
+        root.update_idletasks()  # Redraw the canvas
+        times.append((time.perf_counter() - start) * 1000)
+        after = canvas.find_all()
+        created += len(set(after) - set(before))
+        deleted += len(set(before) - set(after))
+        host.scheduler.cancel("analog_clock")
+    return created / ticks, deleted / ticks, times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--size", type=int, default=1080, help="Canvas size in pixels")
+    parser.add_argument("--ticks", type=int, default=600)
+    args = parser.parse_args()
+
+    try:
+        xvfb = ensure_display()
+    except RuntimeError as e:
+        sys.exit(f"Clock benchmark skipped: {e}")
+
+    from src import core
+
+    clock = core.VirtualClock()
+    core.set_clock(clock)
+    try:
+        root, host = make_clock_host(args.size)
+        for label, full_redraw in (("full redraw", True), ("in place", False)):
+            created, deleted, times = bench(root, host, clock, args.ticks, full_redraw)
+            print(f"{label:<12}  {created:5.1f} created/tick  {deleted:5.1f} deleted/tick  "
+                  f"median {statistics.median(times):.3f} ms  max {max(times):.3f} ms")
+        root.destroy()
+    finally:
+        core.set_clock(None)
+        if xvfb is not None:
+            xvfb.terminate()
+
+
+if __name__ == "__main__":
+    main()
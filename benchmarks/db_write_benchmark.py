@@ -0,0 +1,82 @@
+"""
+Write benchmark for prayer time prefetches.
+
+Stores --days days for one city in a file-backed WAL database, first
+with one transaction per day (how range fetches used to write) and then
+with a single store_prayer_times_many call, and reports the number of
+write transactions and the wall time of each (best of --runs, each run
+on a fresh database file).
+
+Usage:
+    python benchmarks/db_write_benchmark.py [--days 30] [--runs 5]
+"""
+
+import argparse
+import datetime
+import tempfile
+import time
+from pathlib import Path
+
+from startup_benchmark import synthetic_times, use_database
+
+
+def count_write_transactions(manager):
+    """Count get_cursor(write=True) blocks on manager; returns the counter dict."""
+    counter = {"writes": 0}
+    get_cursor = manager.get_cursor
+
+    def counting_get_cursor(write=False):
+        counter["writes"] += bool(write)
+        return get_cursor(write)
+
+    manager.get_cursor = counting_get_cursor
+    return counter
+
+
+def store_per_day(core, records):
+    for record in records:
+        core.store_prayer_times_many([record])
+
+
+def store_batched(core, records):
+    core.store_prayer_times_many(records)
+
+
+def bench(core, store, records, runs, tmp_dir):
+    """(write transactions, best wall ms) of store(core, records)."""
+    best, writes = None, 0
+    for run in range(runs):
+        use_database(tmp_dir / f"{store.__name__}_{run}.db")
+        counter = count_write_transactions(core._db_manager)
+        start = time.perf_counter()
+        try:
+            store(core, records)
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            del core._db_manager.get_cursor
+        best = elapsed if best is None else min(best, elapsed)
+        writes = counter["writes"]
+    core._db_manager.close()
+    return writes, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    from src import core
+
+    start = datetime.date.today()
+    days = [start + datetime.timedelta(days=i) for i in range(args.days)]
+    records = [(day, core.gregorian_to_hijri(day), "Chicago", "USA", synthetic_times(day)) for day in days]
+
+    with tempfile.TemporaryDirectory(prefix="prayer_bench_") as tmp:
+        for label, store in (("per-day transactions", store_per_day), ("store_prayer_times_many", store_batched)):
+            writes, best_ms = bench(core, store, records, args.runs, Path(tmp))
+            print(f"{label:<24}  {writes:>4} transactions  {best_ms:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
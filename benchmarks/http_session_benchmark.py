@@ -0,0 +1,83 @@
+"""
+HTTP connection reuse benchmark.
+
+Sends --requests sequential GETs to the local stub server, first with a
+bare requests.get per call (a new connection each time) and then through
+core.get_http_session(), and reports the time per request and the
+number of connections the server accepted for each.
+
+With --tls the stub serves HTTPS with a throwaway self-signed
+certificate (made with the openssl command), so the handshake saving
+includes TLS.
+
+Usage:
+    python benchmarks/http_session_benchmark.py [--requests 200] [--tls]
+"""
+
+import argparse
+import shutil
+import ssl
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import requests
+import urllib3
+
+from startup_benchmark import StubHandler, start_stub_server
+
+
+def make_tls_context(tmp_dir):
+    """Server SSL context with a new self-signed certificate."""
+    openssl = shutil.which("openssl")
+    if openssl is None:
+        sys.exit("--tls needs the openssl command")
+    cert, key = tmp_dir / "cert.pem", tmp_dir / "key.pem"
+    subprocess.run([openssl, "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+                    "-subj", "/CN=127.0.0.1", "-keyout", str(key), "-out", str(cert)],
+                   check=True, capture_output=True)
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert, key)
+    return context
+
+
+def bench(get, url, count):
+    """(ms per request, connections accepted) for count calls of get(url)."""
+    StubHandler.connections = 0
+    start = time.perf_counter()
+    for _ in range(count):
+        get(url).raise_for_status()
+    elapsed = time.perf_counter() - start
+    return elapsed * 1000 / count, StubHandler.connections
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--tls", action="store_true", help="Serve HTTPS with a self-signed certificate")
+    args = parser.parse_args()
+
+    from src import core
+
+    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+    with tempfile.TemporaryDirectory(prefix="prayer_bench_") as tmp:
+        server = start_stub_server(make_tls_context(Path(tmp)) if args.tls else None)
+        scheme = "https" if args.tls else "http"
+        url = f"{scheme}://127.0.0.1:{server.server_port}/v1/forecast"
+        session = core.get_http_session()
+        try:
+            for label, get in (
+                ("bare requests.get", lambda u: requests.get(u, timeout=5, verify=False)),
+                ("shared session", lambda u: session.get(u, verify=False)),
+            ):
+                ms, connections = bench(get, url, args.requests)
+                print(f"{label:<18}  {ms:7.2f} ms/request  {connections:>4} connections")
+        finally:
+            core.close_http_sessions()
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
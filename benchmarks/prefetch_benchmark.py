@@ -0,0 +1,80 @@
+"""
+Multi-location prefetch warm-up benchmark.
+
+Warms N locations twice, once with one ensure_future_data call per
+location and once with a single ensure_future_data_many call, each on
+a fresh database:
+
+- local: built-in cities, computed by the local engine (--days days)
+- API: unknown cities, fetched from the stub server with --latency
+  seconds per request, through the shared rate limiter
+
+Usage:
+    python benchmarks/prefetch_benchmark.py [--local-cities 82] [--days 365]
+        [--api-cities 6] [--latency 1.0]
+"""
+
+import argparse
+import datetime
+import tempfile
+import time
+from pathlib import Path
+
+from startup_benchmark import StubHandler, start_stub_server, use_database, use_stub_server
+
+
+def warm_sequential(core, locations, days, start):
+    for city, country in locations:
+        core.ensure_future_data(city, country, days=days, start_date=start)
+
+
+def warm_many(core, locations, days, start):
+    core.ensure_future_data_many(locations, days=days, start_date=start)
+
+
+def bench(core, locations, days, start, tmp_dir, label):
+    """Seconds each warm-up strategy takes on a fresh database."""
+    for name, warm in (("one call per location", warm_sequential), ("ensure_future_data_many", warm_many)):
+        use_database(tmp_dir / f"{label}_{warm.__name__}.db")
+        # Start with a full rate limiter bucket
+        time.sleep(core.API_RATE_LIMIT_BURST / core.API_RATE_LIMIT_PER_SECOND)
+        requests_before = StubHandler.requests_served
+        elapsed = time.perf_counter()
+        warm(core, locations, days, start)
+        elapsed = time.perf_counter() - elapsed
+        print(f"{label:<6} {len(locations):>3} locations  {name:<24} {elapsed:7.2f} s"
+              f"  {StubHandler.requests_served - requests_before:>3} API requests")
+    core._db_manager.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--local-cities", type=int, default=82, help="Built-in US cities to compute")
+    parser.add_argument("--days", type=int, default=365, help="Days computed per local city")
+    parser.add_argument("--api-cities", type=int, default=6, help="Unknown cities to fetch from the stub API")
+    parser.add_argument("--latency", type=float, default=1.0, help="Stub API response delay in seconds")
+    args = parser.parse_args()
+
+    from src import core
+
+    # A whole calendar month per API city, so each needs one request
+    today = datetime.date.today()
+    next_month = (today.replace(day=1) + datetime.timedelta(days=32)).replace(day=1)
+    StubHandler.latency = args.latency
+    server = start_stub_server()
+    use_stub_server(server)
+    try:
+        with tempfile.TemporaryDirectory(prefix="prayer_bench_") as tmp:
+            local = [(city, "USA") for city in list(core.CITY_COORDINATES["USA"])[:args.local_cities]]
+            if local:
+                bench(core, local, args.days, today, Path(tmp), "local")
+            remote = [(f"Benchtown {i}", "USA") for i in range(args.api_cities)]
+            if remote:
+                bench(core, remote, 28, next_month, Path(tmp), "API")
+    finally:
+        core.close_http_sessions()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,441 @@
+"""
+Startup and steady-state benchmark for the Prayer App.
+
+Runs MainWindow against a seeded prayer_times database in a temporary
+directory, with every HTTP endpoint (Aladhan, Open-Meteo, Nominatim)
+pointed at a local stub server, and reports:
+
+- import time of src.gui (fresh interpreter, best and median of N runs)
+- time to first paint and to the first rendered prayer times
+- steady-state CPU: time spent in Tk scheduler callbacks and total
+  process CPU per second of wall time
+- memory (RSS and live object count) before and after simulated days
+- with --simulate-days, the cost of running the app for that many days
+  on a step-driven core.VirtualClock: every scheduler job (alerts,
+  midnight rollovers, prefetches, weather) fires at its simulated time
+  and the clock jumps straight to the next one
+
+Needs a display for Tk. On Linux without $DISPLAY an Xvfb server is
+started if one is installed. Audio uses SDL's dummy driver.
+
+Usage:
+    python benchmarks/startup_benchmark.py [--seconds 10] [--days 30]
+        [--location "Chicago,USA"] [--json results.json]
+        [--baseline results.json --tolerance 0.2]
+        [--simulate-days 365 --profile simulation.prof]
+
+With --baseline, exits with status 1 when any metric is more than
+--tolerance (a fraction) worse than the baseline's.
+"""
+
+import argparse
+import cProfile
+import datetime
+import gc
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+# Metrics where a higher value is a regression (all of them, currently)
+METRICS = [
+    "import_ms", "construct_ms", "first_paint_ms", "first_data_ms",
+    "tk_callbacks_ms_per_s", "process_cpu_ms_per_s",
+    "rss_growth_kb_per_day", "objects_growth_per_day", "sim_ms_per_day",
+]
+
+# Synthetic prayer times (minutes since midnight), drifting a little per day
+BASE_TIMES = {"Fajr": 320, "Dhuhr": 755, "Asr": 960, "Maghrib": 1150, "Isha": 1240}
+
+
+def synthetic_times(day):
+    drift = day.toordinal() % 30
+    return {prayer: f"{(m + drift) // 60:02d}:{(m + drift) % 60:02d}" for prayer, m in BASE_TIMES.items()}
+
+
+# =====================================================================
+# STUB HTTP SERVER
+# =====================================================================
+
+def _day_payload(day, hijri_date):
+    return {
+        "timings": {prayer: f"{t} (UTC)" for prayer, t in synthetic_times(day).items()},
+        "date": {
+            "gregorian": {"date": day.strftime("%d-%m-%Y")},
+            "hijri": {"date": hijri_date},
+        },
+    }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers the app's Aladhan, Open-Meteo and Nominatim requests."""
+
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real APIs
+    disable_nagle_algorithm = True  # Headers and body are separate writes
+    latency = 0.0  # Seconds added to every prayer times response
+    requests_served = 0
+    connections = 0
+
+    def setup(self):
+        type(self).connections += 1
+        super().setup()
+
+    def do_GET(self):
+        from src import core
+
+        url = urlsplit(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if url.path.startswith("/v1/calendarByCity/from/"):
+            parts = url.path.split("/")
+            start = datetime.datetime.strptime(parts[4], "%d-%m-%Y").date()
+            end = datetime.datetime.strptime(parts[6], "%d-%m-%Y").date()
+            days = [start + datetime.timedelta(days=i) for i in range((end - start).days + 1)]
+            body = {"code": 200, "data": [_day_payload(d, core.gregorian_to_hijri(d)) for d in days]}
+            time.sleep(self.latency)
+        elif url.path == "/v1/timingsByCity":
+            day = datetime.datetime.strptime(query["date"], "%d-%m-%Y").date()
+            body = {"code": 200, "data": _day_payload(day, core.gregorian_to_hijri(day))}
+            time.sleep(self.latency)
+        elif url.path == "/search":
+            body = [{"lat": "41.88", "lon": "-87.63"}]
+        elif url.path == "/v1/forecast":
+            body = {
+                "timezone": "UTC",
+                "current": {"temperature_2m": 60.0, "relative_humidity_2m": 50, "wind_speed_10m": 5.0},
+                "daily": {"temperature_2m_max": [70.0], "temperature_2m_min": [50.0]},
+            }
+        else:
+            self.send_error(404)
+            return
+        payload = json.dumps(body).encode()
+        type(self).requests_served += 1
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(ssl_context=None):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    if ssl_context is not None:
+        server.socket = ssl_context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, name="stub-http", daemon=True).start()
+    return server
+
+
+# =====================================================================
+# ENVIRONMENT
+# =====================================================================
+
+def ensure_display():
+    """Make sure Tk has a display; returns an Xvfb process to stop, if any.
+
+    Raises:
+        RuntimeError: If there is no display and Xvfb is not available
+    """
+    if not sys.platform.startswith("linux") or os.environ.get("DISPLAY"):
+        return None
+    xvfb = shutil.which("Xvfb")
+    if xvfb is None:
+        raise RuntimeError("No $DISPLAY and Xvfb is not installed; the GUI benchmark needs a display")
+    display = ":97"
+    proc = subprocess.Popen([xvfb, display, "-screen", "0", "1280x800x24", "-nolisten", "tcp"],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    os.environ["DISPLAY"] = display
+    time.sleep(0.5)
+    return proc
+
+
+def use_database(path):
+    """Point core at a fresh database file (closing any pooled connections)."""
+    from src import core
+
+    core._db_manager.close()
+    core._day_cache.clear()
+    core.DB_PATH = str(path)
+    core.init_db()
+
+
+def use_stub_server(server):
+    """Point every core API URL at the stub server."""
+    from src import core
+
+    base = f"http://127.0.0.1:{server.server_port}"
+    core.API_URL_SINGLE = f"{base}/v1/timingsByCity"
+    core.API_URL_CALENDAR = f"{base}/v1/calendarByCity"
+    core.WEATHER_API_URL = f"{base}/v1/forecast"
+    core.GEOCODING_API_URL = f"{base}/search"
+
+
+def prepare_app_environment(tmp_dir, server, city, country, days):
+    """Point core at a seeded database, test settings and the stub server."""
+    from src import core
+
+    use_stub_server(server)
+
+    core.SETTINGS_FILE = tmp_dir / "settings.json"
+    core.COOLDOWN_FILE = tmp_dir / "update_cooldown"
+    core.COOLDOWN_FILE.touch()  # Skips the git update check
+
+    core.SETTINGS_FILE.write_text(json.dumps({
+        "country": country, "city": city, "volume": 0.0,
+        "window_state": "windowed", "start_minimized": False, "show_weather": True,
+    }))
+
+    use_database(tmp_dir / "prayer_times.db")
+    today = datetime.date.today()
+    seed = [today + datetime.timedelta(days=i) for i in range(-1, days + 3)]
+    core.store_prayer_times_many(
+        [(day, core.gregorian_to_hijri(day), city, country, synthetic_times(day)) for day in seed]
+    )
+
+
+def rss_kb():
+    """Resident set size of this process in KB."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+# =====================================================================
+# BENCHMARKS
+# =====================================================================
+
+def bench_import(runs):
+    code = "import time; t = time.perf_counter(); import src.gui; print((time.perf_counter() - t) * 1000)"
+    times = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, env=os.environ,
+                             capture_output=True, text=True, check=True).stdout
+        times.append(float(out.strip().splitlines()[-1]))
+    return min(times), statistics.median(times)
+
+
+def pump(app, seconds):
+    """Run the Tk main loop for a while."""
+    app.after(int(seconds * 1000), app.quit)
+    app.mainloop()
+
+
+def bench_gui(seconds, days):
+    from src import core
+    from src.gui import MainWindow
+
+    results = {}
+    start = time.perf_counter()
+    core.start_startup_timer(start)
+    core.mark_startup("import")
+    app = MainWindow()
+    results["construct_ms"] = (time.perf_counter() - start) * 1000
+
+    deadline = time.perf_counter() + 30
+    report = core.get_startup_report()
+    while not {"first_paint", "first_data"} <= report.keys() and time.perf_counter() < deadline:
+        app.update()
+        report = core.get_startup_report()
+    results["first_paint_ms"] = report.get("first_paint")
+    results["first_data_ms"] = report.get("first_data")
+
+    # Let the background stage (audio, prefetch, weather) settle
+    pump(app, 2)
+
+    # Steady state: time every scheduler dispatch on the Tk thread
+    dispatch = {"seconds": 0.0, "calls": 0}
+    run_due = app.scheduler._run_due
+
+    def timed_run_due():
+        t = time.perf_counter()
+        try:
+            run_due()
+        finally:
+            dispatch["seconds"] += time.perf_counter() - t
+            dispatch["calls"] += 1
+
+    app.scheduler._run_due = timed_run_due
+    cpu, wall = time.process_time(), time.perf_counter()
+    pump(app, seconds)
+    wall = time.perf_counter() - wall
+    results["tk_callbacks_ms_per_s"] = dispatch["seconds"] * 1000 / wall
+    results["process_cpu_ms_per_s"] = (time.process_time() - cpu) * 1000 / wall
+    results["tk_callbacks_per_s"] = dispatch["calls"] / wall
+
+    # Simulated days: roll the frame over to each following day
+    gc.collect()
+    rss_start, objects_start = rss_kb(), len(gc.get_objects())
+    for day_number in range(1, days + 1):
+        core.TIME_OFFSET = {"hours": 24 * day_number, "minutes": 0}
+        day = core.get_current_time_with_offset().date()
+        app.prayer_frame.reset_alerts(day)
+        app.update_hijri_date_from_db()
+        app.update_analog_clock()
+        pump(app, 0.05)
+    core.TIME_OFFSET = {"hours": 0, "minutes": 0}
+    gc.collect()
+    results["rss_start_kb"] = rss_start
+    results["rss_growth_kb_per_day"] = (rss_kb() - rss_start) / days
+    results["objects_growth_per_day"] = (len(gc.get_objects()) - objects_start) / days
+
+    app.destroy()
+    core.close_http_sessions()
+    return results
+
+
+def bench_simulation(sim_days, profile_path=None):
+    """Run a fresh MainWindow for sim_days of virtual time."""
+    from src import core
+    from src.gui import MainWindow
+
+    clock = core.VirtualClock()
+    core.set_clock(clock)
+    app = MainWindow()
+    app.update()  # Background stage
+
+    counts = {"events": 0, "alerts": 0, "rollovers": 0, "ensure_calls": 0}
+    frame = app.prayer_frame
+    alert_user, reset_alerts = frame.alert_user, frame.reset_alerts
+    ensure_future_data = core.ensure_future_data
+
+    def counted_alert(*args, **kwargs):
+        counts["alerts"] += 1
+        return alert_user(*args, **kwargs)
+
+    def counted_reset(*args, **kwargs):
+        rolled = reset_alerts(*args, **kwargs)
+        counts["rollovers"] += bool(rolled)
+        return rolled
+
+    def counted_ensure(*args, **kwargs):
+        counts["ensure_calls"] += 1
+        return ensure_future_data(*args, **kwargs)
+
+    frame.alert_user, frame.reset_alerts = counted_alert, counted_reset
+    core.ensure_future_data = counted_ensure
+
+    # Per-second display jobs would dominate; they are measured by bench_gui
+    display_jobs = ("analog_clock", "countdown", "auto_restart")
+    end = clock.now() + datetime.timedelta(days=sim_days)
+    profiler = cProfile.Profile() if profile_path else None
+    wall = time.perf_counter()
+    if profiler:
+        profiler.enable()
+    try:
+        while clock.now() < end:
+            for name in display_jobs:
+                app.scheduler.cancel(name)
+            due = app.scheduler.next_due()
+            if due is None:
+                break
+            clock.advance(max(0.0, due - clock.monotonic()))
+            app.scheduler.run_due()
+            counts["events"] += 1
+            # Worker results arrive through the "worker_poll" job, which waits
+            # for the worker under the stopped clock; this only lets Tk redraw
+            if counts["events"] % 500 == 0:
+                app.update()
+        app.update()
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(profile_path)
+        wall = time.perf_counter() - wall
+        core.ensure_future_data = ensure_future_data
+        app.destroy()
+        core.set_clock(None)
+
+    results = {f"sim_{name}": value for name, value in counts.items()}
+    results["sim_wall_s"] = wall
+    results["sim_ms_per_day"] = wall * 1000 / sim_days
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Return (metric, baseline, current) for every regressed metric."""
+    regressions = []
+    for metric in METRICS:
+        old, new = baseline.get(metric), results.get(metric)
+        if old is None or new is None:
+            continue
+        # Growth metrics hover around zero; allow one unit of noise
+        limit = old * (1 + tolerance) if old > 1 else old + 1
+        if new > limit:
+            regressions.append((metric, old, new))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--import-runs", type=int, default=5)
+    parser.add_argument("--seconds", type=float, default=10, help="Steady-state measurement length")
+    parser.add_argument("--days", type=int, default=30, help="Simulated days for the memory check")
+    parser.add_argument("--location", default="Chicago,USA", help='"City,Country" to display')
+    parser.add_argument("--json", help="Write results to this file")
+    parser.add_argument("--baseline", help="Results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--simulate-days", type=int, default=0,
+                        help="Also run the app for this many days of virtual time")
+    parser.add_argument("--profile", help="Write cProfile stats of the simulation to this file")
+    args = parser.parse_args()
+    city, country = (part.strip() for part in args.location.split(","))
+
+    results = {}
+    results["import_ms"], results["import_median_ms"] = bench_import(args.import_runs)
+
+    try:
+        xvfb = ensure_display()
+    except RuntimeError as e:
+        print(f"GUI benchmark skipped: {e}", file=sys.stderr)
+    else:
+        server = start_stub_server()
+        try:
+            with tempfile.TemporaryDirectory(prefix="prayer_bench_") as tmp:
+                prepare_app_environment(Path(tmp), server, city, country, args.days)
+                results.update(bench_gui(args.seconds, args.days))
+                if args.simulate_days:
+                    results.update(bench_simulation(args.simulate_days, args.profile))
+                from src import core
+                core._db_manager.close()
+        finally:
+            server.shutdown()
+            if xvfb is not None:
+                xvfb.terminate()
+        results["stub_requests"] = StubHandler.requests_served
+
+    width = max(map(len, results))
+    for metric, value in results.items():
+        print(f"{metric:<{width}}  {value:.2f}" if isinstance(value, float) else f"{metric:<{width}}  {value}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+    if args.baseline:
+        regressions = compare(results, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        for metric, old, new in regressions:
+            print(f"REGRESSION {metric}: {old:.2f} -> {new:.2f}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
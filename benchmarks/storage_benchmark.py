@@ -0,0 +1,101 @@
+"""
+Storage layout benchmark: one row per day vs packed month BLOBs.
+
+For each DB_STORAGE_LAYOUT it stores --days days for --locations cities
+in a fresh file-backed database and reports:
+
+- store time of a single store_prayer_times_many call
+- database file size after a checkpoint and VACUUM
+- latency of a --days get_prayer_times_range_from_db query
+- latency of a single-day get_prayer_times_from_db cache miss
+
+Times are the best of --runs (the single-day figure is the mean over
+every stored day of one city, with the day cache cleared before each).
+
+Usage:
+    python benchmarks/storage_benchmark.py [--days 365] [--locations 4] [--runs 5]
+"""
+
+import argparse
+import datetime
+import os
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+from startup_benchmark import synthetic_times, use_database
+
+CITIES = [("Chicago", "USA"), ("London", "UK"), ("Cairo", "Egypt"), ("Jakarta", "Indonesia"),
+          ("Istanbul", "Turkey"), ("Karachi", "Pakistan"), ("Toronto", "Canada"), ("Sydney", "Australia")]
+
+
+def best_ms(func, runs):
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_layout(core, layout, records, locations, days, runs, tmp_dir):
+    """(store ms, size bytes, range ms, single-day µs) for one layout."""
+    core.DB_STORAGE_LAYOUT = layout
+    store_ms = None
+    for run in range(runs):
+        path = tmp_dir / f"{layout}_{run}.db"
+        use_database(path)
+        start = time.perf_counter()
+        core.store_prayer_times_many(records)
+        elapsed = (time.perf_counter() - start) * 1000
+        store_ms = elapsed if store_ms is None else min(store_ms, elapsed)
+
+    first, last = days[0], days[-1]
+    city, country = locations[0]
+    range_ms = best_ms(lambda: core.get_prayer_times_range_from_db(first, last, city, country), runs)
+
+    def single_days():
+        for day in days:
+            core._day_cache.clear()
+            core.get_prayer_times_from_db(day, city, country)
+
+    single_us = best_ms(single_days, runs) * 1000 / len(days)
+
+    core._db_manager.close()
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+    return store_ms, os.path.getsize(path), range_ms, single_us
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--locations", type=int, default=4, choices=range(1, len(CITIES) + 1))
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    from src import core
+
+    start = datetime.date.today()
+    days = [start + datetime.timedelta(days=i) for i in range(args.days)]
+    locations = CITIES[:args.locations]
+    records = [(day, core.gregorian_to_hijri(day), city, country, synthetic_times(day))
+               for city, country in locations for day in days]
+
+    print(f"{args.locations} locations x {args.days} days = {len(records)} records")
+    print(f"{'layout':<8}  {'store':>10}  {'size':>9}  {'range query':>12}  {'single day':>11}")
+    with tempfile.TemporaryDirectory(prefix="prayer_bench_") as tmp:
+        for layout in ("rows", "packed"):
+            store_ms, size, range_ms, single_us = bench_layout(
+                core, layout, records, locations, days, args.runs, Path(tmp))
+            print(f"{layout:<8}  {store_ms:7.2f} ms  {size / 1024:6.0f} KB  {range_ms:9.2f} ms  {single_us:8.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
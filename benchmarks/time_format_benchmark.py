@@ -0,0 +1,94 @@
+"""
+Time normalization and formatting micro-benchmark over a year of data.
+
+For one city and --days days of computed prayer times it times, best of
+--runs:
+
+- ingest: clean_timezone_suffix + convert_to_24hr per API timing string
+  (the old path) against normalize_times to minutes since midnight
+- 12h display: strptime/strftime("%I:%M %p") per time (the old path)
+  against format_time_12h, with a cold and a warm cache
+- compute_prayer_times_range for the whole period
+
+Usage:
+    python benchmarks/time_format_benchmark.py [--days 365] [--runs 5]
+"""
+
+import argparse
+import datetime
+import tempfile
+import time
+from pathlib import Path
+
+from startup_benchmark import use_database
+
+
+def best_ms(func, runs, setup=None):
+    best = None
+    for _ in range(runs):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    from src import core
+
+    with tempfile.TemporaryDirectory(prefix="prayer_bench_") as tmp:
+        use_database(Path(tmp) / "prayer_times.db")
+        try:
+            report(core, args)
+        finally:
+            core._db_manager.close()
+
+
+def report(core, args):
+    start = datetime.date.today()
+    records = core.compute_prayer_times_range([("Chicago", "USA")], start, args.days)
+    minutes = [record[4][prayer] for record in records for prayer in core.PRAYER_NAMES]
+    times_24h = [core.format_time_24h(m) for m in minutes]
+    api_days = [{prayer: f"{core.format_time_24h(record[4][prayer])} (CST)" for prayer in core.PRAYER_NAMES}
+                for record in records]
+
+    def ingest_old():
+        for day in api_days:
+            for prayer in core.PRAYER_NAMES:
+                core.convert_to_24hr(core.clean_timezone_suffix(day[prayer]))
+
+    def ingest_new():
+        for day in api_days:
+            core.normalize_times(day)
+
+    def format_old():
+        for t in times_24h:
+            datetime.datetime.strptime(t, "%H:%M").strftime("%I:%M %p")
+
+    def format_new():
+        for m in minutes:
+            core.format_time_12h(m)
+
+    rows = [
+        ("ingest, suffix + convert_to_24hr", best_ms(ingest_old, args.runs)),
+        ("ingest, normalize_times", best_ms(ingest_new, args.runs)),
+        ("12h, strptime/strftime", best_ms(format_old, args.runs)),
+        ("12h, format_time_12h (cold cache)", best_ms(format_new, args.runs, core.format_time_12h.cache_clear)),
+        ("12h, format_time_12h (warm cache)", best_ms(format_new, args.runs)),
+        ("compute_prayer_times_range", best_ms(
+            lambda: core.compute_prayer_times_range([("Chicago", "USA")], start, args.days), args.runs)),
+    ]
+    print(f"{len(records)} days, {len(minutes)} times")
+    for label, ms in rows:
+        print(f"{label:<34}  {ms:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
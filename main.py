@@ -1,16 +1,20 @@
-import sys
+import time
+_start = time.perf_counter()
+
 import src.core as core
 from src.gui import MainWindow
 
 if __name__ == "__main__":
     # Initialize logging
     core.setup_logging()
-    
-    # Check for updates (Linux/Pi specific)
-    # If an update is found, this will trigger the .sh script and we should exit
-    if core.check_for_updates():
-        print("Update triggered. Restarting...")
-        sys.exit(0)
+    core.start_startup_timer(_start)
+    core.mark_startup("import")
 
+    # The update check (Linux/Pi specific) runs in the background once the
+    # window is up; the app quits if it triggers the update script
     app = MainWindow()
-    app.mainloop()
\ No newline at end of file
+    app.mainloop()
+    core.stop_prefetch()
+    core.close_http_sessions()
+    if app.update_triggered:
+        print("Update triggered. Restarting...")
\ No newline at end of file
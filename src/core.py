@@ -5,6 +5,8 @@ Combines configuration, database, API, and helper functions.
 
 import sqlite3
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import logging
 import logging.handlers
 import time
@@ -12,10 +14,26 @@ import os
 import subprocess
 import platform
 import threading
+import queue
+import bisect
+import struct
+import math
+import random
 from pathlib import Path
 from contextlib import contextmanager
+from collections import OrderedDict
 from datetime import datetime, timedelta, date
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 import re
+import json
+import functools
+import codecs
+from urllib.parse import urlsplit
+
+try:
+    import numpy as np
+except ImportError:  # Batch calculation falls back to the scalar engine
+    np = None
 
 
 # =====================================================================
@@ -31,6 +49,14 @@ DATA_DIR.mkdir(parents=True, exist_ok=True)
 LOGS_DIR.mkdir(parents=True, exist_ok=True)
 
 DB_PATH = str(DATA_DIR / "prayer_times.db")
+DB_POOL_SIZE = 4
+DB_BUSY_TIMEOUT_MS = 5000
+DB_CACHE_SIZE_KB = 4096
+DB_MMAP_SIZE = 32 * 1024 * 1024
+DAY_CACHE_SIZE = 32  # Decoded day records kept in memory (LRU)
+# Prayer time storage: "rows" (one row per day) or "packed" (one BLOB per
+# location and month); init_db converts existing data to the chosen layout
+DB_STORAGE_LAYOUT = "rows"
 SETTINGS_FILE = DATA_DIR / "settings.json"
 LOG_FILE_PATH = LOGS_DIR / 'prayer_app.log'
 
@@ -61,21 +87,171 @@ API_CALCULATION_METHODS = {
 
 API_SCHOOLS = {0: "Shafi (Standard)", 1: "Hanafi"}
 
+# Twilight parameters for the local calculation engine, keyed like API_CALCULATION_METHODS.
+# Angles are degrees below the horizon; "isha_minutes" is a fixed interval after Maghrib.
+CALCULATION_METHOD_PARAMS = {
+    0: {"fajr": 16, "isha": 14, "maghrib": 4},
+    1: {"fajr": 18, "isha": 18},
+    2: {"fajr": 15, "isha": 15},
+    3: {"fajr": 18, "isha": 17},
+    4: {"fajr": 18.5, "isha_minutes": 90},
+    5: {"fajr": 19.5, "isha": 17.5},
+    7: {"fajr": 17.7, "isha": 14, "maghrib": 4.5},
+    8: {"fajr": 19.5, "isha_minutes": 90},
+    9: {"fajr": 18, "isha": 17.5},
+    10: {"fajr": 18, "isha_minutes": 90},
+    11: {"fajr": 20, "isha": 18},
+    12: {"fajr": 12, "isha": 12},
+    13: {"fajr": 18, "isha": 17},
+    14: {"fajr": 16, "isha": 15},
+    15: {"fajr": 18, "isha": 18},
+    16: {"fajr": 18.2, "isha": 18.2},
+    17: {"fajr": 20, "isha": 18},
+    18: {"fajr": 18, "isha": 18},
+    19: {"fajr": 18, "isha": 17},
+    20: {"fajr": 20, "isha": 18},
+    21: {"fajr": 19, "isha": 17},
+    22: {"fajr": 18, "isha_minutes": 77},
+    23: {"fajr": 18, "isha": 18},
+}
+
+# Asr shadow length factor per API_SCHOOLS entry
+ASR_SHADOW_FACTORS = {0: 1, 1: 2}
+
 API_METHOD = 2
 API_SCHOOL = 1
 API_TIMEOUT = 10
 API_MAX_RETRIES = 3
 API_BACKOFF_BASE = 2
 
+# Shared HTTP session: keep-alive connection pool with urllib3-level retries
+HTTP_USER_AGENT = "PrayerApp/1.0"
+HTTP_POOL_CONNECTIONS = 4  # Hosts kept in the pool
+HTTP_POOL_MAXSIZE = 4  # Keep-alive connections per host
+HTTP_CONNECT_TIMEOUT = 3.05
+HTTP_RETRY_STATUSES = (500, 502, 503, 504)  # 429 is surfaced as PrayerAPIRateLimit instead
+
+# Shared limit for prayer times API requests across all threads
+API_RATE_LIMIT_PER_SECOND = 2
+API_RATE_LIMIT_BURST = 4
+API_RATE_LIMIT_COOLDOWN = 30  # Seconds requests are refused after a 429 without Retry-After
+API_BACKOFF_JITTER = 0.5  # Backoff delays vary randomly by up to this fraction
+API_CIRCUIT_FAILURE_THRESHOLD = 5  # Consecutive failures before API calls are suspended
+API_CIRCUIT_RESET_SECONDS = 60  # First suspension; doubles after each failed trial call
+API_CIRCUIT_MAX_RESET_SECONDS = 3600
+PREFETCH_MAX_WORKERS = 3  # Locations fetched from the API in parallel
+CALENDAR_STREAM_CHUNK_BYTES = 16384  # Calendar responses are parsed as they download
+CALENDAR_BATCH_DAYS = 31  # Parsed days written to the database per transaction
+API_GAP_MERGE_DAYS = 2  # Stored days re-fetched to join two gaps into one request
+
+# Compute prayer times locally when a city's coordinates are known; the API is
+# then only used for unknown cities or as an optional cross-check.
+USE_LOCAL_CALCULATION = True
+API_CROSS_CHECK = False
+CROSS_CHECK_TOLERANCE_MINUTES = 2
+
 # Prayer Times
 PRAYER_NAMES = ["Fajr", "Dhuhr", "Asr", "Maghrib", "Isha"]
-PREFETCH_DAYS = 30
+PREFETCH_DAYS = 365  # Local calculation makes a full year effectively free
+API_PREFETCH_DAYS = 30  # Upper bound for network prefetches
 ALERT_THRESHOLD_SECONDS = 360
 
 # Default Location
 DEFAULT_COUNTRY = "USA"
 DEFAULT_CITY = "Chicago"
 
+# City coordinates for local calculation: {country: {city: (latitude, longitude, timezone)}}
+CITY_COORDINATES = {
+    "UK": {"London": (51.5074, -0.1278, "Europe/London")},
+    "USA": {
+        "New York": (40.7128, -74.0060, "America/New_York"),
+        "Los Angeles": (34.0522, -118.2437, "America/Los_Angeles"),
+        "Chicago": (41.8781, -87.6298, "America/Chicago"),
+        "Houston": (29.7604, -95.3698, "America/Chicago"),
+        "Phoenix": (33.4484, -112.0740, "America/Phoenix"),
+        "Philadelphia": (39.9526, -75.1652, "America/New_York"),
+        "San Antonio": (29.4241, -98.4936, "America/Chicago"),
+        "San Diego": (32.7157, -117.1611, "America/Los_Angeles"),
+        "Dallas": (32.7767, -96.7970, "America/Chicago"),
+        "San Jose": (37.3382, -121.8863, "America/Los_Angeles"),
+        "Austin": (30.2672, -97.7431, "America/Chicago"),
+        "Jacksonville": (30.3322, -81.6557, "America/New_York"),
+        "Fort Worth": (32.7555, -97.3308, "America/Chicago"),
+        "Columbus": (39.9612, -82.9988, "America/New_York"),
+        "Charlotte": (35.2271, -80.8431, "America/New_York"),
+        "San Francisco": (37.7749, -122.4194, "America/Los_Angeles"),
+        "Indianapolis": (39.7684, -86.1581, "America/Indiana/Indianapolis"),
+        "Seattle": (47.6062, -122.3321, "America/Los_Angeles"),
+        "Denver": (39.7392, -104.9903, "America/Denver"),
+        "Washington D.C.": (38.9072, -77.0369, "America/New_York"),
+        "Boston": (42.3601, -71.0589, "America/New_York"),
+        "El Paso": (31.7619, -106.4850, "America/Denver"),
+        "Nashville": (36.1627, -86.7816, "America/Chicago"),
+        "Detroit": (42.3314, -83.0458, "America/Detroit"),
+        "Oklahoma City": (35.4676, -97.5164, "America/Chicago"),
+        "Portland": (45.5152, -122.6784, "America/Los_Angeles"),
+        "Las Vegas": (36.1699, -115.1398, "America/Los_Angeles"),
+        "Baltimore": (39.2904, -76.6122, "America/New_York"),
+        "Milwaukee": (43.0389, -87.9065, "America/Chicago"),
+        "Albuquerque": (35.0844, -106.6504, "America/Denver"),
+        "Tucson": (32.2226, -110.9747, "America/Phoenix"),
+        "Fresno": (36.7378, -119.7871, "America/Los_Angeles"),
+        "Sacramento": (38.5816, -121.4944, "America/Los_Angeles"),
+        "Long Beach": (33.7701, -118.1937, "America/Los_Angeles"),
+        "Kansas City": (39.0997, -94.5786, "America/Chicago"),
+        "Mesa": (33.4152, -111.8315, "America/Phoenix"),
+        "Virginia Beach": (36.8529, -75.9780, "America/New_York"),
+        "Atlanta": (33.7490, -84.3880, "America/New_York"),
+        "Colorado Springs": (38.8339, -104.8214, "America/Denver"),
+        "Omaha": (41.2565, -95.9345, "America/Chicago"),
+        "Raleigh": (35.7796, -78.6382, "America/New_York"),
+        "Miami": (25.7617, -80.1918, "America/New_York"),
+        "Cleveland": (41.4993, -81.6944, "America/New_York"),
+        "Tulsa": (36.1540, -95.9928, "America/Chicago"),
+        "Oakland": (37.8044, -122.2712, "America/Los_Angeles"),
+        "Minneapolis": (44.9778, -93.2650, "America/Chicago"),
+        "Wichita": (37.6872, -97.3301, "America/Chicago"),
+        "New Orleans": (29.9511, -90.0715, "America/Chicago"),
+        "Arlington": (32.7357, -97.1081, "America/Chicago"),
+        "Bakersfield": (35.3733, -119.0187, "America/Los_Angeles"),
+        "Tampa": (27.9506, -82.4572, "America/New_York"),
+        "Honolulu": (21.3069, -157.8583, "Pacific/Honolulu"),
+        "Anaheim": (33.8366, -117.9143, "America/Los_Angeles"),
+        "Aurora": (39.7294, -104.8319, "America/Denver"),
+        "Santa Ana": (33.7455, -117.8677, "America/Los_Angeles"),
+        "St. Louis": (38.6270, -90.1994, "America/Chicago"),
+        "Riverside": (33.9806, -117.3755, "America/Los_Angeles"),
+        "Corpus Christi": (27.8006, -97.3964, "America/Chicago"),
+        "Lexington": (38.0406, -84.5037, "America/New_York"),
+        "Pittsburgh": (40.4406, -79.9959, "America/New_York"),
+        "Anchorage": (61.2181, -149.9003, "America/Anchorage"),
+        "Stockton": (37.9577, -121.2908, "America/Los_Angeles"),
+        "Cincinnati": (39.1031, -84.5120, "America/New_York"),
+        "Saint Paul": (44.9537, -93.0900, "America/Chicago"),
+        "Greensboro": (36.0726, -79.7920, "America/New_York"),
+        "Lincoln": (40.8136, -96.7026, "America/Chicago"),
+        "Plano": (33.0198, -96.6989, "America/Chicago"),
+        "Henderson": (36.0395, -114.9817, "America/Los_Angeles"),
+        "Buffalo": (42.8864, -78.8784, "America/New_York"),
+        "Fort Wayne": (41.0793, -85.1394, "America/Indiana/Indianapolis"),
+        "Jersey City": (40.7178, -74.0431, "America/New_York"),
+        "Chula Vista": (32.6401, -117.0842, "America/Los_Angeles"),
+        "Orlando": (28.5383, -81.3792, "America/New_York"),
+        "St. Petersburg": (27.7676, -82.6403, "America/New_York"),
+        "Norfolk": (36.8508, -76.2859, "America/New_York"),
+        "Chandler": (33.3062, -111.8413, "America/Phoenix"),
+        "Laredo": (27.5306, -99.4803, "America/Chicago"),
+        "Madison": (43.0731, -89.4012, "America/Chicago"),
+        "Mcallen": (26.2034, -98.2300, "America/Chicago"),
+        "Durham": (35.9940, -78.8986, "America/New_York"),
+        "Lubbock": (33.5779, -101.8552, "America/Chicago"),
+        "Winston-Salem": (36.0999, -80.2442, "America/New_York"),
+    },
+    "Pakistan": {"Karachi": (24.8607, 67.0011, "Asia/Karachi")},
+    "Egypt": {"Cairo": (30.0444, 31.2357, "Africa/Cairo")},
+    "Indonesia": {"Jakarta": (-6.2088, 106.8456, "Asia/Jakarta")},
+}
+
 # UI Configuration
 FONT_SIZES = {
     "Small": {"clock": 85, "prayer_name": 18, "prayer_time": 33, "next_prayer": 32, "date": 40, "weather": 10},
@@ -128,15 +304,29 @@ AUDIO_FILES = {
 }
 
 # Weather Configuration
+WEATHER_API_URL = "https://api.open-meteo.com/v1/forecast"
+GEOCODING_API_URL = "https://nominatim.openstreetmap.org/search"
 WEATHER_TIMEOUT = 10
+IP_LOOKUP_TIMEOUT = 5
+
+# Read timeout per host for the shared HTTP session; others use API_TIMEOUT
+HTTP_HOST_TIMEOUTS = {
+    "api.aladhan.com": API_TIMEOUT,
+    "nominatim.openstreetmap.org": WEATHER_TIMEOUT,
+    "api.open-meteo.com": WEATHER_TIMEOUT,
+    "ipapi.co": IP_LOOKUP_TIMEOUT,
+}
 WEATHER_MORNING_HOUR = 6
 WEATHER_MORNING_WINDOW = 3  # 6-9 AM
 WEATHER_EVENING_HOUR = 18
 WEATHER_EVENING_WINDOW = 3  # 6-9 PM
 
-# Weather cache: {city:country -> (data, timestamp)}
+WEATHER_CACHE_TTL_HOURS = 12  # Older data is still shown but refreshed at once
+WEATHER_CACHE_MAX_STALE_HOURS = 48  # Older data is no longer shown and is evicted
+
+# In-memory front of the weather_cache table: {(city, country) -> (data, fetched_at)}
 _weather_cache = {}
-_weather_fetch_times = {}  # Track fetch times per window
+_weather_cache_lock = threading.Lock()
 
 
 # =====================================================================
@@ -195,143 +385,1529 @@ def get_logger(name):
 logger = get_logger(__name__)
 
 
+# =====================================================================
+# STARTUP TIMING
+# =====================================================================
+
+# Reported in this order once every stage has been marked
+STARTUP_STAGES = ("import", "db_open", "first_paint", "first_data")
+
+_startup_origin = time.perf_counter()
+_startup_marks = {}
+
+
+def start_startup_timer(origin=None):
+    """Restart the startup report, timing stages from origin (a perf_counter())."""
+    global _startup_origin
+    _startup_origin = time.perf_counter() if origin is None else origin
+    _startup_marks.clear()
+
+
+def mark_startup(stage):
+    """Record when a startup stage first completed.
+    
+    The startup report is logged once all STARTUP_STAGES are marked.
+    """
+    if stage in _startup_marks:
+        return
+    _startup_marks[stage] = time.perf_counter()
+    if all(s in _startup_marks for s in STARTUP_STAGES):
+        report = ", ".join(f"{s} {ms:.0f} ms" for s, ms in get_startup_report().items())
+        logger.info(f"⏱️ Startup: {report}")
+
+
+def get_startup_report():
+    """Milliseconds from process start to each marked startup stage."""
+    return {stage: (_startup_marks[stage] - _startup_origin) * 1000
+            for stage in STARTUP_STAGES if stage in _startup_marks}
+
+
+# =====================================================================
+# CLOCK
+# =====================================================================
+
+class SystemClock:
+    """The real clock."""
+
+    def now(self):
+        return datetime.now()
+
+    def today(self):
+        return date.today()
+
+    def timestamp(self):
+        """Seconds since the epoch."""
+        return time.time()
+
+    def monotonic(self):
+        """Seconds for measuring intervals; only differences are meaningful."""
+        return time.monotonic()
+
+    def real_seconds(self, seconds):
+        """Real seconds until `seconds` of clock time have passed (None: never on its own)."""
+        return seconds
+
+
+class VirtualClock:
+    """A simulated clock for tests, benchmarks and long simulations.
+
+    Time starts at `start` (default: now) and runs `speed` times as fast
+    as real time; with speed 0 it only moves through advance() and set(),
+    so a driver can step from one scheduled job to the next.
+    """
+
+    def __init__(self, start=None, speed=0.0):
+        self._lock = threading.Lock()
+        self._start = start or datetime.now()
+        self._elapsed = 0.0  # Clock seconds since _start, as of _real
+        self._real = time.monotonic()
+        self._speed = speed
+
+    def _rebase(self):
+        real = time.monotonic()
+        self._elapsed += (real - self._real) * self._speed
+        self._real = real
+
+    @property
+    def speed(self):
+        return self._speed
+
+    @speed.setter
+    def speed(self, speed):
+        with self._lock:
+            self._rebase()
+            self._speed = speed
+
+    def monotonic(self):
+        with self._lock:
+            return self._elapsed + (time.monotonic() - self._real) * self._speed
+
+    def now(self):
+        return self._start + timedelta(seconds=self.monotonic())
+
+    def today(self):
+        return self.now().date()
+
+    def timestamp(self):
+        return self.now().timestamp()
+
+    def advance(self, seconds):
+        """Move the clock forward by seconds (or a timedelta); it never goes back."""
+        if isinstance(seconds, timedelta):
+            seconds = seconds.total_seconds()
+        with self._lock:
+            self._rebase()
+            self._elapsed += max(0.0, seconds)
+
+    def set(self, when):
+        """Move the clock forward to a datetime."""
+        self.advance((when - self.now()).total_seconds())
+
+    def real_seconds(self, seconds):
+        return seconds / self._speed if self._speed else None
+
+
+_clock = SystemClock()
+
+
+def get_clock():
+    """The clock all app time reads go through (see set_clock)."""
+    return _clock
+
+
+def set_clock(clock=None):
+    """Install a clock, e.g. a VirtualClock; None restores the system clock.
+
+    Install it before creating the UI: pending scheduler jobs keep the
+    deadlines they got from the previous clock.
+    """
+    global _clock
+    _clock = clock or SystemClock()
+
+
 # =====================================================================
 # DATABASE OPERATIONS
 # =====================================================================
 
 class DatabaseManager:
-    """Singleton database connection manager."""
+    """Singleton database manager with a small pool of SQLite connections.
+
+    Each get_cursor() block checks out its own connection, so threads never
+    share a connection mid-transaction. Writes are additionally serialized
+    by a process-wide lock and start with BEGIN IMMEDIATE.
+    """
     _instance = None
-    _connection = None
     
     def __new__(cls):
         if cls._instance is None:
-            cls._instance = super().__new__(cls)
+            instance = super().__new__(cls)
+            instance._pool = queue.LifoQueue(maxsize=DB_POOL_SIZE)
+            instance._write_lock = threading.RLock()
+            cls._instance = instance
         return cls._instance
     
-    def get_connection(self):
-        """Get or create database connection."""
-        if self._connection is None:
-            self._connection = sqlite3.connect(DB_PATH, check_same_thread=False)
-            self._connection.row_factory = sqlite3.Row
-            self._connection.execute('PRAGMA journal_mode=WAL')
-        return self._connection
+    def _create_connection(self):
+        """Open a new connection with WAL-tuned pragmas."""
+        conn = sqlite3.connect(DB_PATH, check_same_thread=False, timeout=DB_BUSY_TIMEOUT_MS / 1000)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'PRAGMA busy_timeout={DB_BUSY_TIMEOUT_MS}')
+        conn.execute(f'PRAGMA cache_size=-{DB_CACHE_SIZE_KB}')
+        conn.execute(f'PRAGMA mmap_size={DB_MMAP_SIZE}')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        return conn
+    
+    def _acquire(self):
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            return self._create_connection()
+    
+    def _release(self, conn):
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
     
     @contextmanager
-    def get_cursor(self):
-        """Context manager for database cursor."""
-        conn = self.get_connection()
+    def get_cursor(self, write=False):
+        """Context manager for a database cursor.
+        
+        Args:
+            write: Hold the write lock and open an immediate transaction
+        """
+        conn = self._acquire()
+        if write:
+            self._write_lock.acquire()
         cursor = conn.cursor()
         try:
+            if write:
+                cursor.execute('BEGIN IMMEDIATE')
             yield cursor
             conn.commit()
-        except Exception as e:
+        except Exception:
             conn.rollback()
             raise
         finally:
             cursor.close()
+            if write:
+                self._write_lock.release()
+            self._release(conn)
     
     def close(self):
-        """Close database connection."""
-        if self._connection:
-            self._connection.close()
-            self._connection = None
+        """Close all pooled database connections."""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
 
 
 _db_manager = DatabaseManager()
 
 
+class DayRecordCache:
+    """Small thread-safe LRU cache of decoded prayer_times rows.
+
+    Keys are (date, city, country, method, school) with the date as a
+    YYYY-MM-DD string. Writers must invalidate what they change; readers
+    take generation() before reading the database and pass it to put(),
+    which drops the record if anything was invalidated in between.
+    """
+    
+    def __init__(self, maxsize=32):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0  # Bumped by every invalidation
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key):
+        with self._lock:
+            record = self._entries.get(key)
+            if record is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(record)
+    
+    def generation(self):
+        with self._lock:
+            return self._generation
+    
+    def put(self, key, record, generation=None):
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return  # Read before a concurrent write, may be stale
+            self._entries[key] = dict(record)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def invalidate(self, keys):
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                self._entries.pop(key, None)
+    
+    def invalidate_before(self, date_str):
+        """Drop every entry dated before date_str."""
+        with self._lock:
+            self._generation += 1
+            for key in [k for k in self._entries if k[0] < date_str]:
+                del self._entries[key]
+    
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+    
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries), "hits": self.hits, "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0
+            }
+
+
+_day_cache = DayRecordCache(DAY_CACHE_SIZE)
+
+
+def get_day_cache_stats():
+    """Hit/miss counters of the in-memory prayer day cache."""
+    return _day_cache.stats()
+
+
+PRAYER_TIMES_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS prayer_times (
+        date TEXT, hijri_date TEXT, city TEXT, country TEXT DEFAULT '',
+        method INTEGER, school INTEGER,
+        fajr INTEGER, dhuhr INTEGER, asr INTEGER, maghrib INTEGER, isha INTEGER,
+        PRIMARY KEY (city, country, method, school, date)
+    )
+"""
+
+PRAYER_MONTHS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS prayer_months (
+        city TEXT, country TEXT DEFAULT '',
+        method INTEGER, school INTEGER, month TEXT, days BLOB,
+        PRIMARY KEY (city, country, method, school, month)
+    ) WITHOUT ROWID
+"""
+
+# One slot per day of the month in prayer_months.days: the five prayer
+# times in minutes (Fajr -1 marks an empty slot) and the Hijri day, month, year
+_DAY_SLOT = struct.Struct("<8h")
+_EMPTY_MONTH = _DAY_SLOT.pack(-1, -1, -1, -1, -1, 0, 0, 0) * 31
+
+# Hijri dates reported by the API (HJCoSA calendar). They do not depend on
+# the location, and take precedence over the tabular dates of computed days.
+HIJRI_DATES_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS hijri_dates (
+        date TEXT PRIMARY KEY, hijri_date TEXT
+    ) WITHOUT ROWID
+"""
+
+LOCATIONS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS locations (
+        city TEXT, country TEXT DEFAULT '',
+        latitude REAL, longitude REAL, timezone TEXT,
+        PRIMARY KEY (city, country)
+    )
+"""
+
+WEATHER_CACHE_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS weather_cache (
+        city TEXT, country TEXT DEFAULT '',
+        data TEXT, fetched_at REAL,
+        PRIMARY KEY (city, country)
+    )
+"""
+
+
 def init_db():
-    """Initialize database and create tables."""
-    with _db_manager.get_cursor() as cursor:
+    """Initialize database, create tables and migrate older schemas."""
+    with _db_manager.get_cursor(write=True) as cursor:
+        cursor.execute("PRAGMA table_info(prayer_times)")
+        columns = {row[1]: row[2].upper() for row in cursor.fetchall()}
+        if columns and "method" not in columns:
+            _migrate_prayer_times_to_settings_key(cursor)
+        elif columns.get("fajr") == "TEXT":
+            _migrate_prayer_times_to_minutes(cursor)
+        cursor.execute(PRAYER_TIMES_SCHEMA)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_prayer_times_date ON prayer_times (date)")
+        cursor.execute(PRAYER_MONTHS_SCHEMA)
+        _convert_prayer_storage(cursor)
+        cursor.execute(HIJRI_DATES_SCHEMA)
+        cursor.execute(LOCATIONS_SCHEMA)
+        cursor.execute(WEATHER_CACHE_SCHEMA)
+
+
+def _migrate_prayer_times_to_settings_key(cursor):
+    """Migrate the (date, city) keyed table to the settings-aware key.
+
+    Existing rows are assumed to belong to the saved method/school, and get
+    a country when their city is unambiguous in CITY_COORDINATES.
+    """
+    settings = load_settings()
+    method, school = settings["method"], settings["school"]
+
+    cursor.execute("ALTER TABLE prayer_times RENAME TO prayer_times_legacy")
+    cursor.execute(PRAYER_TIMES_SCHEMA)
+    cursor.execute("SELECT date, hijri_date, city, fajr, dhuhr, asr, maghrib, isha FROM prayer_times_legacy")
+    rows = _legacy_rows_in_minutes(
+        (r[0], r[1], r[2], _country_for_city(r[2]), method, school, *r[3:8])
+        for r in cursor.fetchall()
+    )
+    cursor.executemany("""
+        INSERT OR REPLACE INTO prayer_times
+        (date, hijri_date, city, country, method, school, fajr, dhuhr, asr, maghrib, isha)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, rows)
+    cursor.execute("DROP TABLE prayer_times_legacy")
+    logger.info(f"Migrated {len(rows)} prayer records to settings-aware cache key "
+                f"(method={method}, school={school})")
+
+
+def _legacy_rows_in_minutes(rows):
+    """Convert the five trailing TEXT times of legacy rows to minutes.
+
+    Rows (starting with date, hijri_date, city) that have an unparseable
+    time are dropped and logged; their dates are then missing, so they
+    are computed or fetched again like any other missing day.
+    """
+    converted = []
+    for row in rows:
+        try:
+            converted.append((*row[:-5], *map(parse_time_minutes, row[-5:])))
+        except ValueError as e:
+            logger.warning(f"Dropping stored prayer times for {row[2]} on {row[0]}: {e}")
+    return converted
+
+
+def _migrate_prayer_times_to_minutes(cursor):
+    """Convert the HH:MM TEXT time columns to INTEGER minutes since midnight."""
+    cursor.execute("ALTER TABLE prayer_times RENAME TO prayer_times_legacy")
+    cursor.execute("DROP INDEX IF EXISTS idx_prayer_times_date")
+    cursor.execute(PRAYER_TIMES_SCHEMA)
+    cursor.execute("""
+        SELECT date, hijri_date, city, country, method, school, fajr, dhuhr, asr, maghrib, isha
+        FROM prayer_times_legacy
+    """)
+    legacy = cursor.fetchall()
+    rows = _legacy_rows_in_minutes(legacy)
+    cursor.executemany("""
+        INSERT OR REPLACE INTO prayer_times
+        (date, hijri_date, city, country, method, school, fajr, dhuhr, asr, maghrib, isha)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, rows)
+    cursor.execute("DROP TABLE prayer_times_legacy")
+    logger.info(f"Migrated {len(rows)} prayer records to integer minute columns"
+                + (f", dropped {len(legacy) - len(rows)} unparseable" if len(rows) < len(legacy) else ""))
+
+
+def _convert_prayer_storage(cursor):
+    """Move stored prayer times into the DB_STORAGE_LAYOUT table."""
+    if DB_STORAGE_LAYOUT == "packed":
         cursor.execute("""
-            CREATE TABLE IF NOT EXISTS prayer_times (
-                date TEXT, hijri_date TEXT, city TEXT,
-                fajr TEXT, dhuhr TEXT, asr TEXT, maghrib TEXT, isha TEXT,
-                PRIMARY KEY (date, city)
-            )
+            SELECT date, hijri_date, city, country, method, school, fajr, dhuhr, asr, maghrib, isha
+            FROM prayer_times
         """)
+        rows = cursor.fetchall()
+        if rows:
+            _write_packed_rows(cursor, rows)
+            cursor.execute("DELETE FROM prayer_times")
+    else:
+        cursor.execute("SELECT city, country, method, school, month, days FROM prayer_months")
+        rows = [
+            (date_str, hijri_date, city, country, method, school, *times)
+            for city, country, method, school, month, days in cursor.fetchall()
+            for date_str, hijri_date, times in _iter_packed_days(month, days)
+        ]
+        if rows:
+            cursor.executemany("""
+                INSERT OR REPLACE INTO prayer_times
+                (date, hijri_date, city, country, method, school, fajr, dhuhr, asr, maghrib, isha)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+            cursor.execute("DELETE FROM prayer_months")
+    if rows:
+        logger.info(f"Converted {len(rows)} prayer records to the '{DB_STORAGE_LAYOUT}' storage layout")
 
 
-def store_prayer_times(date, hijri_date, city, times):
-    """Store prayer times in database."""
+def _pack_hijri(hijri_date):
+    """(day, month, year) of a DD-MM-YYYY Hijri string, zeros if unparseable."""
     try:
-        with _db_manager.get_cursor() as cursor:
-            cursor.execute("""
-                INSERT OR REPLACE INTO prayer_times 
-                (date, hijri_date, city, fajr, dhuhr, asr, maghrib, isha)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (date.strftime("%Y-%m-%d"), hijri_date, city,
-                  times["Fajr"], times["Dhuhr"], times["Asr"],
-                  times["Maghrib"], times["Isha"]))
+        day, month, year = map(int, hijri_date.split("-"))
+        return day, month, year
+    except (AttributeError, ValueError):
+        return 0, 0, 0
+
+
+def _unpack_day_slot(slot):
+    """(times, hijri_date) of an unpacked day slot, or None if it is empty."""
+    if slot[0] < 0:
+        return None
+    hijri_day, hijri_month, hijri_year = slot[5:]
+    hijri_date = f"{hijri_day:02d}-{hijri_month:02d}-{hijri_year}" if hijri_year else None
+    return slot[:5], hijri_date
+
+
+def _iter_packed_days(month, days):
+    """Yield (date, hijri_date, times) for the filled slots of a month BLOB."""
+    for index, slot in enumerate(_DAY_SLOT.iter_unpack(days)):
+        unpacked = _unpack_day_slot(slot)
+        if unpacked is not None:
+            times, hijri_date = unpacked
+            yield f"{month}-{index + 1:02d}", hijri_date, times
+
+
+def _write_packed_rows(cursor, rows):
+    """Merge prayer_times-shaped rows into their month BLOBs."""
+    months = {}
+    for row in rows:
+        months.setdefault((*row[2:6], row[0][:7]), []).append(row)
+    updates = []
+    for key, month_rows in months.items():
+        cursor.execute("""
+            SELECT days FROM prayer_months
+            WHERE city=? AND country=? AND method=? AND school=? AND month=?
+        """, key)
+        found = cursor.fetchone()
+        days = bytearray(found[0] if found else _EMPTY_MONTH)
+        for row in month_rows:
+            offset = (int(row[0][8:10]) - 1) * _DAY_SLOT.size
+            _DAY_SLOT.pack_into(days, offset, *row[6:11], *_pack_hijri(row[1]))
+        updates.append((*key, bytes(days)))
+    cursor.executemany("""
+        INSERT OR REPLACE INTO prayer_months (city, country, method, school, month, days)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, updates)
+
+
+def _packed_stats(cursor):
+    """(day count, city count, earliest date, latest date) of the packed table."""
+    cursor.execute("SELECT city, month, days FROM prayer_months ORDER BY month")
+    total, cities, dates = 0, set(), []
+    for city, month, days in cursor.fetchall():
+        present = [date_str for date_str, _, _ in _iter_packed_days(month, days)]
+        if present:
+            total += len(present)
+            cities.add(city)
+            dates += present[0], present[-1]
+    return total, len(cities), min(dates, default=None), max(dates, default=None)
+
+
+def _country_for_city(city):
+    """Return the country of a built-in city if it is unambiguous, else ''."""
+    countries = [country for country, cities in CITY_COORDINATES.items() if city in cities]
+    return countries[0] if len(countries) == 1 else ""
+
+
+def store_prayer_times_many(records, method=None, school=None, api_hijri=False):
+    """Store many days of prayer times in a single transaction.
+
+    Args:
+        records: Iterable of (date, hijri_date, city, country, times) tuples;
+            times may be "HH:MM" strings or minutes since midnight
+        method, school: Calculation settings the times were produced with
+            (default to API_METHOD / API_SCHOOL)
+        api_hijri: The Hijri dates come from the API; they are also kept in
+            hijri_dates and then shown for these days at every location
+
+    Returns:
+        int: Number of rows written
+    """
+    if method is None:
+        method = API_METHOD
+    if school is None:
+        school = API_SCHOOL
+    try:
+        rows = [
+            (day.isoformat(), hijri_date, city, country, method, school,
+             *normalize_times(times))
+            for day, hijri_date, city, country, times in records
+        ]
     except KeyError as e:
         raise ValueError(f"Missing prayer time key: {e}")
-    except Exception as e:
-        raise Exception(f"Failed to store prayer times for {city} on {date}: {e}")
 
-
-def get_prayer_times_from_db(date, city):
-    """Retrieve prayer times for a specific date and city."""
+    if not rows:
+        return 0
+    try:
+        with _db_manager.get_cursor(write=True) as cursor:
+            if DB_STORAGE_LAYOUT == "packed":
+                _write_packed_rows(cursor, rows)
+            else:
+                cursor.executemany("""
+                    INSERT OR REPLACE INTO prayer_times 
+                    (date, hijri_date, city, country, method, school, fajr, dhuhr, asr, maghrib, isha)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, rows)
+            if api_hijri:
+                cursor.executemany("INSERT OR REPLACE INTO hijri_dates (date, hijri_date) VALUES (?, ?)",
+                                   [row[:2] for row in rows if row[1]])
+    except Exception as e:
+        raise Exception(f"Failed to store {len(rows)} prayer time records: {e}")
+    finally:
+        if api_hijri:
+            _day_cache.clear()  # Other locations' days show the new Hijri dates too
+        else:
+            _day_cache.invalidate([row[:1] + row[2:6] for row in rows])
+    return len(rows)
+
+
+def get_prayer_times_from_db(date, city, country="", method=None, school=None):
+    """Retrieve prayer times for a specific date, location and calculation settings."""
+    if method is None:
+        method = API_METHOD
+    if school is None:
+        school = API_SCHOOL
+    date_str = date.strftime("%Y-%m-%d")
+    cache_key = (date_str, city, country, method, school)
+    cached = _day_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    generation = _day_cache.generation()
+    
     try:
         with _db_manager.get_cursor() as cursor:
-            cursor.execute("""
-                SELECT fajr, dhuhr, asr, maghrib, isha, hijri_date 
-                FROM prayer_times WHERE date=? AND city=?
-            """, (date.strftime("%Y-%m-%d"), city))
-            row = cursor.fetchone()
+            if DB_STORAGE_LAYOUT == "packed":
+                # Only the day's 16-byte slot is read out of the month BLOB
+                cursor.execute("""
+                    SELECT substr(days, ?, ?) FROM prayer_months
+                    WHERE city=? AND country=? AND method=? AND school=? AND month=?
+                """, ((date.day - 1) * _DAY_SLOT.size + 1, _DAY_SLOT.size,
+                      city, country, method, school, date_str[:7]))
+                found = cursor.fetchone()
+                unpacked = found and _unpack_day_slot(_DAY_SLOT.unpack(found[0]))
+                row = (*unpacked[0], unpacked[1]) if unpacked else None
+            else:
+                cursor.execute("""
+                    SELECT fajr, dhuhr, asr, maghrib, isha, hijri_date 
+                    FROM prayer_times
+                    WHERE city=? AND country=? AND method=? AND school=? AND date=?
+                """, (city, country, method, school, date_str))
+                row = cursor.fetchone()
+            if row:
+                cursor.execute("SELECT hijri_date FROM hijri_dates WHERE date = ?", (date_str,))
+                reported = cursor.fetchone()
+                if reported:
+                    row = (*row[:5], reported[0])
     except Exception as e:
         raise Exception(f"Failed to retrieve prayer times for {city}: {e}")
     
     if row:
-        return {
-            "Fajr": row[0], "Dhuhr": row[1], "Asr": row[2],
-            "Maghrib": row[3], "Isha": row[4], "hijri_date": row[5]
-        }
+        record = dict(zip(PRAYER_NAMES, map(format_time_24h, row[:5])))
+        record["hijri_date"] = row[5]
+        _day_cache.put(cache_key, record, generation)
+        return record
     return None
 
 
-def get_prayer_times_range_from_db(start_date, end_date, city):
-    """Retrieve prayer times for a date range."""
-    try:
-        with _db_manager.get_cursor() as cursor:
-            cursor.execute('''
-                SELECT date, fajr, dhuhr, asr, maghrib, isha
-                FROM prayer_times WHERE city = ? AND date BETWEEN ? AND ?
-                ORDER BY date ASC
-            ''', (city, start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d")))
-            rows = cursor.fetchall()
-    except Exception as e:
-        raise Exception(f"Failed to retrieve prayer times range for {city}: {e}")
+def get_prayer_times_range_from_db(start_date, end_date, city, country="", method=None, school=None):
+    """Retrieve prayer times for a date range."""
+    if method is None:
+        method = API_METHOD
+    if school is None:
+        school = API_SCHOOL
+    start_str, end_str = start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d")
+    try:
+        with _db_manager.get_cursor() as cursor:
+            if DB_STORAGE_LAYOUT == "packed":
+                cursor.execute("""
+                    SELECT month, days FROM prayer_months
+                    WHERE city = ? AND country = ? AND method = ? AND school = ?
+                      AND month BETWEEN ? AND ?
+                    ORDER BY month ASC
+                """, (city, country, method, school, start_str[:7], end_str[:7]))
+                rows = [
+                    (date_str, *times)
+                    for month, days in cursor.fetchall()
+                    for date_str, _, times in _iter_packed_days(month, days)
+                    if start_str <= date_str <= end_str
+                ]
+            else:
+                cursor.execute('''
+                    SELECT date, fajr, dhuhr, asr, maghrib, isha
+                    FROM prayer_times
+                    WHERE city = ? AND country = ? AND method = ? AND school = ?
+                      AND date BETWEEN ? AND ?
+                    ORDER BY date ASC
+                ''', (city, country, method, school, start_str, end_str))
+                rows = cursor.fetchall()
+    except Exception as e:
+        raise Exception(f"Failed to retrieve prayer times range for {city}: {e}")
+
+    return {row[0]: dict(zip(PRAYER_NAMES, map(format_time_24h, row[1:6]))) for row in rows}
+
+
+def store_location(city, country, latitude, longitude, timezone=None):
+    """Store resolved coordinates for a location.
+
+    A None timezone keeps any timezone already stored for the location.
+    """
+    try:
+        with _db_manager.get_cursor(write=True) as cursor:
+            cursor.execute("""
+                INSERT INTO locations (city, country, latitude, longitude, timezone)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (city, country) DO UPDATE SET
+                    latitude = excluded.latitude,
+                    longitude = excluded.longitude,
+                    timezone = COALESCE(excluded.timezone, locations.timezone)
+            """, (city, country, latitude, longitude, timezone))
+    except Exception as e:
+        raise Exception(f"Failed to store location {city}, {country}: {e}")
+
+
+def get_location_from_db(city, country=""):
+    """Return stored (latitude, longitude, timezone) for a location, or None.
+
+    The timezone is None until a lookup has reported it.
+    """
+    try:
+        with _db_manager.get_cursor() as cursor:
+            cursor.execute("""
+                SELECT latitude, longitude, timezone FROM locations
+                WHERE city = ? AND country = ?
+            """, (city, country))
+            row = cursor.fetchone()
+    except Exception as e:
+        logger.warning(f"Failed to read stored location for {city}, {country}: {e}")
+        return None
+    return tuple(row) if row else None
+
+
+# =====================================================================
+# LOCAL PRAYER TIME CALCULATION
+# =====================================================================
+
+SUN_ALTITUDE_AT_HORIZON = 0.833  # Refraction + solar semi-diameter, degrees
+
+
+def _fix_angle(a):
+    return a - 360.0 * math.floor(a / 360.0)
+
+
+def _fix_hour(h):
+    return h - 24.0 * math.floor(h / 24.0)
+
+
+def _dsin(d):
+    return math.sin(math.radians(d))
+
+
+def _dcos(d):
+    return math.cos(math.radians(d))
+
+
+def _sun_position(jd):
+    """Return (declination, equation of time) for a Julian date."""
+    d = jd - 2451545.0
+    g = _fix_angle(357.529 + 0.98560028 * d)
+    q = _fix_angle(280.459 + 0.98564736 * d)
+    lon = _fix_angle(q + 1.915 * _dsin(g) + 0.020 * _dsin(2 * g))
+    e = 23.439 - 0.00000036 * d
+
+    ra = math.degrees(math.atan2(_dcos(e) * _dsin(lon), _dcos(lon))) / 15.0
+    eqt = q / 15.0 - _fix_hour(ra)
+    decl = math.degrees(math.asin(_dsin(e) * _dsin(lon)))
+    return decl, eqt
+
+
+def _mid_day(jd, t):
+    _, eqt = _sun_position(jd + t)
+    return _fix_hour(12 - eqt)
+
+
+def _sun_angle_time(jd, latitude, angle, t, before_noon=False):
+    """Time (hours, UT at the meridian) when the sun is `angle` degrees below the horizon."""
+    decl, _ = _sun_position(jd + t)
+    noon = _mid_day(jd, t)
+    cos_h = (-_dsin(angle) - _dsin(decl) * _dsin(latitude)) / (_dcos(decl) * _dcos(latitude))
+    if cos_h < -1 or cos_h > 1:
+        return math.nan  # Sun never reaches this angle (high latitudes)
+    hour_angle = math.degrees(math.acos(cos_h)) / 15.0
+    return noon - hour_angle if before_noon else noon + hour_angle
+
+
+def _asr_time(jd, latitude, factor, t):
+    decl, _ = _sun_position(jd + t)
+    angle = -math.degrees(math.atan(1.0 / (factor + math.tan(math.radians(abs(latitude - decl))))))
+    return _sun_angle_time(jd, latitude, angle, t)
+
+
+def _format_hours(hours):
+    """Format fractional hours as HH:MM, rounded to the nearest minute."""
+    minutes = int(math.floor(_fix_hour(hours + 0.5 / 60) * 60))
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def get_city_coordinates(city, country):
+    """Return (latitude, longitude, timezone) for a known city, or None.
+
+    Built-in cities come from CITY_COORDINATES; other cities are known once
+    a weather lookup has stored their coordinates and timezone.
+    """
+    coordinates = CITY_COORDINATES.get(country, {}).get(city)
+    if coordinates is None:
+        stored = get_location_from_db(city, country)
+        if stored and stored[2]:
+            coordinates = stored
+    return coordinates
+
+
+def get_utc_offset_hours(tz_name, date):
+    """UTC offset in hours for a timezone on a given date (DST aware), or None."""
+    try:
+        tz = ZoneInfo(tz_name)
+    except (ZoneInfoNotFoundError, ValueError) as e:
+        logger.warning(f"Timezone '{tz_name}' unavailable: {e}")
+        return None
+    local_noon = datetime.combine(date, datetime.min.time()).replace(hour=12, tzinfo=tz)
+    return local_noon.utcoffset().total_seconds() / 3600
+
+
+def gregorian_to_hijri(date, adjustment=0):
+    """Convert a Gregorian date to a tabular Hijri date string (DD-MM-YYYY).
+
+    adjustment shifts the date by whole days first, like the API's
+    "adjustment" parameter.
+    """
+    jd = date.toordinal() + adjustment + 1721425
+    r = jd - 1948440 + 10632
+    n = (r - 1) // 10631
+    r = r - 10631 * n + 354
+    j = ((10985 - r) // 5316) * ((50 * r) // 17719) + (r // 5670) * ((43 * r) // 15238)
+    r = r - ((30 - j) // 15) * ((17719 * j) // 50) - (j // 16) * ((15238 * j) // 43) + 29
+    month = (24 * r) // 709
+    day = r - (709 * month) // 24
+    year = 30 * n + j - 30
+    return f"{day:02d}-{month:02d}-{year}"
+
+
+def _hijri_adjustment(date_str, hijri_date):
+    """Days gregorian_to_hijri must shift date_str by to give hijri_date (0 if none does)."""
+    day = date.fromisoformat(date_str)
+    for adjustment in (0, -1, 1, -2, 2):
+        if gregorian_to_hijri(day, adjustment) == hijri_date:
+            return adjustment
+    return 0
+
+
+def hijri_dates_for(dates):
+    """Hijri date strings for days computed locally, in the API's calendar.
+
+    Days the API has reported keep its date. The others use the tabular
+    calendar with the adjustment it needed on the nearest reported day,
+    since tabular and HJCoSA months often start a day apart.
+    """
+    if not dates:
+        return []
+    start, end = min(dates).isoformat(), max(dates).isoformat()
+    try:
+        with _db_manager.get_cursor() as cursor:
+            cursor.execute("SELECT date, hijri_date FROM hijri_dates WHERE date BETWEEN ? AND ?", (start, end))
+            reported = dict(cursor.fetchall())
+            cursor.execute("""
+                SELECT date, hijri_date FROM hijri_dates
+                ORDER BY abs(julianday(date) - julianday(?)) LIMIT 1
+            """, (start,))
+            nearest = cursor.fetchone()
+    except Exception as e:
+        logger.warning(f"Failed to read reported Hijri dates: {e}")
+        reported, nearest = {}, None
+    adjustment = _hijri_adjustment(*nearest) if nearest else 0
+    return [reported.get(d.isoformat()) or gregorian_to_hijri(d, adjustment) for d in dates]
+
+
+def calculate_local_prayer_times(date, latitude, longitude, utc_offset, method=None, school=None):
+    """Compute the five daily prayer times from the sun's position.
+
+    Args:
+        date: Gregorian date
+        latitude, longitude: Location in degrees
+        utc_offset: Local UTC offset in hours for that date
+        method: Key of API_CALCULATION_METHODS (defaults to API_METHOD)
+        school: Key of API_SCHOOLS (defaults to API_SCHOOL)
+
+    Returns:
+        dict: {"Fajr": "HH:MM", ...} in 24-hour local time, or None on a
+        day the sun does not rise or set (or never reaches the Asr or
+        Maghrib angle), so the caller can fall back to the API
+    """
+    if method is None:
+        method = API_METHOD
+    if school is None:
+        school = API_SCHOOL
+    params = CALCULATION_METHOD_PARAMS.get(method, CALCULATION_METHOD_PARAMS[2])
+    factor = ASR_SHADOW_FACTORS.get(school, 1)
+
+    jd = date.toordinal() + 1721424.5 - longitude / (15.0 * 24.0)
+
+    fajr = _sun_angle_time(jd, latitude, params["fajr"], 5 / 24, before_noon=True)
+    sunrise = _sun_angle_time(jd, latitude, SUN_ALTITUDE_AT_HORIZON, 6 / 24, before_noon=True)
+    dhuhr = _mid_day(jd, 12 / 24)
+    asr = _asr_time(jd, latitude, factor, 13 / 24)
+    sunset = _sun_angle_time(jd, latitude, SUN_ALTITUDE_AT_HORIZON, 18 / 24)
+    if "maghrib" in params:
+        maghrib = _sun_angle_time(jd, latitude, params["maghrib"], 18 / 24)
+    else:
+        maghrib = sunset
+    if any(math.isnan(t) for t in (sunrise, sunset, asr, maghrib)):
+        return None  # Polar day or night: no night to apply the adjustment to
+    if "isha_minutes" in params:
+        isha = maghrib + params["isha_minutes"] / 60.0
+    else:
+        isha = _sun_angle_time(jd, latitude, params["isha"], 18 / 24)
+
+    # Angle-based high latitude adjustment: twilight may not exceed a
+    # fraction (angle / 60) of the night.
+    night = _fix_hour(sunrise - sunset)
+    fajr_limit = params["fajr"] / 60.0 * night
+    if math.isnan(fajr) or _fix_hour(sunrise - fajr) > fajr_limit:
+        fajr = sunrise - fajr_limit
+    if "isha" in params:
+        isha_limit = params["isha"] / 60.0 * night
+        if math.isnan(isha) or _fix_hour(isha - sunset) > isha_limit:
+            isha = sunset + isha_limit
+
+    shift = utc_offset - longitude / 15.0
+    return {
+        "Fajr": _format_hours(fajr + shift),
+        "Dhuhr": _format_hours(dhuhr + shift),
+        "Asr": _format_hours(asr + shift),
+        "Maghrib": _format_hours(maghrib + shift),
+        "Isha": _format_hours(isha + shift),
+    }
+
+
+_HHMM_STRINGS = [f"{m // 60:02d}:{m % 60:02d}" for m in range(24 * 60)]
+
+
+def _np_sun_position(jd):
+    d = jd - 2451545.0
+    g = np.radians(np.mod(357.529 + 0.98560028 * d, 360.0))
+    q = np.mod(280.459 + 0.98564736 * d, 360.0)
+    lon = np.radians(np.mod(q + 1.915 * np.sin(g) + 0.020 * np.sin(2 * g), 360.0))
+    e = np.radians(23.439 - 0.00000036 * d)
+
+    ra = np.degrees(np.arctan2(np.cos(e) * np.sin(lon), np.cos(lon))) / 15.0
+    eqt = q / 15.0 - np.mod(ra, 24.0)
+    decl = np.degrees(np.arcsin(np.sin(e) * np.sin(lon)))
+    return decl, eqt
+
+
+def _np_mid_day(jd, t):
+    _, eqt = _np_sun_position(jd + t)
+    return np.mod(12.0 - eqt, 24.0)
+
+
+def _np_sun_angle_time(jd, latitude, angle, t, before_noon=False):
+    decl, _ = _np_sun_position(jd + t)
+    noon = _np_mid_day(jd, t)
+    lat = np.radians(latitude)
+    decl = np.radians(decl)
+    cos_h = (-np.sin(np.radians(angle)) - np.sin(decl) * np.sin(lat)) / (np.cos(decl) * np.cos(lat))
+    with np.errstate(invalid="ignore"):
+        hour_angle = np.degrees(np.arccos(cos_h)) / 15.0  # NaN where the sun never reaches the angle
+    return noon - hour_angle if before_noon else noon + hour_angle
+
+
+def _np_asr_time(jd, latitude, factor, t):
+    decl, _ = _np_sun_position(jd + t)
+    angle = -np.degrees(np.arctan(1.0 / (factor + np.tan(np.radians(np.abs(latitude - decl))))))
+    return _np_sun_angle_time(jd, latitude, angle, t)
+
+
+def calculate_prayer_times_batch(dates, latitudes, longitudes, utc_offsets, method=None, school=None):
+    """Vectorized prayer time calculation for many dates and locations at once.
+
+    Args:
+        dates: Sequence of N Gregorian dates
+        latitudes, longitudes: Sequences of M coordinates in degrees
+        utc_offsets: M x N UTC offsets in hours (per location, per date)
+        method: Key of API_CALCULATION_METHODS (defaults to API_METHOD)
+        school: Key of API_SCHOOLS (defaults to API_SCHOOL)
+
+    Returns:
+        dict: {prayer: M x N integer array of minutes since local midnight},
+        -1 for every prayer on days that cannot be computed (polar day or
+        night: no sunrise or sunset, or the sun never reaches an angle)
+    """
+    if method is None:
+        method = API_METHOD
+    if school is None:
+        school = API_SCHOOL
+    params = CALCULATION_METHOD_PARAMS.get(method, CALCULATION_METHOD_PARAMS[2])
+    factor = ASR_SHADOW_FACTORS.get(school, 1)
+
+    ordinals = np.array([d.toordinal() for d in dates], dtype=np.float64)[np.newaxis, :]
+    latitude = np.asarray(latitudes, dtype=np.float64)[:, np.newaxis]
+    longitude = np.asarray(longitudes, dtype=np.float64)[:, np.newaxis]
+    offsets = np.asarray(utc_offsets, dtype=np.float64).reshape(latitude.shape[0], ordinals.shape[1])
+
+    jd = ordinals + 1721424.5 - longitude / (15.0 * 24.0)
+
+    fajr = _np_sun_angle_time(jd, latitude, params["fajr"], 5 / 24, before_noon=True)
+    sunrise = _np_sun_angle_time(jd, latitude, SUN_ALTITUDE_AT_HORIZON, 6 / 24, before_noon=True)
+    dhuhr = _np_mid_day(jd, 12 / 24)
+    asr = _np_asr_time(jd, latitude, factor, 13 / 24)
+    sunset = _np_sun_angle_time(jd, latitude, SUN_ALTITUDE_AT_HORIZON, 18 / 24)
+    if "maghrib" in params:
+        maghrib = _np_sun_angle_time(jd, latitude, params["maghrib"], 18 / 24)
+    else:
+        maghrib = sunset
+    if "isha_minutes" in params:
+        isha = maghrib + params["isha_minutes"] / 60.0
+    else:
+        isha = _np_sun_angle_time(jd, latitude, params["isha"], 18 / 24)
+
+    # Angle-based high latitude adjustment (see calculate_local_prayer_times)
+    night = np.mod(sunrise - sunset, 24.0)
+    fajr_limit = params["fajr"] / 60.0 * night
+    with np.errstate(invalid="ignore"):
+        fajr = np.where(np.isnan(fajr) | (np.mod(sunrise - fajr, 24.0) > fajr_limit),
+                        sunrise - fajr_limit, fajr)
+        if "isha" in params:
+            isha_limit = params["isha"] / 60.0 * night
+            isha = np.where(np.isnan(isha) | (np.mod(isha - sunset, 24.0) > isha_limit),
+                            sunset + isha_limit, isha)
+
+    shift = offsets - longitude / 15.0
+    all_hours = (fajr, dhuhr, asr, maghrib, isha)
+    valid = np.logical_and.reduce([np.isfinite(hours) for hours in all_hours])
+    result = {}
+    for prayer, hours in zip(PRAYER_NAMES, all_hours):
+        minutes = np.floor(np.mod(np.where(valid, hours, 0.0) + shift + 0.5 / 60, 24.0) * 60)
+        result[prayer] = np.where(valid, minutes, -1).astype(np.int16)
+    return result
+
+
+def compute_prayer_times_range(locations, start_date, days, method=None, school=None):
+    """Compute prayer times for every (city, country) over a date range.
+
+    Uses one vectorized pass when NumPy is available. Locations whose
+    coordinates or timezone are unknown are skipped, and so are days the
+    engine cannot compute (see calculate_prayer_times_batch).
+
+    Returns:
+        list: (date, hijri_date, city, country, times) records ready for
+        store_prayer_times_many (times as minutes since midnight when
+        computed in the batch, "HH:MM" otherwise)
+    """
+    dates = [start_date + timedelta(days=i) for i in range(days)]
+
+    known = []
+    for city, country in locations:
+        coordinates = get_city_coordinates(city, country)
+        if coordinates is None:
+            continue
+        latitude, longitude, tz_name = coordinates
+        offsets = [get_utc_offset_hours(tz_name, d) for d in dates]
+        if None in offsets:
+            continue
+        known.append((city, country, latitude, longitude, offsets))
+
+    if not known:
+        return []
+
+    hijri_dates = hijri_dates_for(dates)
+    records = []
+    if np is None:
+        for city, country, latitude, longitude, offsets in known:
+            for day, hijri_date, offset in zip(dates, hijri_dates, offsets):
+                times = calculate_local_prayer_times(day, latitude, longitude, offset, method, school)
+                if times is not None:
+                    records.append((day, hijri_date, city, country, times))
+        return records
+
+    minutes = calculate_prayer_times_batch(
+        dates, [k[2] for k in known], [k[3] for k in known], [k[4] for k in known],
+        method, school
+    )
+    columns = [minutes[prayer].tolist() for prayer in PRAYER_NAMES]
+    for row, (city, country, _, _, _) in enumerate(known):
+        for col, (day, hijri_date) in enumerate(zip(dates, hijri_dates)):
+            times = dict(zip(PRAYER_NAMES, [column[row][col] for column in columns]))
+            if times["Fajr"] < 0:
+                continue
+            records.append((day, hijri_date, city, country, times))
+    return records
+
+
+def compute_prayer_times_for_city(date, city, country):
+    """Compute prayer times locally for a known city.
+
+    Returns:
+        tuple: (times, hijri_date) or None if the city or its timezone is
+        unknown, or the day cannot be computed (polar day or night)
+    """
+    coordinates = get_city_coordinates(city, country)
+    if coordinates is None:
+        return None
+    latitude, longitude, tz_name = coordinates
+    utc_offset = get_utc_offset_hours(tz_name, date)
+    if utc_offset is None:
+        return None
+    times = calculate_local_prayer_times(date, latitude, longitude, utc_offset)
+    if times is None:
+        return None
+    return times, hijri_dates_for([date])[0]
+
+
+def can_calculate_locally(city, country):
+    """Check whether prayer times for a location can be computed offline."""
+    if not USE_LOCAL_CALCULATION:
+        return False
+    coordinates = get_city_coordinates(city, country)
+    return coordinates is not None and get_utc_offset_hours(coordinates[2], get_clock().today()) is not None
+
+
+# =====================================================================
+# API EXCEPTIONS
+# =====================================================================
+
+class PrayerAPIException(Exception):
+    """Base exception for prayer API errors."""
+    pass
+
+class PrayerAPIConnectionError(PrayerAPIException):
+    """Connection to API failed."""
+    pass
+
+class PrayerAPIResponseError(PrayerAPIException):
+    """Invalid or malformed API response."""
+    pass
+
+class PrayerAPIRateLimit(PrayerAPIException):
+    """API rate limit exceeded; retry_after is the remaining pause in seconds, if known."""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class PrayerAPICircuitOpen(PrayerAPIConnectionError):
+    """API calls suspended by the circuit breaker after repeated failures."""
+    pass
+
+
+# =====================================================================
+# HTTP SESSION
+# =====================================================================
+
+class HostTimeoutSession(requests.Session):
+    """Session that applies HTTP_HOST_TIMEOUTS when no timeout is given."""
+
+    def request(self, method, url, **kwargs):
+        if kwargs.get("timeout") is None:
+            host = urlsplit(url).hostname or ""
+            kwargs["timeout"] = (HTTP_CONNECT_TIMEOUT, HTTP_HOST_TIMEOUTS.get(host, API_TIMEOUT))
+        return super().request(method, url, **kwargs)
+
+
+_http_sessions = {}  # max_retries -> HostTimeoutSession
+_http_sessions_lock = threading.Lock()
+
+
+def get_http_session(max_retries=None):
+    """Shared keep-alive session for all outbound HTTP requests.
+
+    Connection errors, read timeouts and 5xx responses are retried by
+    urllib3 with exponential backoff, so callers make a single call.
+    429 responses are never retried here, even with a Retry-After
+    header; the caller sees them and raises PrayerAPIRateLimit.
+
+    Args:
+        max_retries: Total attempts per request (default API_MAX_RETRIES)
+    """
+    if max_retries is None:
+        max_retries = API_MAX_RETRIES
+    with _http_sessions_lock:
+        session = _http_sessions.get(max_retries)
+        if session is None:
+            retry_options = dict(
+                total=max(0, max_retries - 1),
+                backoff_factor=API_BACKOFF_BASE / 2,
+                status_forcelist=HTTP_RETRY_STATUSES,
+                allowed_methods=frozenset(["GET"]),
+                raise_on_status=False,
+                respect_retry_after_header=False,  # 429 pacing is AladhanClient's job
+            )
+            try:
+                # Adds up to API_BACKOFF_JITTER seconds to each backoff
+                retry = Retry(backoff_jitter=API_BACKOFF_JITTER, **retry_options)
+            except TypeError:  # urllib3 < 2 has no backoff_jitter
+                retry = Retry(**retry_options)
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS,
+                                  pool_maxsize=HTTP_POOL_MAXSIZE, max_retries=retry)
+            session = HostTimeoutSession()
+            session.headers["User-Agent"] = HTTP_USER_AGENT
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _http_sessions[max_retries] = session
+        return session
+
+
+class RateLimiter:
+    """Thread-safe token bucket shared by every prayer times API request.
+
+    acquire() blocks until a token is available. After a 429, pause()
+    holds back every caller for the cooldown: acquire() then raises
+    PrayerAPIRateLimit right away instead of sleeping, so the caller's
+    thread is free and the request is retried later.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self.throttle_count = 0
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    paused_for = self._paused_until - now
+                    raise PrayerAPIRateLimit(f"API rate limited; retry in {paused_for:.0f}s",
+                                             retry_after=paused_for)
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Hold back all requests for seconds (e.g. after a 429)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+            self.throttle_count += 1
+
+    def state(self):
+        with self._lock:
+            return {
+                "tokens": round(self._tokens, 2),
+                "paused_for": round(max(0.0, self._paused_until - time.monotonic()), 1),
+                "throttle_count": self.throttle_count,
+            }
+
+
+class CircuitBreaker:
+    """Stops calling a failing service and retries it on a schedule.
+
+    After failure_threshold consecutive failures the circuit opens and
+    calls are refused. Once reset_seconds have passed a single trial call
+    is let through (half-open): success closes the circuit, failure opens
+    it again with the delay doubled, up to max_reset_seconds.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold, reset_seconds, max_reset_seconds):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.max_reset_seconds = max_reset_seconds
+        self._state = self.CLOSED
+        self._failures = 0
+        self._delay = reset_seconds
+        self._open_until = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+        self.open_count = 0
+
+    def allow(self):
+        """Whether a call may go ahead now."""
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() >= self._open_until:
+                self._state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self._state == self.OPEN:
+                return False
+            if self._state == self.HALF_OPEN:
+                if self._trial_in_flight:
+                    return False
+                self._trial_in_flight = True
+            return True
+
+    def release(self):
+        """Give back a call allowed by allow() that never reached the service."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info("Prayer times API recovered, circuit closed")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._delay = self.reset_seconds
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state == self.HALF_OPEN:
+                    self._delay = min(self._delay * 2, self.max_reset_seconds)
+                self._state = self.OPEN
+                self._open_until = time.monotonic() + self._delay
+                self._trial_in_flight = False
+                self.open_count += 1
+                logger.warning(f"Prayer times API circuit open after {self._failures} failures; "
+                               f"next attempt in {self._delay:.0f}s")
+
+    def retry_in(self):
+        """Seconds until the next trial call is allowed (0 if not open)."""
+        with self._lock:
+            if self._state != self.OPEN:
+                return 0.0
+            return max(0.0, self._open_until - time.monotonic())
+
+    def state(self):
+        retry_in = self.retry_in()
+        with self._lock:
+            return {
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "retry_in": round(retry_in, 1),
+                "open_count": self.open_count,
+            }
+
+# Prayer times API traffic counters, see get_api_stats()
+_api_stats = {"requests": 0, "bytes": 0, "days": 0, "requests_saved": 0, "days_not_refetched": 0}
+_api_stats_lock = threading.Lock()
+
+
+def _count_api_traffic(**counts):
+    with _api_stats_lock:
+        for name, value in counts.items():
+            _api_stats[name] += value
+
+
+def get_api_stats():
+    """Prayer times API requests, bytes and days received, and what gap
+    planning saved versus per-day requests and whole-span refetches."""
+    with _api_stats_lock:
+        stats = dict(_api_stats)
+    stats["client"] = get_api_client_state()
+    return stats
+
+
+def iter_json_array(chunks, key="data"):
+    """Yield the elements of the top-level array `key` from byte chunks.
+
+    Each element is decoded with json.JSONDecoder.raw_decode as soon as it
+    is complete, so only the element being read is buffered. Keys of the
+    same name in nested objects, or inside strings, are skipped.
+
+    Raises:
+        ValueError: If the array is missing or the JSON is malformed
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder("utf-8")()
+    start = re.compile(r'"%s"\s*:\s*\[' % re.escape(key))
+    chunks = iter(chunks)
+    buffer = ""
+    pos = None  # Position inside the array once its opening bracket is found
+    exhausted = False
+    # Nesting state of the text before the array, known up to buffer[scanned]
+    scanned, depth, in_string, escaped = 0, 0, False, False
+
+    def scan_to(end):
+        nonlocal scanned, depth, in_string, escaped
+        for char in buffer[scanned:end]:
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == "\\":
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char in "{[":
+                depth += 1
+            elif char in "}]":
+                depth -= 1
+        scanned = end
+
+    while True:
+        while pos is None:
+            match = start.search(buffer, scanned)
+            if match is None:
+                break
+            scan_to(match.start())
+            if depth == 1 and not in_string:
+                pos = match.end()
+            else:
+                scan_to(match.start() + 1)  # Nested key or string contents
+        if pos is not None:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buffer):
+                if buffer[pos] == "]":
+                    return
+                try:
+                    item, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if exhausted:
+                        raise
+                else:
+                    yield item
+                    buffer, pos = buffer[end:], 0
+                    continue
+        if exhausted:
+            if pos is None:
+                raise ValueError(f"Response has no top-level '{key}' array")
+            raise ValueError(f"Response ended before the '{key}' array was complete")
+        chunk = next(chunks, None)
+        if chunk is None:
+            exhausted = True
+            buffer += text.decode(b"", final=True)
+        else:
+            buffer += text.decode(chunk)
+
+
+class AladhanClient:
+    """Shared client for the Aladhan prayer times API.
+
+    Every request takes a token from the rate limiter and is refused with
+    PrayerAPICircuitOpen while the circuit breaker is open. Connection
+    errors and 5xx responses are retried inside the HTTP session. A 429
+    raises PrayerAPIRateLimit and pauses all callers (for Retry-After, or
+    a jittered cooldown); requests made during the pause fail fast with
+    PrayerAPIRateLimit rather than waiting, and are retried by their
+    callers' schedules.
+    """
+
+    def __init__(self, limiter, breaker):
+        self.limiter = limiter
+        self.breaker = breaker
+
+    def _get(self, url, params, max_retries=None, stream=False):
+        """Send the GET request; returns a successful (2xx) response."""
+        if max_retries is None:
+            max_retries = API_MAX_RETRIES
+        if not self.breaker.allow():
+            raise PrayerAPICircuitOpen(
+                f"Prayer times API suspended after repeated failures; "
+                f"retry in {self.breaker.retry_in():.0f}s")
+        try:
+            self.limiter.acquire()
+        except PrayerAPIRateLimit:
+            # Never sent, so it is neither a success nor a failure
+            self.breaker.release()
+            raise
+        try:
+            response = get_http_session(max_retries).get(url, params=params, stream=stream)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            self.breaker.record_failure()
+            logger.warning(f"Could not reach prayer times API after {max_retries} attempts: {e}")
+            raise PrayerAPIConnectionError(f"Failed to connect after {max_retries} attempts: {e}")
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        _count_api_traffic(requests=1)
+
+        if response.status_code == 429:
+            response.close()
+            self.breaker.record_failure()
+            delay = self._retry_after(response)
+            if delay is None:
+                delay = API_RATE_LIMIT_COOLDOWN * random.uniform(1 - API_BACKOFF_JITTER, 1 + API_BACKOFF_JITTER)
+            self.limiter.pause(delay)
+            logger.warning(f"API rate limit hit, pausing prayer times requests for {delay:.1f}s")
+            raise PrayerAPIRateLimit("API rate limit exceeded", retry_after=delay)
+
+        if response.status_code >= 500:
+            self.breaker.record_failure()
+        else:
+            # 4xx means the API is up and answering (e.g. unknown city)
+            self.breaker.record_success()
+        try:
+            response.raise_for_status()
+        except requests.HTTPError as e:
+            response.close()
+            logger.error(f"HTTP error {response.status_code}: {e}")
+            raise PrayerAPIResponseError(f"API HTTP error: {e}")
+        return response
+
+    def get_json(self, url, params, max_retries=None):
+        """GET url and return the decoded JSON body."""
+        response = self._get(url, params, max_retries)
+        _count_api_traffic(bytes=len(response.content))
+        try:
+            return response.json()
+        except ValueError as e:
+            logger.error(f"Invalid API response format: {e}")
+            raise PrayerAPIResponseError(f"Failed to parse API response: {e}")
+
+    def iter_json_array(self, url, params, key="data", max_retries=None):
+        """GET url and yield the elements of its top-level `key` array as
+        they arrive, without holding the whole response in memory."""
+        response = self._get(url, params, max_retries, stream=True)
+        received = 0
+
+        def chunks():
+            nonlocal received
+            for chunk in response.iter_content(CALENDAR_STREAM_CHUNK_BYTES):
+                received += len(chunk)
+                yield chunk
+
+        try:
+            yield from iter_json_array(chunks(), key)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            self.breaker.record_failure()
+            raise PrayerAPIConnectionError(f"Connection lost while reading API response: {e}")
+        except ValueError as e:
+            logger.error(f"Invalid API response format: {e}")
+            raise PrayerAPIResponseError(f"Failed to parse API response: {e}")
+        finally:
+            response.close()
+            _count_api_traffic(bytes=received)
+
+    @staticmethod
+    def _retry_after(response):
+        try:
+            return max(0.0, float(response.headers["Retry-After"]))
+        except (KeyError, TypeError, ValueError):
+            return None
 
-    result = {}
-    if rows:
-        for row in rows:
-            result[row[0]] = {
-                "Fajr": row[1], "Dhuhr": row[2], "Asr": row[3],
-                "Maghrib": row[4], "Isha": row[5]
-            }
-    return result
+    def state(self):
+        """Circuit breaker and rate limiter state for diagnostics."""
+        return {"circuit": self.breaker.state(), "rate_limiter": self.limiter.state()}
 
 
-# =====================================================================
-# API EXCEPTIONS
-# =====================================================================
+_aladhan_client = AladhanClient(
+    RateLimiter(API_RATE_LIMIT_PER_SECOND, API_RATE_LIMIT_BURST),
+    CircuitBreaker(API_CIRCUIT_FAILURE_THRESHOLD, API_CIRCUIT_RESET_SECONDS,
+                   API_CIRCUIT_MAX_RESET_SECONDS)
+)
 
-class PrayerAPIException(Exception):
-    """Base exception for prayer API errors."""
-    pass
 
-class PrayerAPIConnectionError(PrayerAPIException):
-    """Connection to API failed."""
-    pass
+def get_api_client_state():
+    """State of the shared prayer times API client (circuit, rate limiter)."""
+    return _aladhan_client.state()
 
-class PrayerAPIResponseError(PrayerAPIException):
-    """Invalid or malformed API response."""
-    pass
 
-class PrayerAPIRateLimit(PrayerAPIException):
-    """API rate limit exceeded."""
-    pass
+def close_http_sessions():
+    """Close pooled HTTP connections (e.g. on shutdown)."""
+    with _http_sessions_lock:
+        for session in _http_sessions.values():
+            session.close()
+        _http_sessions.clear()
 
 
 # =====================================================================
@@ -361,72 +1937,100 @@ def clean_timezone_suffix(s):
     return re.sub(r"\s*\(?[A-Z]{2,4}\)?\s*$", "", s).strip()
 
 
-def fetch_prayer_times_from_api(date, city, country="", max_retries=None):
+# "05:03", "05:03 (CST)", "5:03 am"
+_TIME_PATTERN = re.compile(r"\s*(\d{1,2}):(\d{2})(?:\s*([AaPp])[Mm])?")
+
+
+def parse_time_minutes(value):
+    """Minutes since midnight for an "HH:MM"-style string (or an int).
+
+    Accepts a trailing timezone suffix and 12-hour AM/PM times.
+
+    Raises:
+        ValueError: If the value is not a time of day (00:00 to 23:59)
+    """
+    if isinstance(value, int):
+        if 0 <= value < 24 * 60:
+            return value
+        raise ValueError(f"Invalid time: {value!r}")
+    match = _TIME_PATTERN.match(value) if isinstance(value, str) else None
+    if match is None:
+        raise ValueError(f"Invalid time: {value!r}")
+    hours, minutes, meridiem = match.groups()
+    hours, minutes = int(hours), int(minutes)
+    if hours >= (13 if meridiem else 24) or minutes >= 60:
+        raise ValueError(f"Invalid time: {value!r}")
+    if meridiem:
+        hours = hours % 12 + (12 if meridiem in "Pp" else 0)
+    return hours * 60 + minutes
+
+
+def normalize_times(times):
+    """The five prayer times of a day as a tuple of minutes since midnight."""
+    return tuple(parse_time_minutes(times[prayer]) for prayer in PRAYER_NAMES)
+
+
+def format_time_24h(minutes):
+    """Format minutes since midnight as "HH:MM" (None if out of range)."""
+    if not isinstance(minutes, int):
+        return minutes
+    return _HHMM_STRINGS[minutes] if 0 <= minutes < 24 * 60 else None
+
+
+@functools.lru_cache(maxsize=2048)
+def format_time_12h(value):
+    """Format a time ("HH:MM" or minutes since midnight) as "hh:mm AM/PM"."""
+    minutes = parse_time_minutes(value)
+    hours = minutes // 60
+    return f"{(hours - 1) % 12 + 1:02d}:{minutes % 60:02d} {'AM' if hours < 12 else 'PM'}"
+
+
+def fetch_prayer_times_from_api(date, city, country="", max_retries=None, store=True):
     """Fetch prayer times from API for a single date."""
+    record = fetch_prayer_day_from_api(date, city, country, max_retries)
+    if store:
+        store_prayer_times_many([record], api_hijri=True)
+    return record[4]
+
+
+def fetch_prayer_day_from_api(date, city, country="", max_retries=None):
+    """Fetch a single day from the API without storing it.
+
+    Returns:
+        tuple: (date, hijri_date, city, country, times) record for store_prayer_times_many
+    """
     if max_retries is None:
         max_retries = API_MAX_RETRIES
     
     params = {
         "city": city, "country": country, "method": API_METHOD,
-        "date": date.strftime("%d-%m-%Y"), "school": API_SCHOOL
+        "date": date.strftime("%d-%m-%Y"), "school": API_SCHOOL, "calendarMethod": "HJCoSA",
     }
     
-    for attempt in range(max_retries):
-        try:
-            response = requests.get(API_URL_SINGLE, params=params, timeout=API_TIMEOUT)
-            
-            if response.status_code == 429:
-                raise PrayerAPIRateLimit("API rate limit exceeded")
-            
-            response.raise_for_status()
-            
-            response_json = response.json()["data"]
-            data = response_json["timings"]
-            greg_date_str = response_json["date"]["gregorian"]["date"]
-            hijri_date_str = response_json["date"]["hijri"]["date"]
-            
-            date_obj = datetime.strptime(greg_date_str, "%d-%m-%Y").date()
+    try:
+        response_json = _aladhan_client.get_json(API_URL_SINGLE, params, max_retries)["data"]
+        data = response_json["timings"]
+        greg_date_str = response_json["date"]["gregorian"]["date"]
+        hijri_date_str = response_json["date"]["hijri"]["date"]
+        
+        date_obj = datetime.strptime(greg_date_str, "%d-%m-%Y").date()
 
-            times = {
-                "Fajr": convert_to_24hr(data["Fajr"]),
-                "Dhuhr": convert_to_24hr(data["Dhuhr"]),
-                "Asr": convert_to_24hr(data["Asr"]),
-                "Maghrib": convert_to_24hr(data["Maghrib"]),
-                "Isha": convert_to_24hr(data["Isha"])
-            }
+        times = dict(zip(PRAYER_NAMES, map(format_time_24h, normalize_times(data))))
 
-            store_prayer_times(date_obj, hijri_date_str, city, times)
-            logger.info(f"Successfully fetched prayer times for {city}, {country} on {date}")
-            return times
-            
-        except requests.ConnectionError as e:
-            logger.warning(f"Connection error (attempt {attempt + 1}/{max_retries}): {e}")
-            if attempt < max_retries - 1:
-                wait_time = API_BACKOFF_BASE ** attempt
-                time.sleep(wait_time)
-            else:
-                raise PrayerAPIConnectionError(f"Failed to connect after {max_retries} attempts: {e}")
-                
-        except requests.HTTPError as e:
-            if e.response.status_code == 429:
-                raise PrayerAPIRateLimit(f"API rate limit exceeded: {e}")
-            logger.error(f"HTTP error {e.response.status_code}: {e}")
-            raise PrayerAPIResponseError(f"API HTTP error: {e}")
-            
-        except requests.Timeout as e:
-            logger.warning(f"Request timeout (attempt {attempt + 1}/{max_retries}): {e}")
-            if attempt < max_retries - 1:
-                continue
-            else:
-                raise PrayerAPIConnectionError(f"Request timeout after {max_retries} attempts: {e}")
-                
-        except (KeyError, ValueError) as e:
-            logger.error(f"Invalid API response format: {e}")
-            raise PrayerAPIResponseError(f"Failed to parse API response: {e}")
+        _count_api_traffic(days=1)
+        logger.info(f"Successfully fetched prayer times for {city}, {country} on {date}")
+        return date_obj, hijri_date_str, city, country, times
+        
+    except PrayerAPIException:
+        raise
             
-        except Exception as e:
-            logger.error(f"Unexpected error fetching prayer times: {e}", exc_info=True)
-            raise PrayerAPIException(f"Unexpected error: {e}")
+    except (KeyError, ValueError) as e:
+        logger.error(f"Invalid API response format: {e}")
+        raise PrayerAPIResponseError(f"Failed to parse API response: {e}")
+        
+    except Exception as e:
+        logger.error(f"Unexpected error fetching prayer times: {e}", exc_info=True)
+        raise PrayerAPIException(f"Unexpected error: {e}")
 
 
 def fetch_prayer_times_range(start_date, end_date, city, country="", max_retries=None):
@@ -441,119 +2045,311 @@ def fetch_prayer_times_range(start_date, end_date, city, country="", max_retries
         "school": API_SCHOOL, "calendarMethod": "HJCoSA", "iso8601": "false",
     }
 
-    for attempt in range(max_retries):
-        try:
-            response = requests.get(url, params=params, timeout=API_TIMEOUT)
-            
-            if response.status_code == 429:
-                raise PrayerAPIRateLimit("API rate limit exceeded")
+    try:
+        # Days are parsed while the response downloads and written in batches
+        records = []
+        stored = 0
+        for day_data in _aladhan_client.iter_json_array(url, params, "data", max_retries):
+            greg_date_str = day_data["date"]["gregorian"]["date"]
+            hijri_date_str = day_data['date']['hijri']['date']
+            date_obj = datetime.strptime(greg_date_str, "%d-%m-%Y").date()
+            times = dict(zip(PRAYER_NAMES, normalize_times(day_data["timings"])))
+            records.append((date_obj, hijri_date_str, city, country, times))
+            if len(records) >= CALENDAR_BATCH_DAYS:
+                stored += store_prayer_times_many(records, params["method"], params["school"], api_hijri=True)
+                records = []
+
+        stored += store_prayer_times_many(records, params["method"], params["school"], api_hijri=True)
+        _count_api_traffic(days=stored)
+        logger.info(f"Successfully stored prayer times for {city} between {start_date} and {end_date}")
+        return True
+        
+    except PrayerAPIException:
+        raise
             
-            response.raise_for_status()
-            data = response.json()
+    except (KeyError, ValueError) as e:
+        logger.error(f"Invalid API response format: {e}")
+        raise PrayerAPIResponseError(f"Failed to parse API response: {e}")
+        
+    except Exception as e:
+        logger.error(f"Unexpected error fetching prayer times range: {e}", exc_info=True)
+        raise PrayerAPIException(f"Unexpected error: {e}")
 
-            for day_data in data.get("data", []):            
-                greg_date_str = day_data["date"]["gregorian"]["date"]
-                hijri_date_str = day_data['date']['hijri']['date']
-                date_obj = datetime.strptime(greg_date_str, "%d-%m-%Y").date()
-                timings = day_data["timings"]
-                
-                times = {
-                    "Fajr": convert_to_24hr(clean_timezone_suffix(timings["Fajr"])),
-                    "Dhuhr": convert_to_24hr(clean_timezone_suffix(timings["Dhuhr"])),
-                    "Asr": convert_to_24hr(clean_timezone_suffix(timings["Asr"])),
-                    "Maghrib": convert_to_24hr(clean_timezone_suffix(timings["Maghrib"])),
-                    "Isha": convert_to_24hr(clean_timezone_suffix(timings["Isha"]))
-                }
-                store_prayer_times(date_obj, hijri_date_str, city, times)
-            
-            logger.info(f"Successfully stored prayer times for {city} between {start_date} and {end_date}")
-            return True
-            
-        except requests.HTTPError as e:
-            if e.response.status_code == 429:
-                raise PrayerAPIRateLimit(f"API rate limit exceeded: {e}")
-            logger.error(f"HTTP error {e.response.status_code}: {e}")
-            raise PrayerAPIResponseError(f"API HTTP error: {e}")
-            
-        except requests.ConnectionError as e:
-            logger.warning(f"Connection error (attempt {attempt + 1}/{max_retries}): {e}")
-            if attempt < max_retries - 1:
-                wait_time = API_BACKOFF_BASE ** attempt
-                time.sleep(wait_time)
-            else:
-                raise PrayerAPIConnectionError(f"Failed to connect after {max_retries} attempts: {e}")
-                
-        except requests.Timeout as e:
-            logger.warning(f"Request timeout (attempt {attempt + 1}/{max_retries}): {e}")
-            if attempt < max_retries - 1:
-                wait_time = API_BACKOFF_BASE ** attempt
-                time.sleep(wait_time)
-            else:
-                raise PrayerAPIConnectionError(f"Request timeout after {max_retries} attempts: {e}")
-                
-        except (KeyError, ValueError) as e:
-            logger.error(f"Invalid API response format: {e}")
-            raise PrayerAPIResponseError(f"Failed to parse API response: {e}")
-            
-        except Exception as e:
-            logger.error(f"Unexpected error fetching prayer times range: {e}", exc_info=True)
-            raise PrayerAPIException(f"Unexpected error: {e}")
 
+def ensure_future_data(city, country="", days=None, start_date=None, cross_check=None):
+    """Ensure prayer times for the next N days are available.
 
-def ensure_future_data(city, country="", days=None):
-    """Ensure prayer times for the next N days are available."""
+    Days are computed locally when the city's coordinates are known;
+    otherwise they are fetched from the API, and at most API_PREFETCH_DAYS
+    ahead so the window can actually be filled. Days the local engine
+    cannot compute (polar day or night) are fetched from the API as well.
+
+    Args:
+        cross_check: Compare the first computed day against the API
+            (a network request); defaults to API_CROSS_CHECK
+    """
     if days is None:
         days = PREFETCH_DAYS
+    if cross_check is None:
+        cross_check = API_CROSS_CHECK
+    local = can_calculate_locally(city, country)
+    if not local:
+        days = min(days, API_PREFETCH_DAYS)
     
-    today = datetime.now().date()
+    today = start_date or get_clock().today()
     end_date = today + timedelta(days=days)
+    method, school = API_METHOD, API_SCHOOL
 
-    existing = get_prayer_times_range_from_db(today, end_date, city)
-    logger.debug(f"Database check for {city}: Found {len(existing)} dates between {today} and {end_date}")
-
-    missing_dates = []
-    for i in range(days):
-        date = today + timedelta(days=i)
-        if date.strftime("%Y-%m-%d") not in existing:
-            missing_dates.append(date)
+    missing_dates = find_missing_dates(city, country, today, days, method, school)
 
     if not missing_dates:
         logger.info(f"All data present for {city} between {today} and {end_date}")
         return True
 
-    logger.info(f"Missing {len(missing_dates)} dates for {city}. Fetching...")
-    
-    range_start = min(missing_dates)
-    range_end = max(missing_dates)
+    if local:
+        missing = set(missing_dates)
+        records = [r for r in compute_prayer_times_range([(city, country)], today, days, method, school)
+                   if r[0] in missing]
+        stored = store_prayer_times_many(records, method, school)
+        logger.info(f"Computed {stored} dates locally for {city}")
+        if cross_check and records:
+            cross_check_prayer_times(records[0][0], city, country)
+        computed = {r[0] for r in records}
+        api_end = today + timedelta(days=API_PREFETCH_DAYS)
+        missing_dates = [d for d in missing_dates if d not in computed and d < api_end]
+        if not missing_dates:
+            return True
+        logger.info(f"{len(missing_dates)} dates for {city} cannot be computed locally, using the API")
+
+    ranges = plan_fetch_ranges(missing_dates)
+    fetched_days = sum((end - start).days + 1 for start, end in ranges)
+    span_days = (max(missing_dates) - min(missing_dates)).days + 1
+    _count_api_traffic(requests_saved=len(missing_dates) - len(ranges),
+                       days_not_refetched=span_days - fetched_days)
+    logger.info(f"Missing {len(missing_dates)} dates for {city}. Fetching {fetched_days} days "
+                f"in {len(ranges)} request(s) instead of {span_days} days in one span")
     
-    try:
-        success = fetch_prayer_times_range(range_start, range_end, city, country)
-        if success:
-            logger.info(f"Successfully prefetched {len(missing_dates)} dates for {city}")
-        return success
-    except PrayerAPIConnectionError as e:
-        logger.warning(f"Range fetch failed, fallback to individual fetches: {e}")
-        successful_count = 0
-        for date in missing_dates:
+    missing = set(missing_dates)
+    fetched_count = 0
+    for range_start, range_end in ranges:
+        try:
+            fetch_prayer_times_range(range_start, range_end, city, country)
+            fetched_count += sum(1 for d in missing if range_start <= d <= range_end)
+        except PrayerAPICircuitOpen as e:
+            logger.warning(f"Skipping prefetch for {city}: {e}")
+            return fetched_count > 0
+        except PrayerAPIConnectionError as e:
+            logger.warning(f"Range fetch failed, fallback to individual fetches: {e}")
+            records = []
+            for date in sorted(d for d in missing if range_start <= d <= range_end):
+                try:
+                    records.append(fetch_prayer_day_from_api(date, city, country))
+                except PrayerAPIException as e:
+                    logger.error(f"Failed to fetch {date} for {city}: {e}")
+                    if isinstance(e, (PrayerAPIRateLimit, PrayerAPICircuitOpen)):
+                        break
+            fetched_count += store_prayer_times_many(records, method, school, api_hijri=True)
+        except PrayerAPIRateLimit as e:
+            logger.warning(f"Prefetch for {city} rate limited: {e}")
+            return False
+        except PrayerAPIException as e:
+            logger.error(f"Failed to fetch {range_start}..{range_end} for {city}: {e}")
+        except Exception as e:
+            logger.error(f"Unexpected error ensuring future data: {e}", exc_info=True)
+            return fetched_count > 0
+
+    logger.info(f"Prefetch complete for {city}: {fetched_count}/{len(missing_dates)} dates fetched")
+    return fetched_count > 0
+
+
+def plan_fetch_ranges(missing_dates, merge_gap=None):
+    """Group missing dates into (start, end) ranges for calendar requests.
+
+    Consecutive dates form one range, and two ranges separated by at most
+    merge_gap stored days are joined so one request replaces two. Ranges
+    never cross a month boundary, so each maps onto a calendar month.
+    """
+    if merge_gap is None:
+        merge_gap = API_GAP_MERGE_DAYS
+    ranges = []
+    for day in sorted(set(missing_dates)):
+        if ranges:
+            start, end = ranges[-1]
+            if (day - end).days <= merge_gap + 1 and (day.year, day.month) == (start.year, start.month):
+                ranges[-1] = (start, day)
+                continue
+        ranges.append((day, day))
+    return ranges
+
+
+def find_missing_dates(city, country, start_date, days, method=None, school=None):
+    """Dates in [start_date, start_date + days) with no stored prayer times."""
+    end_date = start_date + timedelta(days=days)
+    existing = get_prayer_times_range_from_db(start_date, end_date, city, country, method, school)
+    logger.debug(f"Database check for {city}: Found {len(existing)} dates between {start_date} and {end_date}")
+    missing = []
+    for i in range(days):
+        day = start_date + timedelta(days=i)
+        if day.strftime("%Y-%m-%d") not in existing:
+            missing.append(day)
+    return missing
+
+
+_prefetch_stop = threading.Event()
+
+
+def stop_prefetch():
+    """Make ensure_future_data_many calls stop before their next location.
+
+    Called at shutdown; requests already in flight finish, and later
+    calls return without fetching.
+    """
+    _prefetch_stop.set()
+
+
+def ensure_future_data_many(locations, days=None, start_date=None, max_workers=None, progress=None):
+    """Ensure prayer times for several (city, country) locations.
+
+    Locations the local engine knows are computed together in one batch.
+    The rest, and known locations with days the engine cannot compute,
+    are fetched from the API on up to max_workers daemon
+    threads, so a prefetch never holds up interpreter exit. All requests
+    share the global rate limiter; once it pauses after a 429, the
+    remaining locations fail fast and are left for the next prefetch.
+
+    Args:
+        locations: Iterable of (city, country) pairs
+        progress: Optional callback(done, total, (city, country), ok),
+            called from worker threads
+
+    Returns:
+        dict: {(city, country): bool} success per location; locations
+        skipped after stop_prefetch() are left out
+    """
+    if days is None:
+        days = PREFETCH_DAYS
+    if max_workers is None:
+        max_workers = PREFETCH_MAX_WORKERS
+    today = start_date or get_clock().today()
+    method, school = API_METHOD, API_SCHOOL
+    locations = list(dict.fromkeys((city, country) for city, country in locations))
+    results = {}
+    lock = threading.Lock()
+
+    def report(location, ok):
+        with lock:
+            results[location] = ok
+            done = len(results)
+        if progress:
             try:
-                fetch_prayer_times_from_api(date, city, country)
-                successful_count += 1
-            except PrayerAPIException as e:
-                logger.error(f"Failed to fetch {date} for {city}: {e}")
-        logger.info(f"Prefetch fallback complete: {successful_count}/{len(missing_dates)} dates fetched")
-        return successful_count > 0
-    except PrayerAPIRateLimit:
-        logger.error(f"API rate limit exceeded while fetching data for {city}")
-        return False
-    except Exception as e:
-        logger.error(f"Unexpected error ensuring future data: {e}", exc_info=True)
-        return False
+                progress(done, len(locations), location, ok)
+            except Exception as e:
+                logger.warning(f"Prefetch progress callback failed: {e}")
+
+    local, remote = [], []
+    for location in locations:
+        (local if can_calculate_locally(*location) else remote).append(location)
+
+    missing = {}
+    for location in local:
+        dates = find_missing_dates(*location, today, days, method, school)
+        if dates:
+            missing[location] = set(dates)
+        else:
+            report(location, True)
+    if missing:
+        records = [r for r in compute_prayer_times_range(list(missing), today, days, method, school)
+                   if r[0] in missing[(r[2], r[3])]]
+        try:
+            store_prayer_times_many(records, method, school)
+            logger.info(f"Computed {len(records)} days locally for {len(missing)} locations")
+            ok = True
+        except Exception as e:
+            logger.error(f"Failed to store computed prayer times: {e}")
+            ok = False
+        computed = {}
+        for r in records:
+            computed.setdefault((r[2], r[3]), set()).add(r[0])
+        for location, dates in missing.items():
+            if ok and not dates <= computed.get(location, set()):
+                remote.append(location)  # Polar days, left to ensure_future_data's API fallback
+            else:
+                report(location, ok)
+
+    def fetch(location):
+        city, country = location
+        try:
+            ok = ensure_future_data(city, country, days=days, start_date=today)
+        except Exception as e:
+            logger.error(f"Prefetch failed for {city}: {e}", exc_info=True)
+            ok = False
+        report(location, ok)
+
+    def fetch_remaining():
+        while not _prefetch_stop.is_set():
+            try:
+                location = pending.get_nowait()
+            except queue.Empty:
+                return
+            fetch(location)
+
+    if remote:
+        pending = queue.Queue()
+        for location in remote:
+            pending.put(location)
+        threads = [threading.Thread(target=fetch_remaining, name=f"prefetch-{i}", daemon=True)
+                   for i in range(min(max_workers, len(remote)))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    if _prefetch_stop.is_set() and len(results) < len(locations):
+        logger.info(f"Prefetch stopped with {len(locations) - len(results)} locations left")
+    succeeded = sum(results.values())
+    logger.info(f"Prefetch complete: {succeeded}/{len(locations)} locations ready")
+    return results
+
+
+def cross_check_prayer_times(date, city, country, tolerance_minutes=None):
+    """Compare locally computed prayer times against the API.
+
+    Returns:
+        dict: {prayer: difference in minutes (local - API)}, or None if the check failed
+    """
+    if tolerance_minutes is None:
+        tolerance_minutes = CROSS_CHECK_TOLERANCE_MINUTES
+
+    computed = compute_prayer_times_for_city(date, city, country)
+    if computed is None:
+        return None
+    local_times, _ = computed
+
+    try:
+        api_times = fetch_prayer_times_from_api(date, city, country, store=False)
+    except PrayerAPIException as e:
+        logger.warning(f"Cross-check skipped for {city} on {date}: {e}")
+        return None
+
+    differences = {}
+    for prayer in PRAYER_NAMES:
+        try:
+            differences[prayer] = parse_time_minutes(local_times[prayer]) - parse_time_minutes(api_times[prayer])
+        except (KeyError, ValueError):
+            continue
+
+    worst = max((abs(d) for d in differences.values()), default=0)
+    if worst > tolerance_minutes:
+        logger.warning(f"Local prayer times for {city} on {date} differ from API by up to {worst} min: {differences}")
+    else:
+        logger.info(f"Local prayer times for {city} on {date} match API (max difference {worst} min)")
+    return differences
 
 
 def get_location_from_ip():
     """Get user's location from IP address."""
     try:
-        response = requests.get('https://ipapi.co/json/', timeout=5)
+        response = get_http_session(1).get('https://ipapi.co/json/')
         response.raise_for_status()
         
         data = response.json()
@@ -574,6 +2370,35 @@ def get_location_from_ip():
         return None
 
 
+def geocode_location(city, country):
+    """Resolve a location to (latitude, longitude, timezone).
+
+    Built-in and previously stored locations are answered without a
+    request; otherwise Nominatim is asked once and the result stored.
+
+    Returns:
+        tuple: (latitude, longitude, timezone or None), or None if not found
+    """
+    coordinates = CITY_COORDINATES.get(country, {}).get(city) or get_location_from_db(city, country)
+    if coordinates:
+        return coordinates
+
+    response = get_http_session().get(
+        GEOCODING_API_URL,
+        params={"city": city, "country": country, "format": "json"}
+    )
+    response.raise_for_status()
+    geo_data = response.json()
+    if not geo_data:
+        return None
+
+    latitude = float(geo_data[0]["lat"])
+    longitude = float(geo_data[0]["lon"])
+    store_location(city, country, latitude, longitude)
+    logger.info(f"Geocoded {city}, {country} to ({latitude}, {longitude})")
+    return latitude, longitude, None
+
+
 def validate_location(location, country_cities):
     """Validate and sanitize location against available cities."""
     if not location:
@@ -661,9 +2486,10 @@ def get_current_time_with_offset():
     Returns:
         datetime: Current time plus any configured offset
     
-    Note: This is used instead of datetime.now() to allow time testing.
+    Note: This is used instead of datetime.now() to allow time testing;
+    the time itself comes from get_clock().
     """
-    now = datetime.now()
+    now = get_clock().now()
     if TIME_OFFSET["hours"] != 0 or TIME_OFFSET["minutes"] != 0:
         now = now + timedelta(hours=TIME_OFFSET["hours"], minutes=TIME_OFFSET["minutes"])
         offset_str = f"+{TIME_OFFSET['hours']}h {TIME_OFFSET['minutes']}m"
@@ -671,6 +2497,52 @@ def get_current_time_with_offset():
     return now
 
 
+class DaySchedule:
+    """One day's prayer times, parsed once and sorted for fast lookups.
+    
+    Built from the {"Fajr": "HH:MM", ...} dicts returned by
+    calculate_prayer_times (minutes since midnight are accepted too);
+    unparseable entries are skipped.
+    """
+    __slots__ = ("date", "names", "times")
+    
+    def __init__(self, day, times):
+        entries = []
+        for prayer in PRAYER_NAMES:
+            try:
+                entries.append((parse_time_minutes(times[prayer]), prayer))
+            except (KeyError, ValueError):
+                continue
+        entries.sort()
+        midnight = datetime.combine(day, datetime.min.time())
+        self.date = day
+        self.names = tuple(prayer for _, prayer in entries)
+        self.times = tuple(midnight + timedelta(minutes=m) for m, _ in entries)
+    
+    def __len__(self):
+        return len(self.names)
+    
+    def time_of(self, prayer):
+        """Datetime of a prayer, or None if it is not in the schedule."""
+        try:
+            return self.times[self.names.index(prayer)]
+        except ValueError:
+            return None
+    
+    def next_after(self, moment):
+        """First (prayer, datetime) at or after moment, or None."""
+        idx = bisect.bisect_left(self.times, moment)
+        if idx < len(self.times):
+            return self.names[idx], self.times[idx]
+        return None
+    
+    def between(self, start, end):
+        """All (prayer, datetime) pairs with start <= time <= end."""
+        lo = bisect.bisect_left(self.times, start)
+        hi = bisect.bisect_right(self.times, end)
+        return list(zip(self.names[lo:hi], self.times[lo:hi]))
+
+
 def save_settings(settings):
     """Save settings to JSON file in data cache."""
     try:
@@ -707,7 +2579,8 @@ def load_settings():
         "linux_max_volume": False,
         "settings_dialog_geometry": None,
         "time_offset_hours": 0,
-        "time_offset_minutes": 0
+        "time_offset_minutes": 0,
+        "prefetch_locations": []  # Extra [city, country] pairs kept warm
     }
     
     try:
@@ -738,21 +2611,33 @@ def load_settings():
     return defaults
 
 
-def calculate_prayer_times(date, location):
-    """Calculate prayer times for a given date and location."""
+def calculate_prayer_times(date, location, allow_network=True):
+    """Calculate prayer times for a given date and location.
+
+    With allow_network=False only the database and the local calculation
+    are used, and None is returned when the times would need the API.
+    The API_CROSS_CHECK request is skipped too. The GUI thread uses this
+    and hands the network path and the cross-check to a worker.
+    """
     city = location.get("city", "")
     country = location.get("country", "")
     
-    times = get_prayer_times_from_db(date, city)
+    times = get_prayer_times_from_db(date, city, country)
 
     if times:
         logger.debug(f"Found prayer times for {city} in database for {date}")
         return times
 
+    if not allow_network:
+        if not can_calculate_locally(city, country):
+            return None
+        ensure_future_data(city=city, country=country, days=7, start_date=date, cross_check=False)
+        return get_prayer_times_from_db(date, city, country)
+
     logger.info(f"No data found for {city}, {country} on {date}. Attempting to fetch...")
     try:
-        ensure_future_data(city=city, country=country, days=7)
-        times = get_prayer_times_from_db(date, city)
+        ensure_future_data(city=city, country=country, days=7, start_date=date)
+        times = get_prayer_times_from_db(date, city, country)
         if times:
             logger.info(f"Successfully fetched prayer times for {city}, {country} on {date}")
             return times
@@ -775,11 +2660,14 @@ def calculate_prayer_times(date, location):
 def cleanup_old_prayer_data(retention_days=DEFAULT_DATA_RETENTION_DAYS):
     """Delete prayer data older than retention_days."""
     try:
-        cutoff_date = (datetime.now() - timedelta(days=retention_days)).strftime("%Y-%m-%d")
+        cutoff_date = (get_clock().now() - timedelta(days=retention_days)).strftime("%Y-%m-%d")
         
-        with _db_manager.get_cursor() as cursor:
+        with _db_manager.get_cursor(write=True) as cursor:
             cursor.execute("DELETE FROM prayer_times WHERE date < ?", (cutoff_date,))
             deleted_count = cursor.rowcount
+            deleted_count += _cleanup_packed_months(cursor, cutoff_date)
+            cursor.execute("DELETE FROM hijri_dates WHERE date < ?", (cutoff_date,))
+        _day_cache.invalidate_before(cutoff_date)
         
         if deleted_count > 0:
             logger.info(f"[OK] Cleaned up {deleted_count} old prayer records (older than {retention_days} days)")
@@ -792,6 +2680,29 @@ def cleanup_old_prayer_data(retention_days=DEFAULT_DATA_RETENTION_DAYS):
         raise
 
 
+def _cleanup_packed_months(cursor, cutoff_date):
+    """Drop packed days before cutoff_date; returns the number of days removed."""
+    cursor.execute("""
+        SELECT city, country, method, school, month, days FROM prayer_months WHERE month <= ?
+    """, (cutoff_date[:7],))
+    deleted, updates = 0, []
+    for *key, month, days in cursor.fetchall():
+        kept = bytearray(days)
+        for date_str, _, _ in _iter_packed_days(month, days):
+            if date_str < cutoff_date:
+                offset = (int(date_str[8:10]) - 1) * _DAY_SLOT.size
+                kept[offset:offset + _DAY_SLOT.size] = _EMPTY_MONTH[:_DAY_SLOT.size]
+                deleted += 1
+        if kept != days:
+            updates.append((bytes(kept), *key, month))
+    cursor.executemany("""
+        UPDATE prayer_months SET days = ?
+        WHERE city=? AND country=? AND method=? AND school=? AND month=?
+    """, updates)
+    cursor.execute("DELETE FROM prayer_months WHERE days = ?", (_EMPTY_MONTH,))
+    return deleted
+
+
 def get_database_size():
     """Get current database size in MB."""
     try:
@@ -808,9 +2719,13 @@ def get_database_size():
 def clear_all_prayer_data():
     """Completely clear all prayer data from database."""
     try:
-        with _db_manager.get_cursor() as cursor:
+        with _db_manager.get_cursor(write=True) as cursor:
+            deleted_count = _packed_stats(cursor)[0]
+            cursor.execute("DELETE FROM prayer_months")
             cursor.execute("DELETE FROM prayer_times")
-            deleted_count = cursor.rowcount
+            deleted_count += cursor.rowcount
+            cursor.execute("DELETE FROM hijri_dates")
+        _day_cache.clear()
         
         logger.info(f"[OK] Cleared all prayer data ({deleted_count} records deleted)")
         return deleted_count
@@ -823,26 +2738,34 @@ def get_prayer_data_stats():
     """Get statistics about stored prayer data."""
     try:
         with _db_manager.get_cursor() as cursor:
-            # Total records
-            cursor.execute("SELECT COUNT(*) FROM prayer_times")
-            total_records = cursor.fetchone()[0]
-            
-            # Unique cities
-            cursor.execute("SELECT COUNT(DISTINCT city) FROM prayer_times")
-            unique_cities = cursor.fetchone()[0]
-            
-            # Date range
-            cursor.execute("SELECT MIN(date), MAX(date) FROM prayer_times")
-            result = cursor.fetchone()
-            earliest_date = result[0] if result[0] else "N/A"
-            latest_date = result[1] if result[1] else "N/A"
+            if DB_STORAGE_LAYOUT == "packed":
+                total_records, unique_cities, earliest, latest = _packed_stats(cursor)
+                earliest_date = earliest or "N/A"
+                latest_date = latest or "N/A"
+            else:
+                # Total records
+                cursor.execute("SELECT COUNT(*) FROM prayer_times")
+                total_records = cursor.fetchone()[0]
+                
+                # Unique cities
+                cursor.execute("SELECT COUNT(DISTINCT city) FROM prayer_times")
+                unique_cities = cursor.fetchone()[0]
+                
+                # Date range
+                cursor.execute("SELECT MIN(date), MAX(date) FROM prayer_times")
+                result = cursor.fetchone()
+                earliest_date = result[0] if result[0] else "N/A"
+                latest_date = result[1] if result[1] else "N/A"
         
         return {
             "total_records": total_records,
             "unique_cities": unique_cities,
             "earliest_date": earliest_date,
             "latest_date": latest_date,
-            "database_size_mb": get_database_size()
+            "database_size_mb": get_database_size(),
+            "storage_layout": DB_STORAGE_LAYOUT,
+            "day_cache": _day_cache.stats(),
+            "api": get_api_stats()
         }
     except Exception as e:
         logger.error(f"Error getting prayer data stats: {e}")
@@ -898,144 +2821,174 @@ def get_weather_description(weather_code):
     return codes.get(weather_code, "Unknown")
 
 
+def next_weather_window_start(now):
+    """Start of the next morning/evening weather fetch window after now."""
+    candidates = []
+    for day_offset in (0, 1):
+        day = now.date() + timedelta(days=day_offset)
+        for hour in (WEATHER_MORNING_HOUR, WEATHER_EVENING_HOUR):
+            start = datetime.combine(day, datetime.min.time()).replace(hour=hour)
+            if start > now:
+                candidates.append(start)
+    return min(candidates)
+
+
+def current_weather_window_start(now):
+    """Start of the morning/evening fetch window containing now, or None."""
+    for hour, length in ((WEATHER_MORNING_HOUR, WEATHER_MORNING_WINDOW),
+                         (WEATHER_EVENING_HOUR, WEATHER_EVENING_WINDOW)):
+        if hour <= now.hour < hour + length:
+            return now.replace(hour=hour, minute=0, second=0, microsecond=0)
+    return None
+
+
+def get_cached_weather(city, country):
+    """Return (data, fetched_at) of the last weather fetch, or None.
+
+    Reads memory first, then the weather_cache table, so data survives
+    restarts. Entries older than WEATHER_CACHE_MAX_STALE_HOURS are ignored.
+    Never makes a network request.
+    """
+    key = (city, country)
+    with _weather_cache_lock:
+        cached = _weather_cache.get(key)
+    if cached is None:
+        try:
+            with _db_manager.get_cursor() as cursor:
+                cursor.execute("SELECT data, fetched_at FROM weather_cache WHERE city = ? AND country = ?",
+                               key)
+                row = cursor.fetchone()
+        except Exception as e:
+            logger.warning(f"Failed to read cached weather for {city}: {e}")
+            row = None
+        if row is None:
+            return None
+        try:
+            cached = (json.loads(row[0]), row[1])
+        except (TypeError, ValueError):
+            return None
+        with _weather_cache_lock:
+            _weather_cache[key] = cached
+    if get_clock().timestamp() - cached[1] > WEATHER_CACHE_MAX_STALE_HOURS * 3600:
+        return None
+    return cached
+
+
+def store_weather(city, country, data, fetched_at=None):
+    """Cache weather in memory and on disk, evicting entries too old to show."""
+    now = get_clock().timestamp()
+    if fetched_at is None:
+        fetched_at = now
+    with _weather_cache_lock:
+        _weather_cache[(city, country)] = (data, fetched_at)
+    cutoff = now - WEATHER_CACHE_MAX_STALE_HOURS * 3600
+    try:
+        with _db_manager.get_cursor(write=True) as cursor:
+            cursor.execute("""
+                INSERT OR REPLACE INTO weather_cache (city, country, data, fetched_at)
+                VALUES (?, ?, ?, ?)
+            """, (city, country, json.dumps(data), fetched_at))
+            cursor.execute("DELETE FROM weather_cache WHERE fetched_at < ?", (cutoff,))
+    except Exception as e:
+        logger.warning(f"Failed to persist weather for {city}: {e}")
+    with _weather_cache_lock:
+        for key in [k for k, v in _weather_cache.items() if v[1] < cutoff]:
+            del _weather_cache[key]
+
+
+def is_weather_refresh_due(fetched_at, now=None):
+    """Whether weather fetched at fetched_at (epoch seconds) should be refetched.
+
+    Data past WEATHER_CACHE_TTL_HOURS is refreshed at any time; otherwise
+    only once per morning/evening window.
+    """
+    now = now or get_clock().now()
+    if now.timestamp() - fetched_at >= WEATHER_CACHE_TTL_HOURS * 3600:
+        return True
+    window_start = current_weather_window_start(now)
+    return window_start is not None and fetched_at < window_start.timestamp()
+
+
 def fetch_weather(city, country):
     """Fetch weather from Open-Meteo API (FREE, no key needed).
     
-    First fetch is allowed anytime to initialize cache.
-    Subsequent fetches only happen during morning (6-9 AM) and evening (6-9 PM).
-    Returns cached data outside these windows.
+    Cached weather is returned without a request unless it is past its TTL
+    or a morning (6-9 AM) / evening (6-9 PM) window has opened since it
+    was fetched. If a refresh fails, the cached (possibly stale) data is
+    returned instead.
     """
-    cache_key = f"{city}:{country}"
-    now = datetime.now()
-    current_hour = now.hour
-    
-    # Check if we're in a fetch window (morning 6-9 AM or evening 6-9 PM)
-    in_morning_window = WEATHER_MORNING_HOUR <= current_hour < WEATHER_MORNING_HOUR + WEATHER_MORNING_WINDOW
-    in_evening_window = WEATHER_EVENING_HOUR <= current_hour < WEATHER_EVENING_HOUR + WEATHER_EVENING_WINDOW
-    in_fetch_window = in_morning_window or in_evening_window
-    
-    # Check if cache exists
-    cache_exists = cache_key in _weather_cache
-    
-    # Allow fetch if: (1) no cache exists yet, or (2) we're in a fetch window and haven't fetched this period yet
-    if cache_exists:
-        # Cache exists - check if we should fetch new data
-        if in_fetch_window:
-            # We're in a fetch window - check if already fetched in this window today
-            fetch_key = f"{cache_key}:{now.strftime('%Y-%m-%d')}"
-            period = "morning" if in_morning_window else "evening"
-            fetch_key_with_period = f"{fetch_key}:{period}"
-            
-            if fetch_key_with_period not in _weather_fetch_times:
-                # Time to fetch new data in this window
-                should_fetch = True
-            else:
-                # Already fetched in this window today
-                should_fetch = False
-        else:
-            # Outside fetch windows - use cache
-            should_fetch = False
-    else:
-        # No cache exists yet - always fetch to initialize
-        should_fetch = True
+    cached = get_cached_weather(city, country)
+    if cached is not None and not is_weather_refresh_due(cached[1]):
+        hours_old = (get_clock().timestamp() - cached[1]) / 3600
+        logger.debug(f"Using cached weather for {city} ({hours_old:.1f}h old)")
+        return cached[0]
+    fallback = cached[0] if cached else None
     
-    if should_fetch:
-        # Fetch new data
-        try:
-            # Get coordinates from city name
-            geo_response = requests.get(
-                "https://nominatim.openstreetmap.org/search",
-                params={"city": city, "country": country, "format": "json"},
-                timeout=WEATHER_TIMEOUT,
-                headers={"User-Agent": "PrayerApp/1.0"}
-            )
-            geo_response.raise_for_status()
-            geo_data = geo_response.json()
-            
-            if not geo_data:
-                logger.warning(f"Location not found: {city}, {country}")
-                # Return cached if available
-                if cache_key in _weather_cache:
-                    return _weather_cache[cache_key][0]
-                return None
-            
-            latitude = float(geo_data[0]["lat"])
-            longitude = float(geo_data[0]["lon"])
-            
-            # Fetch weather using Open-Meteo (current conditions + daily forecast)
-            weather_response = requests.get(
-                "https://api.open-meteo.com/v1/forecast",
-                params={
-                    "latitude": latitude,
-                    "longitude": longitude,
-                    "current": "temperature_2m,relative_humidity_2m,wind_speed_10m",
-                    "daily": "temperature_2m_max,temperature_2m_min",
-                    "temperature_unit": "fahrenheit"
-                },
-                timeout=WEATHER_TIMEOUT
-            )
-            weather_response.raise_for_status()
-            response_data = weather_response.json()
-            current = response_data["current"]
-            daily = response_data["daily"]
-            
-            # Validate daily data exists
-            if (not daily.get("temperature_2m_max") or not daily.get("temperature_2m_min") or
-                len(daily["temperature_2m_max"]) == 0 or len(daily["temperature_2m_min"]) == 0):
-                logger.warning(f"Incomplete daily temperature data for {city}")
-                if cache_key in _weather_cache:
-                    return _weather_cache[cache_key][0]
-                return None
-            
-            result = {
-                "temp_high": int(daily["temperature_2m_max"][0]),
-                "temp_low": int(daily["temperature_2m_min"][0]),
-                "humidity": current["relative_humidity_2m"],
-                "wind_speed": round(current["wind_speed_10m"], 1),
-                "unit": "°F"
+    try:
+        # Get coordinates from city name (stored after the first lookup)
+        coordinates = geocode_location(city, country)
+        
+        if not coordinates:
+            logger.warning(f"Location not found: {city}, {country}")
+            return fallback
+        
+        latitude, longitude, timezone = coordinates
+        
+        # Fetch weather using Open-Meteo (current conditions + daily forecast)
+        weather_response = get_http_session().get(
+            WEATHER_API_URL,
+            params={
+                "latitude": latitude,
+                "longitude": longitude,
+                "current": "temperature_2m,relative_humidity_2m,wind_speed_10m",
+                "daily": "temperature_2m_max,temperature_2m_min",
+                "temperature_unit": "fahrenheit",
+                "timezone": timezone or "auto"
             }
-            
-            # Cache result
-            _weather_cache[cache_key] = (result, time.time())
-            
-            # Mark as fetched in this time window if we're in one
-            if in_fetch_window:
-                fetch_key = f"{cache_key}:{now.strftime('%Y-%m-%d')}"
-                period = "morning" if in_morning_window else "evening"
-                fetch_key_with_period = f"{fetch_key}:{period}"
-                _weather_fetch_times[fetch_key_with_period] = True
-                period = "[MORNING]" if in_morning_window else "[EVENING]"
-                logger.info(f"{period} Weather fetched for {city}: {result['temp_high']}°F/{result['temp_low']}°F")
-            else:
-                logger.info(f"Initial weather fetched for {city}: {result['temp_high']}°F/{result['temp_low']}°F")
-            
-            return result
-            
-        except requests.exceptions.Timeout:
-            logger.warning(f"Weather API timeout for {city}")
-            # Return cached if available
-            if cache_key in _weather_cache:
-                return _weather_cache[cache_key][0]
-            return None
-        except requests.exceptions.RequestException as e:
-            logger.warning(f"Weather API error: {e}")
-            if cache_key in _weather_cache:
-                return _weather_cache[cache_key][0]
-            return None
-        except Exception as e:
-            logger.error(f"Unexpected error fetching weather: {e}", exc_info=True)
-            if cache_key in _weather_cache:
-                return _weather_cache[cache_key][0]
-            return None
-    else:
-        # Return cached data
-        if cache_key in _weather_cache:
-            cached_data, timestamp = _weather_cache[cache_key]
-            hours_old = (time.time() - timestamp) / 3600
-            logger.debug(f"Using cached weather for {city} ({hours_old:.1f}h old)")
-            return cached_data
+        )
+        weather_response.raise_for_status()
+        response_data = weather_response.json()
+        current = response_data["current"]
+        daily = response_data["daily"]
         
-        return None
+        # Remember the timezone so the location can be calculated offline
+        if not timezone and response_data.get("timezone") not in (None, "GMT"):
+            store_location(city, country, latitude, longitude, response_data["timezone"])
+        
+        # Validate daily data exists
+        if (not daily.get("temperature_2m_max") or not daily.get("temperature_2m_min") or
+            len(daily["temperature_2m_max"]) == 0 or len(daily["temperature_2m_min"]) == 0):
+            logger.warning(f"Incomplete daily temperature data for {city}")
+            return fallback
+        
+        result = {
+            "temp_high": int(daily["temperature_2m_max"][0]),
+            "temp_low": int(daily["temperature_2m_min"][0]),
+            "humidity": current["relative_humidity_2m"],
+            "wind_speed": round(current["wind_speed_10m"], 1),
+            "unit": "°F"
+        }
+        
+        store_weather(city, country, result)
+        
+        window = current_weather_window_start(get_clock().now())
+        if window is not None:
+            period = "[MORNING]" if window.hour == WEATHER_MORNING_HOUR else "[EVENING]"
+            logger.info(f"{period} Weather fetched for {city}: {result['temp_high']}°F/{result['temp_low']}°F")
+        else:
+            logger.info(f"Weather fetched for {city}: {result['temp_high']}°F/{result['temp_low']}°F")
+        
+        return result
+        
+    except requests.exceptions.Timeout:
+        logger.warning(f"Weather API timeout for {city}")
+        return fallback
+    except requests.exceptions.RequestException as e:
+        logger.warning(f"Weather API error: {e}")
+        return fallback
+    except Exception as e:
+        logger.error(f"Unexpected error fetching weather: {e}", exc_info=True)
+        return fallback
 
 
 def set_system_volume_linux(volume_percent=100):
@@ -7,10 +7,15 @@ import tkinter as tk
 from tkinter import simpledialog, messagebox, ttk
 import datetime
 import threading
-import pygame
 import os
 import sys
 import math
+import time
+import heapq
+import itertools
+import queue
+import wave
+import collections
 from datetime import timedelta
 
 from . import core
@@ -46,6 +51,8 @@ COUNTRY_CITIES = {
 
 logger = core.get_logger(__name__)
 
+pygame = None  # Imported on first use, see load_pygame()
+
 
 # =====================================================================
 # DIALOGS
@@ -390,15 +397,9 @@ class SettingsDialog(simpledialog.Dialog):
         if not os.path.exists(audio_path):
             messagebox.showerror("Error", f"{audio_name} file not found: {audio_path}")
             return
-        try:
-            volume = self.volume_var.get()
-            pygame.mixer.music.load(audio_path)
-            pygame.mixer.music.set_volume(volume)
-            pygame.mixer.music.play()
-            logger.info(f"Testing {audio_name} at volume {int(volume * 100)}%")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to play {audio_name}: {str(e)}")
-            logger.error(f"Error playing test audio: {e}")
+        volume = self.volume_var.get()
+        self.parent_window.prayer_frame.audio.preview(audio_path, volume)
+        logger.info(f"Testing {audio_name} at volume {int(volume * 100)}%")
     
     def select_athan_file(self):
         """Select custom athan audio file."""
@@ -483,7 +484,14 @@ class SettingsDialog(simpledialog.Dialog):
             stats_text = f"Total Records: {stats.get('total_records', 0)}\n"
             stats_text += f"Unique Cities: {stats.get('unique_cities', 0)}\n"
             stats_text += f"Data Range: {stats.get('earliest_date', 'N/A')} to {stats.get('latest_date', 'N/A')}\n"
-            stats_text += f"Database Size: {stats.get('database_size_mb', 0)} MB"
+            stats_text += f"Database Size: {stats.get('database_size_mb', 0)} MB\n"
+            circuit = core.get_api_client_state()["circuit"]
+            stats_text += f"Prayer API: {circuit['state'].replace('_', '-')}"
+            if circuit["state"] == "open":
+                stats_text += f" (retry in {circuit['retry_in']:.0f}s)"
+            audio_latency = self.parent_window.prayer_frame.audio.latency_summary()
+            if audio_latency:
+                stats_text += f"\nLast alert audio: {audio_latency}"
             
             stats_label = tk.Label(data_frame, text=stats_text, font=("Segoe UI", 9), fg="#000000", justify="left")
             stats_label.grid(row=4, column=0, columnspan=2, sticky="nw", padx=10, pady=10)
@@ -638,13 +646,9 @@ class SettingsDialog(simpledialog.Dialog):
             
             messagebox.showinfo("Refreshing", f"Fetching prayer times for {city}...\nPlease wait.")
             
-            # Fetch fresh data
-            threading.Thread(
-                target=core.ensure_future_data,
-                args=(city, country),
-                kwargs={"days": 30},
-                daemon=True
-            ).start()
+            # Fetch fresh data in background
+            self.parent_window.worker.submit(core.ensure_future_data, city, country,
+                                             days=core.PREFETCH_DAYS, key=("refresh", city, country))
             
             messagebox.showinfo("Success", f"Prayer times refresh started for {city}.")
             logger.info(f"Initiated prayer times refresh for {city}, {country}")
@@ -709,6 +713,406 @@ class PrayerMenu:
         messagebox.showinfo("Settings", "Settings dialog not implemented yet.")
 
 
+# =====================================================================
+# SCHEDULER
+# =====================================================================
+
+class TkScheduler:
+    """Heap-based job scheduler multiplexed onto a single Tk after() callback.
+    
+    Jobs are identified by name: scheduling a name that is already pending
+    replaces it, so each periodic task has at most one pending wake-up. Only
+    the earliest job has a live Tk timer, and the loop sleeps until then.
+    
+    Delays are in app-clock time (core.get_clock()). Under an accelerated
+    VirtualClock the Tk timers are shortened to match; under a stopped one
+    no timers are set, and a driver advances the clock to next_due() and
+    calls run_due() itself.
+    """
+    
+    # Jobs due within this many seconds of a wake-up run in the same pass
+    COALESCE_SECONDS = 0.005
+    
+    def __init__(self, widget):
+        self.widget = widget
+        self._heap = []  # (due, seq, name)
+        self._jobs = {}  # name -> (due, seq, callback)
+        self._seq = itertools.count()
+        self._after_id = None
+        self._armed_due = None
+    
+    def schedule(self, name, delay_ms, callback):
+        """Run callback after delay_ms, replacing any pending job with this name."""
+        due = core.get_clock().monotonic() + max(0, delay_ms) / 1000
+        seq = next(self._seq)
+        self._jobs[name] = (due, seq, callback)
+        heapq.heappush(self._heap, (due, seq, name))
+        self._arm()
+    
+    def schedule_at(self, name, when, callback):
+        """Run callback at a wall-clock datetime (app time, including offset)."""
+        delay = (when - core.get_current_time_with_offset()).total_seconds()
+        self.schedule(name, int(delay * 1000), callback)
+    
+    def cancel(self, name):
+        """Cancel a pending job; unknown names are ignored."""
+        self._jobs.pop(name, None)
+    
+    def is_pending(self, name):
+        return name in self._jobs
+    
+    def pending(self):
+        """Names of all pending jobs."""
+        return sorted(self._jobs)
+    
+    def next_due(self):
+        """Clock monotonic() time of the earliest pending job, or None."""
+        self._discard_stale()
+        return self._heap[0][0] if self._heap else None
+    
+    def run_due(self):
+        """Run all jobs that are due now, outside the Tk timer."""
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+        self._run_due()
+    
+    def _discard_stale(self):
+        while self._heap:
+            due, seq, name = self._heap[0]
+            job = self._jobs.get(name)
+            if job is not None and job[1] == seq:
+                return
+            heapq.heappop(self._heap)
+    
+    def _arm(self):
+        """Make sure a Tk timer is set for the earliest pending job."""
+        self._discard_stale()
+        if not self._heap:
+            return
+        due = self._heap[0][0]
+        if self._after_id is not None:
+            if self._armed_due <= due:
+                return
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+        clock = core.get_clock()
+        delay = clock.real_seconds(due - clock.monotonic())
+        if delay is None:
+            return  # Stopped virtual clock: run_due() is called by its driver
+        self._after_id = self.widget.after(max(0, int(round(delay * 1000))), self._run_due)
+        self._armed_due = due
+    
+    def _run_due(self):
+        self._after_id = None
+        self._armed_due = None
+        deadline = core.get_clock().monotonic() + self.COALESCE_SECONDS
+        while self._heap and self._heap[0][0] <= deadline:
+            due, seq, name = heapq.heappop(self._heap)
+            job = self._jobs.get(name)
+            if job is None or job[1] != seq:
+                continue
+            del self._jobs[name]
+            try:
+                job[2]()
+            except Exception as e:
+                logger.error(f"Scheduled job '{name}' failed: {e}", exc_info=True)
+        self._arm()
+
+
+class BackgroundWorker:
+    """Runs blocking calls (network fetches) off the Tk thread.
+    
+    Jobs run on a small pool of daemon threads; their results are posted to
+    a thread-safe queue that a "worker_poll" scheduler job drains on the Tk
+    thread, so callbacks may touch widgets. The poll job only exists while
+    jobs are in flight. Jobs submitted with a key that is already in flight
+    are dropped instead of being queued twice.
+    
+    Under a stopped VirtualClock each poll first waits for every job in
+    flight to finish, so results arrive at the same clock time however long
+    the jobs take in real time and a stepped simulation stays deterministic.
+    """
+    
+    POLL_MS = 50
+    
+    def __init__(self, scheduler, num_threads=2):
+        self.scheduler = scheduler
+        self._jobs = queue.Queue()
+        self._results = queue.Queue()
+        self._in_flight = set()
+        self._pending = 0  # Submitted jobs whose results have not been polled
+        self._finished = threading.Condition()
+        for i in range(num_threads):
+            threading.Thread(target=self._work, name=f"worker-{i}", daemon=True).start()
+    
+    def submit(self, func, *args, key=None, on_success=None, on_error=None, **kwargs):
+        """Run func(*args, **kwargs) in the background.
+        
+        on_success(result) or on_error(exception) is called on the Tk thread.
+        
+        Returns:
+            bool: False if a job with the same key is already in flight
+        """
+        if key is not None:
+            if key in self._in_flight:
+                logger.debug(f"Background job '{key}' already in flight")
+                return False
+            self._in_flight.add(key)
+        self._pending += 1
+        self._jobs.put((key, func, args, kwargs, on_success, on_error))
+        if not self.scheduler.is_pending("worker_poll"):
+            self.scheduler.schedule("worker_poll", self.POLL_MS, self._poll)
+        return True
+    
+    def is_busy(self, key):
+        return key in self._in_flight
+    
+    def wait_idle(self, timeout=None):
+        """Block until every submitted job has posted its result.
+        
+        Returns:
+            bool: False if timeout (seconds) passed first
+        """
+        with self._finished:
+            return self._finished.wait_for(lambda: self._results.qsize() >= self._pending, timeout)
+    
+    def _work(self):
+        while True:
+            key, func, args, kwargs, on_success, on_error = self._jobs.get()
+            try:
+                result = func(*args, **kwargs)
+                self._results.put((key, on_success, result))
+            except Exception as e:
+                self._results.put((key, on_error, e))
+                if on_error is None:
+                    logger.error(f"Background job {func.__name__} failed: {e}", exc_info=True)
+            with self._finished:
+                self._finished.notify_all()
+    
+    def _poll(self):
+        if core.get_clock().real_seconds(self.POLL_MS / 1000) is None:
+            self.wait_idle()
+        while True:
+            try:
+                key, callback, value = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._pending -= 1
+            self._in_flight.discard(key)
+            if callback is not None:
+                try:
+                    callback(value)
+                except Exception as e:
+                    logger.error(f"Background job callback failed: {e}", exc_info=True)
+        if self._pending:
+            self.scheduler.schedule("worker_poll", self.POLL_MS, self._poll)
+
+
+# =====================================================================
+# AUDIO
+# =====================================================================
+
+def load_pygame():
+    """Import pygame on first use; it is one of the slowest imports at startup."""
+    global pygame
+    if pygame is None:
+        import pygame as module
+        pygame = module
+    return pygame
+
+
+class AudioPlayer:
+    """Alert audio playback on a dedicated thread.
+    
+    All mixer work happens on the "audio" thread, started by start(): it
+    imports pygame and initializes the mixer, then consumes a command
+    queue (commands sent before start() wait there): configure() decodes changed files into pygame Sounds once (at
+    startup and on settings change), and play() starts a sequence of
+    assets such as athan -> dua. The next clip of a sequence is handed to
+    the channel with Channel.queue as soon as the previous one starts, so
+    SDL chains them without waiting on the Tk main loop. A file pygame
+    cannot decode as a Sound is streamed with mixer.music instead, and the
+    clip after it starts when the thread sees the stream end.
+    
+    For every clip the delay between its scheduled start (the play()
+    request, or the expected end of the previous clip) and its actual
+    start is kept in metrics.
+    """
+    
+    WATCH_INTERVAL = 0.01  # Seconds between checks while a sequence plays
+    METRICS_SIZE = 50
+    
+    def __init__(self, volume=1.0):
+        self.volume = volume
+        self.paths = {}
+        self.metrics = collections.deque(maxlen=self.METRICS_SIZE)
+        self._clips = {}  # name -> decoded Sound, or path to stream
+        self._commands = queue.Queue()
+        self._channel = None
+        self._label = None  # Sequence currently playing
+        self._sequence = 0
+        self._chain = []  # (name, clip) still to play
+        self._queued = False  # _chain[0] is queued on the channel
+        self._streaming = False
+        self._expected = None  # perf_counter() the next clip should start at
+        self._thread = None
+    
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="audio", daemon=True)
+            self._thread.start()
+    
+    def configure(self, paths, volume=None):
+        """Set asset name -> file path; only changed files are reloaded."""
+        self._commands.put(("configure", dict(paths), volume))
+    
+    def play(self, names, label=None):
+        """Play the named assets one after another, replacing current playback."""
+        self._commands.put(("play", list(names), label or names[0], time.perf_counter()))
+    
+    def preview(self, path, volume):
+        """Stream a file at the given volume, replacing current playback."""
+        self._commands.put(("preview", path, volume))
+    
+    def latency_summary(self):
+        """Start latencies of the most recent sequence, e.g. "athan +2 ms, dua +11 ms"."""
+        metrics = list(self.metrics)
+        if not metrics:
+            return None
+        sequence = metrics[-1]["sequence"]
+        return ", ".join(f"{m['clip']} +{m['latency_ms']:.0f} ms" for m in metrics if m["sequence"] == sequence)
+    
+    def _run(self):
+        start = time.perf_counter()
+        try:
+            load_pygame()
+            pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
+            pygame.mixer.music.set_volume(self.volume)
+        except Exception as e:
+            logger.error(f"Failed to initialize pygame mixer, alert audio disabled: {e}")
+            return
+        logger.info(f"Pygame mixer initialized in {(time.perf_counter() - start) * 1000:.0f} ms")
+        while True:
+            try:
+                command = self._commands.get(timeout=self.WATCH_INTERVAL if self._label else None)
+            except queue.Empty:
+                command = None
+            try:
+                if command is not None:
+                    getattr(self, f"_{command[0]}")(*command[1:])
+                if self._label:
+                    self._watch()
+            except Exception as e:
+                logger.error(f"❌ Audio error: {e}", exc_info=True)
+                self._label = None
+    
+    def _configure(self, paths, volume):
+        if volume is not None:
+            self.volume = volume
+            pygame.mixer.music.set_volume(volume)
+            for clip in self._clips.values():
+                if not isinstance(clip, str):
+                    clip.set_volume(volume)
+        for name, path in paths.items():
+            if self.paths.get(name) != path:
+                self.paths[name] = path
+                self._clips.pop(name, None)
+                self._decode(name)
+    
+    def _decode(self, name):
+        path = self.paths.get(name)
+        if not path or not os.path.exists(path):
+            logger.error(f"❌ {name} audio file MISSING: {path}")
+            return None
+        start = time.perf_counter()
+        try:
+            sound = pygame.mixer.Sound(path)
+        except pygame.error as e:
+            logger.warning(f"⚠️ Could not preload {name} audio ({e}); it will stream from disk")
+            self._clips[name] = path
+            return path
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        logger.info(f"✅ {name} audio preloaded ({sound.get_length():.1f}s decoded in {elapsed_ms:.0f} ms): {path}")
+        sound.set_volume(self.volume)
+        self._clips[name] = sound
+        return sound
+    
+    def _play(self, names, label, requested):
+        self._stop()
+        # Pre-roll: decode anything configure() could not before starting
+        clips = [(name, self._clips.get(name) or self._decode(name)) for name in names]
+        self._chain = [(name, clip) for name, clip in clips if clip is not None]
+        if self._chain:
+            self._label = label
+            self._sequence += 1
+            self._start(*self._chain.pop(0), requested)
+    
+    def _preview(self, path, volume):
+        self._stop()
+        pygame.mixer.music.load(path)
+        pygame.mixer.music.set_volume(volume)
+        pygame.mixer.music.play()
+    
+    def _stop(self):
+        if self._channel is not None:
+            self._channel.stop()
+        pygame.mixer.music.stop()
+        self._label = None
+        self._chain = []
+        self._queued = False
+    
+    def _start(self, name, clip, scheduled):
+        self._streaming = isinstance(clip, str)
+        if self._streaming:
+            pygame.mixer.music.load(clip)
+            pygame.mixer.music.play()
+            length = self._probe_length(clip)
+        else:
+            if self._channel is None:
+                self._channel = pygame.mixer.Channel(0)
+            self._channel.play(clip)
+            length = clip.get_length()
+        self._started(name, scheduled, length)
+    
+    def _started(self, name, scheduled, length):
+        now = time.perf_counter()
+        latency_ms = max(0.0, (now - scheduled) * 1000)
+        self.metrics.append({"sequence": self._sequence, "label": self._label, "clip": name,
+                             "latency_ms": latency_ms, "started": core.get_clock().now()})
+        logger.info(f"🔊 {self._label}: {name} started {latency_ms:.1f} ms after schedule")
+        self._expected = now + length if length is not None else None
+        if self._chain and not self._streaming and not isinstance(self._chain[0][1], str):
+            self._channel.queue(self._chain[0][1])
+            self._queued = True
+    
+    def _watch(self):
+        if self._queued:
+            if self._channel.get_queue() is not None:
+                return
+            # The queued clip has taken over the channel (or it was stopped)
+            self._queued = False
+            name, clip = self._chain.pop(0)
+            if self._channel.get_busy():
+                self._started(name, self._expected or time.perf_counter(), clip.get_length())
+                return
+        elif pygame.mixer.music.get_busy() if self._streaming else self._channel.get_busy():
+            return
+        elif self._chain:
+            self._start(*self._chain.pop(0), self._expected or time.perf_counter())
+            return
+        logger.info(f"✅ {self._label} audio finished")
+        self._label = None
+    
+    @staticmethod
+    def _probe_length(path):
+        """Duration of a WAV file from its header, without decoding it."""
+        try:
+            with wave.open(path) as wav:
+                return wav.getnframes() / wav.getframerate()
+        except (wave.Error, EOFError, OSError):
+            return None
+
+
 # =====================================================================
 # PRAYER TIMES DISPLAY WIDGET
 # =====================================================================
@@ -717,32 +1121,38 @@ class PrayerTimesFrame(tk.Frame):
     """Frame displaying daily prayer times."""
     
     PRAYERS = ["Fajr", "Dhuhr", "Asr", "Maghrib", "Isha"]
-    now = datetime.datetime.now()
+    WEATHER_RETRY_MS = 60000
+    ALERT_RECHECK_MS = 300000  # Upper bound between alert checks
+    MIDNIGHT_MARGIN = datetime.timedelta(milliseconds=50)  # Never wake just before midnight
     
-    def __init__(self, master=None, date=None, location=None, show_weather=True, weather_label=None, prayer_alerts=None, audio_volume=1.0):
+    def __init__(self, master=None, date=None, location=None, show_weather=True, weather_label=None, prayer_alerts=None, audio_volume=1.0,
+                 scheduler=None, worker=None, audio_files=None):
         super().__init__(master, bg="#000000")
+        self.scheduler = scheduler or TkScheduler(self)
+        self.worker = worker or BackgroundWorker(self.scheduler)
         self.date = date
         self.show_weather = show_weather
         self.weather_label = weather_label
         self.weather_data = None
         self.prayer_alerts = prayer_alerts or {"Fajr": True, "Dhuhr": True, "Asr": True, "Maghrib": True, "Isha": True}
         self.audio_volume = audio_volume
-        
-        try:
-            pygame.mixer.quit()
-            pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
-            pygame.mixer.music.set_volume(audio_volume)
-            logger.info("Pygame mixer initialized successfully")
-            self._test_audio_files()
-        except Exception as e:
-            logger.error(f"Failed to initialize pygame mixer: {e}")
+        # Not started here: MainWindow starts audio once the window has painted
+        self.audio = AudioPlayer(audio_volume)
+        if audio_files is None:
+            audio_files = {name: str(core.PROJECT_ROOT / path) for name, path in core.AUDIO_FILES.items()}
+        self.audio.configure(audio_files)
         
         if location is None:
             location = core.get_validated_location(COUNTRY_CITIES)
         self.location = location
         self.labels = {}
         self.alerted_prayers = set()
+        self.alerts_day = date
+        self.last_alert_check = None  # App time of the previous check_prayer_alerts
+        self.cross_checked_day = None
         self.current_times = {}
+        self.schedule = None
+        self.tomorrow_schedule = None
         
         self.next_prayer_label = tk.Label(
             self, text="", font=("Segoe UI", 32, "bold"),
@@ -759,59 +1169,73 @@ class PrayerTimesFrame(tk.Frame):
         self.check_prayer_alerts()
         self.schedule_midnight_reset()
         self.pack_propagate(False)
-        self.update_clock()
         
-        # Load weather asynchronously after app initializes (after 500ms)
+        # Show the last known weather right away, then refresh it
+        # asynchronously after the app initializes (after 500ms)
         if self.show_weather:
-            self.after(500, self.update_weather_async)
+            self.show_cached_weather()
+            self.scheduler.schedule("weather", 500, self.update_weather_async)
+
+    def show_cached_weather(self):
+        """Display cached weather for the current location without a request.
+        
+        Returns:
+            bool: True if cached weather was shown
+        """
+        cached = core.get_cached_weather(self.location["city"], self.location["country"])
+        if cached is None:
+            return False
+        self.weather_data = cached[0]
+        self._display_weather()
+        return True
+
+    def _display_weather(self):
+        if self.weather_data and self.show_weather and self.weather_label:
+            high = self.weather_data["temp_high"]
+            low = self.weather_data["temp_low"]
+            humidity = self.weather_data["humidity"]
+            wind = self.weather_data["wind_speed"]
+            
+            weather_text = f"{high}°F/{low}°F | {humidity}% | {wind} mph"
+            self.weather_label.config(text=weather_text)
 
     def update_weather_async(self):
-        """Fetch weather asynchronously without blocking UI.
+        """Fetch weather on the background worker without blocking UI."""
+        location = dict(self.location)
+        self.worker.submit(
+            core.fetch_weather, location["city"], location["country"],
+            key=("weather", location["city"], location["country"]),
+            on_success=lambda data: self._on_weather(location, data),
+            on_error=lambda e: self._on_weather(location, None, e)
+        )
+
+    def _on_weather(self, location, weather_data, error=None):
+        """Show fetched weather and schedule the next fetch.
         
-        Only fetches during morning (6-9 AM) and evening (6-9 PM) windows.
-        Updates display every 30 seconds to show latest cached data.
+        Only fetches during morning (6-9 AM) and evening (6-9 PM) windows,
+        so the next check is scheduled for the start of the next window
+        (or retried shortly while there is no data, or only stale data).
         """
+        if location != self.location:
+            return  # Location changed while the fetch was in flight
+        if error is not None:
+            logger.warning(f"Failed to update weather: {error}")
         try:
-            self.weather_data = core.fetch_weather(
-                self.location["city"],
-                self.location["country"]
-            )
-            
-            if self.weather_data and self.show_weather:
-                high = self.weather_data["temp_high"]
-                low = self.weather_data["temp_low"]
-                humidity = self.weather_data["humidity"]
-                wind = self.weather_data["wind_speed"]
-                
-                weather_text = f"{high}°F/{low}°F | {humidity}% | {wind} mph"
-                self.weather_label.config(text=weather_text)
+            if weather_data is not None:
+                self.weather_data = weather_data
+            self._display_weather()
         except Exception as e:
             logger.warning(f"Failed to update weather: {e}")
         
-        # Check every 30 seconds (only fetches during morning/evening windows)
         if self.show_weather:
-            self.after(30000, self.update_weather_async)  # 30 sec = 30000 ms
-
-    def _test_audio_files(self):
-        """Test that all required audio files exist."""
-        audio_files = [
-            ("Dua", core.PROJECT_ROOT / "src/assets/dua.wav"),
-            ("Fajr Athan", core.PROJECT_ROOT / "src/assets/fajr_athan.wav"),
-            ("Regular Athan", core.PROJECT_ROOT / "src/assets/athan.wav")
-        ]
-        
-        all_exist = True
-        for name, path in audio_files:
-            if os.path.exists(path):
-                logger.info(f"✅ {name} audio file found: {path}")
+            cached = core.get_cached_weather(location["city"], location["country"])
+            if cached is None or core.is_weather_refresh_due(cached[1]):
+                self.scheduler.schedule("weather", self.WEATHER_RETRY_MS, self.update_weather_async)
             else:
-                logger.error(f"❌ {name} audio file MISSING: {path}")
-                all_exist = False
-        
-        if all_exist:
-            logger.info("✅ All audio files verified")
-        else:
-            logger.warning("⚠️ Some audio files missing")
+                # fetch_weather decides windows on the clock, not the test offset
+                now = core.get_clock().now()
+                delay = (core.next_weather_window_start(now) - now).total_seconds()
+                self.scheduler.schedule("weather", int(delay * 1000) + 1000, self.update_weather_async)
 
     def _init_labels(self):
         """Initialize prayer time label widgets."""
@@ -836,43 +1260,84 @@ class PrayerTimesFrame(tk.Frame):
             self.labels[prayer] = lbl_time
             self.prayer_frames[prayer] = frame
         
-    def update_clock(self):
-        """Update the clock label every second."""
-        PrayerTimesFrame.now = core.get_current_time_with_offset()
-        self.now = PrayerTimesFrame.now
-        self.after(1000, self.update_clock)
-
     def on_location_change(self):
         """Handle location change events."""
         self.update_times()
         self.update_next_prayer()
         self.alerted_prayers.clear()
+        self.last_alert_check = None
         
         # Refresh weather for new location
         if self.show_weather and self.weather_label:
-            self.weather_label.config(text="Loading weather...")
-            self.after(100, self.update_weather_async)
+            self.weather_data = None
+            if not self.show_cached_weather():
+                self.weather_label.config(text="Loading weather...")
+            self.scheduler.schedule("weather", 100, self.update_weather_async)
 
     def update_times(self, times=None):
-        """Update displayed prayer times."""
+        """Update displayed prayer times.
+        
+        Times come from the database or the local calculation; if they need
+        the API, the fetch runs on the background worker and the labels are
+        refreshed when it completes.
+        """
         if times is None:
             try:
-                times = core.calculate_prayer_times(self.date, self.location)
+                times = core.calculate_prayer_times(self.date, self.location, allow_network=False)
             except Exception as e:
                 logger.error(f"Error calculating prayer times: {e}")
                 times = {}
+            if times is None:
+                self._fetch_times(self.date)
+                times = {}
+            elif times and core.API_CROSS_CHECK:
+                self._cross_check(self.date)
         
         self.current_times = times
+        if times:
+            core.mark_startup("first_data")
+        self.schedule = core.DaySchedule(self.date, times) if self.date else None
+        self.tomorrow_schedule = None
         for prayer in self.PRAYERS:
             time_str = times.get(prayer, "--:--")
             try:
-                time_obj = datetime.datetime.strptime(time_str, "%H:%M")
-                formatted_time = time_obj.strftime("%I:%M %p")
-            except Exception:
+                formatted_time = core.format_time_12h(time_str)
+            except ValueError:
                 formatted_time = time_str
             self.labels[prayer].config(text=formatted_time)
         self.update_next_prayer()
 
+    def _fetch_times(self, day):
+        """Fetch prayer times for day from the API in the background."""
+        location = dict(self.location)
+        
+        def on_success(times):
+            if location != self.location or not times:
+                return
+            if day == self.date:
+                self.update_times(times)
+            elif day == self.date + timedelta(days=1):
+                self.tomorrow_schedule = core.DaySchedule(day, times)
+                self.update_next_prayer()
+        
+        def on_error(e):
+            logger.error(f"Error fetching prayer times for {day}: {e}")
+        
+        self.worker.submit(
+            core.calculate_prayer_times, day, location,
+            key=("prayer_times", day, location["city"], location["country"]),
+            on_success=on_success, on_error=on_error
+        )
+
+    def _cross_check(self, day):
+        """Compare day's local times against the API once, in the background."""
+        if day == self.cross_checked_day:
+            return
+        self.cross_checked_day = day
+        city, country = self.location["city"], self.location["country"]
+        self.worker.submit(core.cross_check_prayer_times, day, city, country,
+                           key=("cross_check", day, city, country))
+
     def format_time_delta(self, delta):
         """Convert timedelta to hours and minutes."""
         total_seconds = int(delta.total_seconds())
@@ -888,240 +1353,152 @@ class PrayerTimesFrame(tk.Frame):
             else:
                 frame.config(highlightbackground="#00FF99", highlightthickness=3)
 
+    def _schedule_for(self, day):
+        """Today's parsed schedule, rebuilt only when the day changes."""
+        if self.schedule is None or self.schedule.date != day:
+            self.schedule = core.DaySchedule(day, self.current_times)
+        return self.schedule
+
+    def _schedule_countdown(self, delta, show_seconds):
+        """Wake the countdown exactly when its displayed text changes."""
+        if show_seconds:
+            delay_ms = int((delta.total_seconds() % 1) * 1000) or 1000
+        else:
+            delay_ms = int((delta.total_seconds() % 60) * 1000) or 60000
+        self.scheduler.schedule("countdown", delay_ms + 5, self.update_next_prayer)
+
     def update_next_prayer(self):
         """Calculate and display the time remaining until next prayer."""
         now = core.get_current_time_with_offset()
-        next_prayer = None
-        min_delta = None
-
-        for prayer in self.PRAYERS:
-            time_str = self.current_times.get(prayer, "--:--")
-            try:
-                prayer_time = datetime.datetime.combine(
-                    now.date(), datetime.datetime.strptime(time_str, "%H:%M").time())
-                if prayer_time < now:
-                    continue
-                delta = prayer_time - now
-                if min_delta is None or delta < min_delta:
-                    min_delta = delta
-                    next_prayer = prayer
-            except Exception:
-                continue
+        upcoming = self._schedule_for(now.date()).next_after(now)
 
-        if next_prayer and min_delta:
+        if upcoming:
+            next_prayer, prayer_time = upcoming
+            min_delta = prayer_time - now
             total_seconds = int(min_delta.total_seconds())
             if total_seconds < 60:
                 self.next_prayer_label.config(
                     text=f"{next_prayer} in {total_seconds} seconds...")
-                self.after(1000, self.update_next_prayer)
+                self._schedule_countdown(min_delta, show_seconds=True)
             elif total_seconds < 3600:
                 minutes, seconds = divmod(total_seconds, 60)
                 self.next_prayer_label.config(
                     text=f"{next_prayer} in {minutes}m {seconds}s")
-                self.after(1000, self.update_next_prayer)
+                self._schedule_countdown(min_delta, show_seconds=True)
             else:
                 hours, minutes = self.format_time_delta(min_delta)
                 self.next_prayer_label.config(
                     text=f"{next_prayer} in {hours}h {minutes}m")
-                self.after(60000, self.update_next_prayer)
+                self._schedule_countdown(min_delta, show_seconds=False)
             self.highlight_next_prayer(next_prayer)
             return
 
         try:
-            now = core.get_current_time_with_offset()
             tomorrow = now.date() + datetime.timedelta(days=1)
-            tomorrow_times = core.calculate_prayer_times(tomorrow, self.location)
-            fajr_time_str = tomorrow_times.get("Fajr")
-
-            if fajr_time_str:
-                fajr_time = datetime.datetime.combine(
-                    tomorrow, datetime.datetime.strptime(fajr_time_str, "%H:%M").time())
+            if self.tomorrow_schedule is None or self.tomorrow_schedule.date != tomorrow:
+                tomorrow_times = core.calculate_prayer_times(tomorrow, self.location, allow_network=False)
+                if tomorrow_times is None:
+                    self.next_prayer_label.config(text="Loading tomorrow's prayer times...")
+                    self._fetch_times(tomorrow)
+                    self.scheduler.schedule("countdown", 60000, self.update_next_prayer)
+                    return
+                self.tomorrow_schedule = core.DaySchedule(tomorrow, tomorrow_times)
+            fajr_time = self.tomorrow_schedule.time_of("Fajr")
+
+            if fajr_time:
                 delta = fajr_time - now
-                total_seconds = int(delta.total_seconds())
-
                 hours, minutes = self.format_time_delta(delta)
                 self.next_prayer_label.config(
                     text=f"Fajr (tomorrow) in {hours}h {minutes}m")
-
-                if total_seconds < 3600:
-                    self.after(1000, self.update_next_prayer)
-                else:
-                    self.after(60000, self.update_next_prayer)
+                self._schedule_countdown(delta, show_seconds=False)
             else:
                 self.next_prayer_label.config(text="No prayer times available for tomorrow.")
-                self.after(60000, self.update_next_prayer)
+                self.scheduler.schedule("countdown", 60000, self.update_next_prayer)
         except Exception:
             self.next_prayer_label.config(text="Error fetching tomorrow's prayer times.")
-            self.after(60000, self.update_next_prayer)
+            self.scheduler.schedule("countdown", 60000, self.update_next_prayer)
 
     def check_prayer_alerts(self):
-        """Monitor prayer times and trigger alerts."""
+        """Monitor prayer times and trigger alerts.
+        
+        Instead of polling, the next check is scheduled for the moment the
+        next enabled prayer enters its alert window (capped at
+        ALERT_RECHECK_MS so wall-clock or offset changes are picked up).
+        """
         now = core.get_current_time_with_offset()
-        next_prayer_to_alert = None
-        min_delta = None
-
-        for prayer in self.PRAYERS:
-            time_str = self.current_times.get(prayer)
-            if not time_str:
+        schedule = self._schedule_for(now.date())
+        threshold = datetime.timedelta(seconds=core.ALERT_THRESHOLD_SECONDS)
+
+        # Alert inside the threshold before a prayer; as a failsafe, also
+        # up to 120 seconds after it if the alert window was missed since
+        # the last check. Prayers that passed before the first check (at
+        # startup or after a location change) were never due here.
+        if self.last_alert_check is None:
+            window_start = now
+        else:
+            window_start = min(now, max(now - datetime.timedelta(seconds=120), self.last_alert_check))
+        self.last_alert_check = now
+        for prayer, prayer_time in schedule.between(window_start, now + threshold):
+            if prayer in self.alerted_prayers or not self.prayer_alerts.get(prayer, True):
                 continue
-                
             try:
-                prayer_time = datetime.datetime.combine(
-                    now.date(), datetime.datetime.strptime(time_str, "%H:%M").time())
-                
-                if prayer_time < now:
-                    continue
-                
-                delta = prayer_time - now
-                seconds_until = delta.total_seconds()
-                
-                if (min_delta is None or seconds_until < min_delta) and seconds_until > 0:
-                    min_delta = seconds_until
-                    next_prayer_to_alert = prayer
-                
-                # Check if prayer is within alert threshold AND prayer alerts are enabled
-                if (0 <= seconds_until <= core.ALERT_THRESHOLD_SECONDS and 
-                    prayer not in self.alerted_prayers and 
-                    self.prayer_alerts.get(prayer, True)):
+                seconds_until = (prayer_time - now).total_seconds()
+                if seconds_until >= 0:
                     logger.info(f"🔔 Prayer alert triggered for {prayer} (in {seconds_until:.1f} seconds)")
-                    self.alert_user(prayer)
-                    self.alerted_prayers.add(prayer)
-                # Failsafe: if we missed the alert window, trigger up to 60 seconds after prayer time
-                elif (-60 <= seconds_until < 0 and 
-                    prayer not in self.alerted_prayers and 
-                    self.prayer_alerts.get(prayer, True)):
-                    logger.warning(f"⚠️ Missed alert window for {prayer}, triggering failsafe (missed by {abs(seconds_until):.1f}s)")
-                    self.alert_user(prayer)
-                    self.alerted_prayers.add(prayer)
-                # Failsafe: if we missed the alert window, trigger up to 120 seconds after prayer time
-                elif (-120 <= seconds_until < 0 and 
-                    prayer not in self.alerted_prayers and 
-                    self.prayer_alerts.get(prayer, True)):
+                else:
                     logger.warning(f"⚠️ Missed alert window for {prayer}, triggering failsafe (missed by {abs(seconds_until):.1f}s)")
-                    self.alert_user(prayer)
-                    self.alerted_prayers.add(prayer)
-                
-                 
-            except ValueError as e:
-                logger.warning(f"Error parsing prayer time '{time_str}' for '{prayer}': {e}")
-                continue
+                self.alert_user(prayer)
+                self.alerted_prayers.add(prayer)
             except Exception as e:
                 logger.error(f"Unexpected error checking alerts for {prayer}: {e}")
+
+        next_check_ms = self.ALERT_RECHECK_MS
+        for prayer, prayer_time in schedule.between(now, datetime.datetime.max):
+            if prayer in self.alerted_prayers or not self.prayer_alerts.get(prayer, True):
                 continue
-        
-        # Adaptive check interval: check more frequently when close to prayer time
-        try:
-            if min_delta is not None:
-                if min_delta < 15:
-                    # Less than 15 seconds away: check every second
-                    check_interval = 1000
-                elif min_delta < 60:
-                    # Less than 60 seconds away: check every 2 seconds
-                    check_interval = 2000
-                elif min_delta < 300:
-                    # Less than 5 minutes: check every 5 seconds
-                    check_interval = 5000
-                elif min_delta < 900:
-                    # Less than 15 minutes: check every 10 seconds
-                    check_interval = 10000
-                elif min_delta < 3600:
-                    # Less than 1 hour: check every 30 seconds
-                    check_interval = 30000
-                else:
-                    # More than 1 hour: check every 5 minutes
-                    check_interval = 300000
-                
-                self.after(check_interval, self.check_prayer_alerts)
-            else:
-                # No prayer times available, check again in 5 minutes
-                logger.warning("No upcoming prayer times found, rechecking in 5 minutes")
-                self.after(300000, self.check_prayer_alerts)
-        except Exception as e:
-            logger.error(f"Error scheduling prayer alert checks: {e}")
-            self.after(60000, self.check_prayer_alerts)
+            seconds_to_window = (prayer_time - threshold - now).total_seconds()
+            next_check_ms = min(next_check_ms, max(0, int(seconds_to_window * 1000)) + 5)
+            break
+        self.scheduler.schedule("alerts", next_check_ms, self.check_prayer_alerts)
 
     def alert_user(self, prayer):
         """Play alert sounds for prayer notification."""
         logger.info(f"🔔 Starting alert sequence for {prayer} prayer")
-        
-        dua_path = str(core.PROJECT_ROOT / "src/assets/dua.wav")
-        if prayer == "Fajr":
-            athan_path = str(core.PROJECT_ROOT / "src/assets/fajr_athan.wav")
-        else:
-            athan_path = str(core.PROJECT_ROOT / "src/assets/athan.wav")
-        
-        # Schedule audio playback in main thread using after()
-        self.play_alert_audio(athan_path, dua_path)
-
-    def play_alert_audio(self, athan_path, dua_path):
-        """Play audio files sequentially in the main thread (thread-safe)."""
-        if not os.path.exists(athan_path):
-            logger.warning(f"❌ Athan file not found: {athan_path}")
-            return
-        
-        try:
-            logger.info(f"🔊 Playing athan: {athan_path}")
-            pygame.mixer.music.load(athan_path)
-            pygame.mixer.music.play()
-            
-            # Get duration to schedule next audio
-            audio_length = pygame.mixer.Sound(athan_path).get_length()
-            delay_ms = int(audio_length * 1000) + 500  # Add 500ms buffer
-            
-            # Schedule dua playback after athan finishes
-            self.after(delay_ms, lambda: self.play_dua_audio(dua_path))
-            logger.info(f"✅ Athan scheduled (duration: {audio_length:.1f}s)")
-            
-        except pygame.error as e:
-            logger.error(f"❌ Pygame error loading athan: {e}")
-        except Exception as e:
-            logger.error(f"❌ Error playing athan: {e}")
-
-    def play_dua_audio(self, dua_path):
-        """Play dua audio file."""
-        if not os.path.exists(dua_path):
-            logger.warning(f"❌ Dua file not found: {dua_path}")
-            return
-        
-        try:
-            logger.info(f"🔊 Playing dua: {dua_path}")
-            pygame.mixer.music.load(dua_path)
-            pygame.mixer.music.play()
-            logger.info(f"✅ Dua playing")
-            
-        except pygame.error as e:
-            logger.error(f"❌ Pygame error loading dua: {e}")
-        except Exception as e:
-            logger.error(f"❌ Error playing dua: {e}")
+        self.audio.play(["fajr_athan" if prayer == "Fajr" else "athan", "dua"], label=prayer)
 
     def schedule_midnight_reset(self):
-        """Schedule daily reset of prayer alerts at midnight."""
+        """Schedule the daily reset of prayer alerts just after midnight."""
         now = core.get_current_time_with_offset()
-        tomorrow = now + datetime.timedelta(days=1)
-        next_midnight = datetime.datetime.combine(tomorrow.date(), datetime.time.min)
-        ms_until_midnight = int((next_midnight - now).total_seconds() * 1000)
-        self.after(ms_until_midnight, self._midnight_reset_wrapper)
+        next_midnight = datetime.datetime.combine(now.date() + datetime.timedelta(days=1), datetime.time.min)
+        self.scheduler.schedule_at("midnight_reset", next_midnight + self.MIDNIGHT_MARGIN,
+                                   self._midnight_reset_wrapper)
 
     def _midnight_reset_wrapper(self):
         """Wrapper for midnight reset operations."""
         self.reset_alerts()
-        self.update_times()
-        self.update_next_prayer()
-
-        now = core.get_current_time_with_offset()
-        tomorrow = now + datetime.timedelta(days=1)
-        next_midnight = datetime.datetime.combine(tomorrow.date(), datetime.time.min)
-        ms_until_midnight = int((next_midnight - now).total_seconds() * 1000)
-        self.after(ms_until_midnight, self._midnight_reset_wrapper)
+        self.schedule_midnight_reset()
+        
+    def reset_alerts(self, day=None):
+        """Reset prayer alert tracking and reload times for a new day.
         
-    def reset_alerts(self):
-        """Reset all prayer alert tracking."""
+        Idempotent per day: the frame's own midnight job and
+        MainWindow.midnight_update may both call it, but only the first
+        call for a given day does any work.
+        
+        Returns:
+            bool: True if the day was rolled over
+        """
+        day = day or core.get_current_time_with_offset().date()
+        if day == self.alerts_day:
+            return False
+        self.alerts_day = day
         self.alerted_prayers.clear()
-        self.date = core.get_current_time_with_offset().date()
+        self.date = day
         self.update_times()
-        self.update_next_prayer()
         self.check_prayer_alerts()
-        logger.info(f"Prayer alerts reset for new day ({core.get_current_time_with_offset().date()})")
+        logger.info(f"Prayer alerts reset for new day ({day})")
+        logger.debug(f"Pending scheduler jobs: {self.scheduler.pending()}")
+        return True
 
 
 # =====================================================================
@@ -1135,40 +1512,41 @@ class MainWindow(tk.Tk):
     SECOND_HAND_COLOR = "#FF5555"
 
     def __init__(self):
-        """Initialize the main application window."""
+        """Initialize the main application window.
+        
+        Only what the first frame needs runs here: settings, the database
+        and the widgets showing stored or locally computed times. Audio,
+        data fetching, maintenance and the update check start in
+        _start_background_tasks once the window has painted.
+        """
         super().__init__()
         core.init_db()
-        self._validate_assets()
+        core.mark_startup("db_open")
         
         # Load settings from cache
         saved_settings = core.load_settings()
-        
-        # Start periodic cleanup of old prayer data
-        data_retention_days = saved_settings.get("data_retention_days", core.DEFAULT_DATA_RETENTION_DAYS)
-        try:
-            # Initial cleanup on startup
-            threading.Thread(target=core.cleanup_old_prayer_data, args=(data_retention_days,), daemon=True).start()
-            # Schedule periodic cleanup every 24 hours
-            core.schedule_periodic_cleanup(data_retention_days, check_interval_hours=24)
-        except Exception as e:
-            logger.error(f"Error setting up data cleanup: {e}")
+        self.update_triggered = False
         
         self.configure(bg=self.BG_COLOR)
         self.title("Prayer Times")
         
-        self.now = PrayerTimesFrame.now
+        self.scheduler = TkScheduler(self)
+        self.worker = BackgroundWorker(self.scheduler)
+        self.now = core.get_current_time_with_offset()
 
         screen_width = self.winfo_screenwidth()
         screen_height = self.winfo_screenheight()
         self.geometry(f"{screen_width}x{screen_height}+0+0")
 
-        self.start_time = datetime.datetime.now()
-        self.last_date = datetime.datetime.now().date()
+        self.start_time = core.get_clock().now()
+        self.last_date = self.start_time.date()
         self.country_var = tk.StringVar(value=saved_settings["country"])
         self.city_var = tk.StringVar(value=saved_settings["city"])
 
         self.api_method = saved_settings["method"]
         self.api_school = saved_settings["school"]
+        core.API_METHOD = self.api_method
+        core.API_SCHOOL = self.api_school
         self.custom_font_sizes = saved_settings.get("custom_font_sizes", core.FONT_SIZES.get(core.DEFAULT_FONT_SIZE, core.FONT_SIZES["Medium"]))
         logger.info(f"🔤 Loaded custom font sizes from settings: {self.custom_font_sizes}")
         self.audio_volume = saved_settings["volume"]
@@ -1217,6 +1595,8 @@ class MainWindow(tk.Tk):
             height=self.analog_canvas_size, bg=self.BG_COLOR, highlightthickness=0
         )
         self.analog_clock.grid(row=0, column=0, rowspan=2, padx=(0, 20), sticky="nw")
+        self.draw_clock_face()
+        self.analog_clock.bind("<Configure>", self.on_clock_resize)
 
         self.clock_frame = tk.Frame(self.top_frame, bg=self.BG_COLOR)
         self.clock_frame.grid(row=0, column=1, sticky="n")
@@ -1249,24 +1629,58 @@ class MainWindow(tk.Tk):
             show_weather=saved_settings.get("show_weather", True),
             weather_label=self.weather_label,
             prayer_alerts=saved_settings.get("prayer_alerts", {"Fajr": True, "Dhuhr": True, "Asr": True, "Maghrib": True, "Isha": True}),
-            audio_volume=saved_settings.get("volume", 1.0)
+            audio_volume=saved_settings.get("volume", 1.0),
+            scheduler=self.scheduler,
+            worker=self.worker,
+            audio_files=self.audio_files()
         )
         self.prayer_frame.grid(row=1, column=0, pady=10, sticky="nsew")
         
-        # Apply saved audio volume to pygame
-        pygame.mixer.music.set_volume(self.audio_volume)
-        
-        # Load prayer data asynchronously to avoid UI freeze
-        threading.Thread(target=self.check_and_ensure_tomorrow_data,
-                        args=(self.city_var.get(), self.country_var.get()),
-                        daemon=True).start()
-        
         self.update_analog_clock()
-        self.update_clock()
+        self.scheduler.schedule("auto_restart", core.AUTO_RESTART_DAYS * 86400 * 1000, self.auto_restart)
         self.schedule_midnight_update()
         
         # Apply custom font sizes loaded from settings
         self.apply_font_sizes()
+        
+        # Idle callbacks run after pending redraws, i.e. after the first paint
+        self.after_idle(self._start_background_tasks, saved_settings)
+
+    def _start_background_tasks(self, saved_settings):
+        """Second startup stage, once the window has painted."""
+        self.update_idletasks()
+        core.mark_startup("first_paint")
+        
+        self.prayer_frame.audio.start()
+        
+        # Load prayer data asynchronously to avoid UI freeze
+        self.ensure_tomorrow_data()
+        
+        # Keep the other configured displays' locations warm
+        prefetch_locations = [tuple(loc) for loc in saved_settings.get("prefetch_locations", [])]
+        if prefetch_locations:
+            self.worker.submit(core.ensure_future_data_many, prefetch_locations,
+                               key="prefetch_locations")
+        
+        # Start periodic cleanup of old prayer data
+        try:
+            # Initial cleanup on startup
+            threading.Thread(target=core.cleanup_old_prayer_data, args=(self.data_retention_days,), daemon=True).start()
+            # Schedule periodic cleanup every 24 hours
+            core.schedule_periodic_cleanup(self.data_retention_days, check_interval_hours=24)
+        except Exception as e:
+            logger.error(f"Error setting up data cleanup: {e}")
+        
+        # Check for updates (Linux/Pi specific); if one is found the update
+        # script has been started and the app exits
+        self.worker.submit(core.check_for_updates, key="update_check",
+                           on_success=self._on_update_check)
+
+    def _on_update_check(self, triggered):
+        if triggered:
+            logger.info("Update triggered, exiting for restart")
+            self.update_triggered = True
+            self.quit()
 
     def configure_styles(self):
         """Configure ttk styles."""
@@ -1280,32 +1694,56 @@ class MainWindow(tk.Tk):
                        foreground=self.PRIMARY_COLOR, background=self.BG_COLOR,
                        anchor="e", justify="right")
 
+    def ensure_tomorrow_data(self):
+        """Make sure tomorrow's prayer times are stored, on the background worker."""
+        self.worker.submit(self.check_and_ensure_tomorrow_data,
+                           self.city_var.get(), self.country_var.get(),
+                           key="ensure_tomorrow", on_success=self._on_ensure_tomorrow)
+    
+    def _on_ensure_tomorrow(self, retry_in):
+        if retry_in:
+            logger.info(f"Retrying tomorrow's prayer times in {retry_in:.0f}s (API rate limited)")
+            self.scheduler.schedule("ensure_tomorrow", int(retry_in * 1000) + 1000, self.ensure_tomorrow_data)
+    
     def check_and_ensure_tomorrow_data(self, city, country):
-        """Ensure prayer times for tomorrow are available."""
+        """Ensure prayer times for tomorrow are available.
+        
+        Returns:
+            float: Seconds until the API accepts requests again if it was
+            rate limited, else None
+        """
         try:
             tomorrow = core.get_current_time_with_offset().date() + timedelta(days=1)
-            data = core.get_prayer_times_from_db(tomorrow, city)
+            data = core.get_prayer_times_from_db(tomorrow, city, country)
             if data is None:
                 logger.info(f"No prayer times for {city} on {tomorrow}. Fetching...")
-                core.ensure_future_data(city=city, country=country, days=30)
+                if not core.ensure_future_data(city=city, country=country):
+                    return core.get_api_client_state()["rate_limiter"]["paused_for"] or None
+        except core.PrayerAPIRateLimit as e:
+            return e.retry_after
         except core.PrayerAPIException as e:
             logger.error(f"Failed to ensure tomorrow's data: {e}")
         except Exception as e:
             logger.error(f"Unexpected error checking tomorrow's data: {e}", exc_info=True)
+        return None
     
-    def _validate_assets(self):
-        """Validate required audio assets exist."""
-        required_assets = [
-            core.PROJECT_ROOT / "src/assets/dua.wav",
-            core.PROJECT_ROOT / "src/assets/fajr_athan.wav",
-            core.PROJECT_ROOT / "src/assets/athan.wav",
-        ]
-        for asset in required_assets:
-            if not os.path.exists(asset):
-                logger.warning(f"Missing asset file: {asset}")
-
-    def update_analog_clock(self):
-        """Draw analog clock."""
+    def audio_files(self):
+        """Audio asset name -> file path for the current settings."""
+        return {"athan": self.athan_file, "fajr_athan": self.fajr_athan_file, "dua": self.dua_file}
+
+    # Hand name -> (length as a fraction of the radius, colour, width)
+    CLOCK_HANDS = {
+        "hour": (0.5, HOUR_HAND_COLOR, 5),
+        "minute": (0.7, HOUR_HAND_COLOR, 3),
+        "second": (0.9, SECOND_HAND_COLOR, 1),
+    }
+
+    def draw_clock_face(self):
+        """Draw the static clock face and (re)create the hands.
+
+        Only called at startup and when the canvas is resized; the
+        per-second tick just moves the existing hand items.
+        """
         self.analog_clock.delete("all")
         size = self.analog_canvas_size
         center = size // 2
@@ -1313,7 +1751,7 @@ class MainWindow(tk.Tk):
 
         self.analog_clock.create_oval(center - radius, center - radius,
                                      center + radius, center + radius,
-                                     outline=self.PRIMARY_COLOR, width=4)
+                                     outline=self.PRIMARY_COLOR, width=4, tags="face")
 
         for i in range(12):
             angle = math.radians(i * 30)
@@ -1322,39 +1760,51 @@ class MainWindow(tk.Tk):
             x_end = center + radius * 0.95 * math.sin(angle)
             y_end = center - radius * 0.95 * math.cos(angle)
             self.analog_clock.create_line(x_start, y_start, x_end, y_end,
-                                         fill=self.PRIMARY_COLOR, width=2)
+                                         fill=self.PRIMARY_COLOR, width=2, tags="face")
+
+        self.clock_hands = {
+            name: self.analog_clock.create_line(center, center, center, center,
+                                                fill=color, width=width, tags="hand")
+            for name, (_, color, width) in self.CLOCK_HANDS.items()
+        }
+        self.clock_center = center
+        self.clock_radius = radius
+
+    def on_clock_resize(self, event):
+        """Redraw the clock face when the canvas size actually changes."""
+        size = min(event.width, event.height)
+        if size <= 0 or size == self.analog_canvas_size:
+            return
+        self.analog_canvas_size = size
+        self.draw_clock_face()
+        self.update_analog_clock()
 
+    def update_analog_clock(self):
+        """Move the analog clock hands and refresh the digital time."""
+        self.now = core.get_current_time_with_offset()
         hour = self.now.hour % 12
         minute = self.now.minute
         second = self.now.second
 
-        hour_angle = math.radians((hour + minute / 60) * 30)
-        minute_angle = math.radians((minute + second / 60) * 6)
-        second_angle = math.radians(second * 6)
-
-        hour_len = radius * 0.5
-        hour_x = center + hour_len * math.sin(hour_angle)
-        hour_y = center - hour_len * math.cos(hour_angle)
-        self.analog_clock.create_line(center, center, hour_x, hour_y,
-                                     fill=self.HOUR_HAND_COLOR, width=5)
-
-        minute_len = radius * 0.7
-        minute_x = center + minute_len * math.sin(minute_angle)
-        minute_y = center - minute_len * math.cos(minute_angle)
-        self.analog_clock.create_line(center, center, minute_x, minute_y,
-                                     fill=self.HOUR_HAND_COLOR, width=3)
+        angles = {
+            "hour": math.radians((hour + minute / 60) * 30),
+            "minute": math.radians((minute + second / 60) * 6),
+            "second": math.radians(second * 6),
+        }
 
-        second_len = radius * 0.9
-        second_x = center + second_len * math.sin(second_angle)
-        second_y = center - second_len * math.cos(second_angle)
-        self.analog_clock.create_line(center, center, second_x, second_y,
-                                     fill=self.SECOND_HAND_COLOR, width=1)
+        center = self.clock_center
+        for name, angle in angles.items():
+            length = self.clock_radius * self.CLOCK_HANDS[name][0]
+            self.analog_clock.coords(self.clock_hands[name], center, center,
+                                     center + length * math.sin(angle),
+                                     center - length * math.cos(angle))
 
-        now = datetime.datetime.now()
-        digital_time = now.strftime("%I:%M %p")
-        self.clock_label.config(text=digital_time)
+        digital_time = self.now.strftime("%I:%M %p")
+        if self.clock_label.cget("text") != digital_time:
+            self.clock_label.config(text=digital_time)
 
-        self.after(1000, self.update_analog_clock)
+        # Wake on the next whole second, when the second hand moves
+        self.scheduler.schedule("analog_clock", 1000 - self.now.microsecond // 1000, self.update_analog_clock)
 
     def update_hijri_date_from_db(self):
         """Fetch and display Hijri date."""
@@ -1362,7 +1812,7 @@ class MainWindow(tk.Tk):
         date_str = date.strftime(r"%b-%d-%Y")
         self.gregorian_label.config(text=date_str)
         
-        times = core.get_prayer_times_from_db(date, self.city_var.get())
+        times = core.get_prayer_times_from_db(date, self.city_var.get(), self.country_var.get())
         if times and times.get("hijri_date"):
             hijri_date = times.get("hijri_date")
             hijri_date_parts = hijri_date.split("-")
@@ -1381,12 +1831,8 @@ class MainWindow(tk.Tk):
             messagebox.showinfo("Refreshing", f"Fetching prayer times for {city}...\nPlease wait.")
             
             # Fetch fresh data in background
-            threading.Thread(
-                target=core.ensure_future_data,
-                args=(city, country),
-                kwargs={"days": 30},
-                daemon=True
-            ).start()
+            self.worker.submit(core.ensure_future_data, city, country,
+                               days=core.PREFETCH_DAYS, key=("refresh", city, country))
             
             messagebox.showinfo("Success", f"Prayer times refresh started for {city}.")
             logger.info(f"Initiated prayer times refresh for {city}, {country}")
@@ -1456,8 +1902,9 @@ class MainWindow(tk.Tk):
                 self.show_weather = dialog.result.get("show_weather", True)
                 self.prayer_frame.show_weather = self.show_weather
                 if self.show_weather:
-                    self.prayer_frame.after(100, self.prayer_frame.update_weather_async)
+                    self.scheduler.schedule("weather", 100, self.prayer_frame.update_weather_async)
                 else:
+                    self.scheduler.cancel("weather")
                     self.weather_label.config(text="")
                 
                 core.API_METHOD = self.api_method
@@ -1467,7 +1914,7 @@ class MainWindow(tk.Tk):
                 # Update prayer frame with new settings
                 self.prayer_frame.prayer_alerts = self.prayer_alerts
                 self.prayer_frame.audio_volume = self.audio_volume
-                pygame.mixer.music.set_volume(self.audio_volume)
+                self.prayer_frame.audio.configure(self.audio_files(), self.audio_volume)
                 
                 logger.info(f"Settings updated: Country={dialog.result['country']}, "
                           f"City={dialog.result['city']}, Method={self.api_method}, "
@@ -1602,45 +2049,38 @@ class MainWindow(tk.Tk):
         """Force refresh of prayer times."""
         self.prayer_frame.update_times()
 
-    def update_clock(self):
-        """Update clock state checks."""
-        self.now = PrayerTimesFrame.now
-
-        uptime = datetime.datetime.now() - self.start_time
-        if uptime.days >= core.AUTO_RESTART_DAYS:
-            logger.info(f"App running for {uptime.days} days. Restarting...")
-            self.quit()
-            sys.exit(0)
-
-        if self.now.date() != self.last_date:
-            self.schedule_midnight_update()
-            self.last_date = self.now.date()
-
-        self.after(1000, self.update_clock)
+    def auto_restart(self):
+        """Exit after AUTO_RESTART_DAYS so the supervisor restarts the app."""
+        uptime = core.get_clock().now() - self.start_time
+        if uptime.days < core.AUTO_RESTART_DAYS:
+            remaining = datetime.timedelta(days=core.AUTO_RESTART_DAYS) - uptime
+            self.scheduler.schedule("auto_restart", int(remaining.total_seconds() * 1000), self.auto_restart)
+            return
+        logger.info(f"App running for {uptime.days} days. Restarting...")
+        core.stop_prefetch()
+        self.quit()
+        sys.exit(0)
 
     def schedule_midnight_update(self):
         """Schedule midnight update."""
-        now = datetime.datetime.now()
-        tomorrow = now + datetime.timedelta(days=1)
-        midnight = datetime.datetime.combine(tomorrow.date(), datetime.time.min)
-        ms_until_midnight = int((midnight - now).total_seconds() * 1000)
-        self.after(ms_until_midnight, self.midnight_update)
+        tomorrow = core.get_current_time_with_offset().date() + datetime.timedelta(days=1)
+        midnight = datetime.datetime.combine(tomorrow, datetime.time.min)
+        self.scheduler.schedule_at("midnight", midnight + PrayerTimesFrame.MIDNIGHT_MARGIN, self.midnight_update)
         self.update_hijri_date_from_db()
 
     def midnight_update(self):
         """Update at midnight."""
         try:
-            today = datetime.date.today()
+            today = core.get_current_time_with_offset().date()
             self.prayer_frame.date = today
             self.last_date = today
             
-            self.check_and_ensure_tomorrow_data(self.city_var.get(), 
-                                               self.country_var.get())
-            self.prayer_frame.update_times()
-            self.update_hijri_date_from_db()
-            self.prayer_frame.reset_alerts()
+            # Today's times are usually already stored; any API fetch for
+            # tomorrow runs in the background instead of blocking the UI.
+            self.ensure_tomorrow_data()
+            self.prayer_frame.reset_alerts(today)
             
             self.schedule_midnight_update()
         except Exception as e:
             logger.error(f"Midnight update failed: {e}", exc_info=True)
-            self.after(300000, self.midnight_update)
+            self.scheduler.schedule("midnight", 300000, self.midnight_update)
@@ -0,0 +1,30 @@
+import datetime
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src import core  # noqa: E402
+
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    """Point core at an empty database in tmp_path."""
+    core._db_manager.close()
+    core._day_cache.clear()
+    monkeypatch.setattr(core, "DB_PATH", str(tmp_path / "prayer_times.db"))
+    core.init_db()
+    yield core.DB_PATH
+    core._db_manager.close()
+    core._day_cache.clear()
+
+
+@pytest.fixture
+def virtual_clock():
+    """A stopped VirtualClock installed as the app clock."""
+    clock = core.VirtualClock(datetime.datetime(2026, 3, 1, 0, 30))
+    core.set_clock(clock)
+    yield clock
+    core.set_clock(None)
@@ -0,0 +1,106 @@
+import time
+
+import pytest
+
+from src import core
+
+RESET = 0.05
+
+
+class StubResponse:
+    status_code = 200
+
+    def close(self):
+        pass
+
+    def raise_for_status(self):
+        pass
+
+
+class StubSession:
+    def __init__(self):
+        self.calls = 0
+
+    def get(self, url, params=None, stream=False):
+        self.calls += 1
+        return StubResponse()
+
+
+def open_breaker(breaker):
+    for _ in range(breaker.failure_threshold):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state()["state"] == core.CircuitBreaker.OPEN
+
+
+def test_opens_after_threshold_and_refuses_calls():
+    breaker = core.CircuitBreaker(3, RESET, 1.0)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state()["state"] == core.CircuitBreaker.OPEN
+    assert not breaker.allow()
+    assert 0 < breaker.retry_in() <= RESET
+
+
+def test_success_resets_failure_count():
+    breaker = core.CircuitBreaker(2, RESET, 1.0)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state()["state"] == core.CircuitBreaker.CLOSED
+
+
+def test_half_open_lets_one_trial_through():
+    breaker = core.CircuitBreaker(1, RESET, 1.0)
+    open_breaker(breaker)
+    time.sleep(RESET)
+    assert breaker.allow()
+    assert breaker.state()["state"] == core.CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state()["state"] == core.CircuitBreaker.CLOSED
+    assert breaker.allow() and breaker.allow()
+
+
+def test_failed_trial_doubles_delay_up_to_max():
+    breaker = core.CircuitBreaker(1, RESET, 3 * RESET)
+    open_breaker(breaker)
+    for delay in (2 * RESET, 3 * RESET, 3 * RESET):
+        time.sleep(breaker.retry_in())
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state()["state"] == core.CircuitBreaker.OPEN
+        assert breaker._delay == pytest.approx(delay)
+    assert breaker.open_count == 4
+
+
+def test_released_trial_can_be_retried():
+    breaker = core.CircuitBreaker(1, RESET, 1.0)
+    open_breaker(breaker)
+    time.sleep(RESET)
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+
+
+def test_rate_limit_pause_does_not_strand_half_open_trial(monkeypatch):
+    session = StubSession()
+    monkeypatch.setattr(core, "get_http_session", lambda max_retries=None: session)
+    breaker = core.CircuitBreaker(1, RESET, 1.0)
+    limiter = core.RateLimiter(100, 10)
+    client = core.AladhanClient(limiter, breaker)
+    open_breaker(breaker)
+    time.sleep(RESET)
+
+    limiter.pause(RESET)
+    with pytest.raises(core.PrayerAPIRateLimit):
+        client._get("http://api.invalid/v1/timings", {})
+    assert session.calls == 0
+
+    time.sleep(RESET)
+    client._get("http://api.invalid/v1/timings", {})
+    assert session.calls == 1
+    assert breaker.state()["state"] == core.CircuitBreaker.CLOSED
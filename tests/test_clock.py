@@ -0,0 +1,60 @@
+import datetime
+import time
+
+import pytest
+
+from src import core
+
+START = datetime.datetime(2026, 3, 1, 23, 59, 30)
+
+
+def test_stopped_clock_only_moves_when_stepped():
+    clock = core.VirtualClock(START)
+    time.sleep(0.01)
+    assert clock.now() == START
+    assert clock.monotonic() == 0.0
+    assert clock.real_seconds(60) is None
+
+    clock.advance(45)
+    assert clock.now() == START + datetime.timedelta(seconds=45)
+    assert clock.today() == datetime.date(2026, 3, 2)
+    assert clock.timestamp() == pytest.approx((START + datetime.timedelta(seconds=45)).timestamp())
+
+    clock.advance(datetime.timedelta(minutes=1))
+    assert clock.monotonic() == 105.0
+
+
+def test_clock_never_goes_back():
+    clock = core.VirtualClock(START)
+    clock.set(START + datetime.timedelta(hours=1))
+    assert clock.monotonic() == 3600.0
+    clock.set(START)
+    clock.advance(-10)
+    assert clock.now() == START + datetime.timedelta(hours=1)
+
+
+def test_accelerated_clock():
+    clock = core.VirtualClock(START, speed=1000.0)
+    assert clock.real_seconds(60) == pytest.approx(0.06)
+    time.sleep(0.05)
+    assert clock.monotonic() >= 50.0
+
+    clock.speed = 0.0
+    stopped_at = clock.monotonic()
+    time.sleep(0.01)
+    assert clock.monotonic() == stopped_at
+    assert clock.real_seconds(1) is None
+
+
+def test_set_clock_drives_app_time():
+    clock = core.VirtualClock(START)
+    core.set_clock(clock)
+    try:
+        assert core.get_clock() is clock
+        assert core.get_current_time_with_offset() == START
+        clock.advance(60)
+        assert core.get_current_time_with_offset() == START + datetime.timedelta(minutes=1)
+    finally:
+        core.set_clock(None)
+    assert isinstance(core.get_clock(), core.SystemClock)
+    assert abs(core.get_current_time_with_offset() - datetime.datetime.now()) < datetime.timedelta(seconds=5)
@@ -0,0 +1,91 @@
+import datetime
+import threading
+
+from src import core
+
+THREADS = 8
+DAYS = 40
+START = datetime.date(2026, 1, 1)
+TIMES = {"Fajr": "05:10", "Dhuhr": "12:30", "Asr": "15:45", "Maghrib": "18:20", "Isha": "19:40"}
+
+
+def run_threads(target):
+    errors = []
+    barrier = threading.Barrier(THREADS)
+
+    def worker(index):
+        try:
+            barrier.wait()
+            target(index)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return errors
+
+
+def test_concurrent_reads_and_writes(temp_db):
+    with core._db_manager.get_cursor(write=True) as cursor:
+        cursor.execute("CREATE TABLE counter (n INTEGER)")
+        cursor.execute("INSERT INTO counter VALUES (0)")
+
+    def hammer(index):
+        city = f"City {index}"
+        for i in range(DAYS):
+            day = START + datetime.timedelta(days=i)
+            core.store_prayer_times_many([(day, "01-07-1447", city, "", TIMES)])
+
+            # Read-modify-write: loses increments unless writes are serialized
+            with core._db_manager.get_cursor(write=True) as cursor:
+                cursor.execute("SELECT n FROM counter")
+                n = cursor.fetchone()[0]
+                cursor.execute("UPDATE counter SET n = ?", (n + 1,))
+
+            assert core.get_prayer_times_from_db(day, city) is not None
+            stored = core.get_prayer_times_range_from_db(START, day, city)
+            assert len(stored) == i + 1
+            with core._db_manager.get_cursor() as cursor:
+                cursor.execute("SELECT COUNT(*) FROM prayer_times")
+                cursor.fetchone()
+
+    errors = run_threads(hammer)
+
+    # A "database is locked" OperationalError would show up here
+    assert not errors, errors
+    with core._db_manager.get_cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) FROM prayer_times")
+        assert cursor.fetchone()[0] == THREADS * DAYS
+        cursor.execute("SELECT n FROM counter")
+        assert cursor.fetchone()[0] == THREADS * DAYS
+
+
+def test_failed_write_rolls_back(temp_db):
+    def fail(index):
+        with core._db_manager.get_cursor(write=True) as cursor:
+            cursor.execute("INSERT INTO locations (city, country) VALUES (?, '')", (f"City {index}",))
+            raise RuntimeError("abort")
+
+    errors = run_threads(fail)
+
+    assert len(errors) == THREADS and all(isinstance(e, RuntimeError) for e in errors)
+    with core._db_manager.get_cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) FROM locations")
+        assert cursor.fetchone()[0] == 0
+
+
+def test_day_cache_drops_record_read_before_a_write(temp_db):
+    day = START
+    core.store_prayer_times_many([(day, "01-07-1447", "Chicago", "USA", TIMES)])
+    key = (day.isoformat(), "Chicago", "USA", core.API_METHOD, core.API_SCHOOL)
+
+    # A reader that started before this store must not cache what it read
+    generation = core._day_cache.generation()
+    stale = core.get_prayer_times_range_from_db(day, day, "Chicago", "USA")[day.isoformat()]
+    core.store_prayer_times_many([(day, "01-07-1447", "Chicago", "USA", dict(TIMES, Fajr="05:11"))])
+    core._day_cache.put(key, stale, generation)
+
+    assert core.get_prayer_times_from_db(day, "Chicago", "USA")["Fajr"] == "05:11"
@@ -0,0 +1,117 @@
+import datetime
+
+import pytest
+
+from src import core
+
+needs_numpy = pytest.mark.skipif(core.np is None, reason="NumPy is not installed")
+
+# Tromsø, Norway: midnight sun around the June solstice, polar night around December's
+TROMSO = (69.65, 18.96)
+MIDSUMMER = datetime.date(2026, 6, 21)
+MIDWINTER = datetime.date(2026, 12, 21)
+EQUINOX = datetime.date(2026, 3, 21)
+
+
+@needs_numpy
+def test_batch_masks_days_without_sunrise_or_sunset():
+    with core.np.errstate(all="raise"):
+        minutes = core.calculate_prayer_times_batch(
+            [MIDSUMMER, MIDWINTER, EQUINOX], [TROMSO[0]], [TROMSO[1]], [[2, 1, 1]])
+    for prayer in core.PRAYER_NAMES:
+        assert minutes[prayer][0].tolist()[:2] == [-1, -1]
+        assert 0 <= minutes[prayer][0][2] < 24 * 60
+    assert minutes["Fajr"][0][2] < minutes["Dhuhr"][0][2] < minutes["Isha"][0][2]
+
+
+def test_range_skips_polar_days(monkeypatch, temp_db):
+    monkeypatch.setitem(core.CITY_COORDINATES, "Norway", {"Tromso": (*TROMSO, "Europe/Oslo")})
+    records = core.compute_prayer_times_range([("Tromso", "Norway")], datetime.date(2026, 1, 1), 365)
+    days = {record[0] for record in records}
+    assert EQUINOX in days
+    assert MIDSUMMER not in days and MIDWINTER not in days
+    assert all(min(record[4].values()) >= 0 for record in records)
+
+
+@pytest.mark.parametrize("day", [MIDSUMMER, MIDWINTER])
+def test_no_local_times_without_sunrise_or_sunset(day):
+    assert core.calculate_local_prayer_times(day, *TROMSO, 2) is None
+
+
+def test_polar_latitude_outside_polar_day_and_night():
+    times = core.calculate_local_prayer_times(EQUINOX, *TROMSO, 1)
+    minutes = [core.parse_time_minutes(times[prayer]) for prayer in core.PRAYER_NAMES]
+    assert minutes == sorted(minutes)
+
+
+@needs_numpy
+def test_batch_matches_scalar_at_polar_latitude():
+    times = core.calculate_local_prayer_times(EQUINOX, *TROMSO, 1)
+    minutes = [core.parse_time_minutes(times[prayer]) for prayer in core.PRAYER_NAMES]
+    batch = core.calculate_prayer_times_batch([EQUINOX], [TROMSO[0]], [TROMSO[1]], [[1]])
+    assert minutes == [batch[prayer][0][0] for prayer in core.PRAYER_NAMES]
+
+
+def test_city_on_a_polar_day_is_not_computed(monkeypatch, temp_db):
+    monkeypatch.setitem(core.CITY_COORDINATES, "Norway", {"Tromso": (*TROMSO, "Europe/Oslo")})
+    assert core.compute_prayer_times_for_city(MIDSUMMER, "Tromso", "Norway") is None
+    assert core.compute_prayer_times_for_city(EQUINOX, "Tromso", "Norway") is not None
+
+
+class FakeRangeFetch:
+    """Stands in for fetch_prayer_times_range: stores fixed times for each day."""
+
+    TIMES = {"Fajr": "01:30", "Dhuhr": "12:45", "Asr": "17:00", "Maghrib": "23:50", "Isha": "23:59"}
+
+    def __init__(self):
+        self.ranges = []
+
+    def __call__(self, start_date, end_date, city, country="", max_retries=None):
+        self.ranges.append((start_date, end_date))
+        days = [start_date + datetime.timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+        core.store_prayer_times_many([(day, core.gregorian_to_hijri(day), city, country, self.TIMES)
+                                      for day in days])
+
+
+@pytest.fixture
+def tromso(monkeypatch, temp_db):
+    monkeypatch.setitem(core.CITY_COORDINATES, "Norway", {"Tromso": (*TROMSO, "Europe/Oslo")})
+    fetch = FakeRangeFetch()
+    monkeypatch.setattr(core, "fetch_prayer_times_range", fetch)
+    return fetch
+
+
+def test_polar_days_are_fetched_from_the_api(tromso):
+    start = datetime.date(2026, 5, 10)
+    assert core.ensure_future_data("Tromso", "Norway", days=20, start_date=start, cross_check=False)
+    assert core.find_missing_dates("Tromso", "Norway", start, 20) == []
+    fetched = {start_day + datetime.timedelta(days=i)
+               for start_day, end_day in tromso.ranges for i in range((end_day - start_day).days + 1)}
+    assert start not in fetched
+    assert datetime.date(2026, 5, 29) in fetched
+    assert core.get_prayer_times_from_db(datetime.date(2026, 5, 29), "Tromso", "Norway")["Fajr"] == "01:30"
+
+
+def test_prefetch_many_falls_back_for_polar_days(tromso):
+    start = datetime.date(2026, 5, 10)
+    results = core.ensure_future_data_many([("Tromso", "Norway"), ("Chicago", "USA")], days=20, start_date=start)
+    assert results == {("Tromso", "Norway"): True, ("Chicago", "USA"): True}
+    assert tromso.ranges
+    assert core.find_missing_dates("Tromso", "Norway", start, 20) == []
+
+
+def test_computed_days_follow_the_api_hijri_calendar(temp_db):
+    day = datetime.date(2026, 3, 1)
+    tabular = core.gregorian_to_hijri(day)
+    api_hijri = core.gregorian_to_hijri(day, -1)  # The API is a day behind the tabular calendar
+    assert api_hijri != tabular
+    core.store_prayer_times_many([(day, tabular, "Chicago", "USA", FakeRangeFetch.TIMES)])
+    assert core.get_prayer_times_from_db(day, "Chicago", "USA")["hijri_date"] == tabular
+
+    core.store_prayer_times_many([(day, api_hijri, "Mecca", "Saudi Arabia", FakeRangeFetch.TIMES)], api_hijri=True)
+    assert core.get_prayer_times_from_db(day, "Chicago", "USA")["hijri_date"] == api_hijri
+
+    later = [day + datetime.timedelta(days=i) for i in range(40)]
+    assert core.hijri_dates_for(later) == [core.gregorian_to_hijri(d, -1) for d in later]
+    records = core.compute_prayer_times_range([("Chicago", "USA")], day, 40)
+    assert [r[1] for r in records] == [core.gregorian_to_hijri(d, -1) for d in later]
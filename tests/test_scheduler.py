@@ -0,0 +1,164 @@
+import datetime
+import time
+
+from src import core
+from src import gui
+
+DAYS = 6
+
+
+class StubWidget:
+    """Stands in for Tk widgets: accepts config() and after() calls."""
+
+    def __init__(self):
+        self.timers = {}
+        self._ids = 0
+
+    def config(self, **kwargs):
+        pass
+
+    def after(self, ms, callback):
+        self._ids += 1
+        self.timers[self._ids] = (ms, callback)
+        return self._ids
+
+    def after_cancel(self, after_id):
+        self.timers.pop(after_id, None)
+
+
+class StubAudio:
+    def __init__(self):
+        self.played = []
+
+    def play(self, names, label=None):
+        self.played.append(label)
+
+
+class HeadlessPrayerFrame(gui.PrayerTimesFrame):
+    """PrayerTimesFrame's alert, countdown and midnight loops on stub widgets."""
+
+    def __init__(self, scheduler, location):
+        self.scheduler = scheduler
+        self.location = location
+        self.date = core.get_current_time_with_offset().date()
+        self.prayer_alerts = {prayer: True for prayer in self.PRAYERS}
+        self.audio = StubAudio()
+        self.labels = {prayer: StubWidget() for prayer in self.PRAYERS}
+        self.prayer_frames = self.labels
+        self.next_prayer_label = StubWidget()
+        self.alerted_prayers = set()
+        self.alerts_day = self.date
+        self.last_alert_check = None
+        self.current_times = {}
+        self.schedule = None
+        self.tomorrow_schedule = None
+        self.update_times()
+        self.check_prayer_alerts()
+        self.schedule_midnight_reset()
+
+
+def run_until(scheduler, clock, end):
+    """Step the clock from job to job until end; returns the number of dispatches."""
+    dispatches = 0
+    while clock.now() < end:
+        due = scheduler.next_due()
+        assert due is not None, "scheduler ran dry"
+        clock.advance(max(0.0, due - clock.monotonic()))
+        scheduler.run_due()
+        dispatches += 1
+    return dispatches
+
+
+def test_stopped_clock_arms_no_timers(virtual_clock):
+    widget = StubWidget()
+    scheduler = gui.TkScheduler(widget)
+    ran = []
+    scheduler.schedule("later", 5000, lambda: ran.append("later"))
+    scheduler.schedule("sooner", 1000, lambda: ran.append("sooner"))
+
+    assert widget.timers == {}
+    assert virtual_clock.monotonic() + 1 == scheduler.next_due()
+    run_until(scheduler, virtual_clock, virtual_clock.now() + datetime.timedelta(seconds=5))
+    assert ran == ["sooner", "later"]
+    assert scheduler.next_due() is None
+
+
+def test_pending_callbacks_stay_constant_across_midnights(temp_db, virtual_clock):
+    scheduler = gui.TkScheduler(StubWidget())
+    frame = HeadlessPrayerFrame(scheduler, {"city": "Chicago", "country": "USA"})
+
+    # MainWindow.midnight_update also rolls the frame over every midnight
+    def midnight_update():
+        frame.reset_alerts(core.get_current_time_with_offset().date())
+        schedule_midnight_update()
+
+    def schedule_midnight_update():
+        tomorrow = core.get_current_time_with_offset().date() + datetime.timedelta(days=1)
+        midnight = datetime.datetime.combine(tomorrow, datetime.time.min)
+        scheduler.schedule_at("midnight", midnight, midnight_update)
+
+    schedule_midnight_update()
+    jobs = scheduler.pending()
+    assert jobs == ["alerts", "countdown", "midnight", "midnight_reset"]
+
+    start = virtual_clock.now()
+    heap_sizes = []
+    for day in range(1, DAYS + 1):
+        run_until(scheduler, virtual_clock, start + datetime.timedelta(days=day))
+        assert scheduler.pending() == jobs
+        heap_sizes.append(len(scheduler._heap))
+
+    assert max(heap_sizes[DAYS // 2:]) <= max(heap_sizes[:DAYS // 2])
+    assert frame.alerts_day == virtual_clock.today()
+    # 0:30 on day one is past no prayer, so every prayer alerts exactly once a day
+    assert len(frame.audio.played) == DAYS * len(frame.PRAYERS)
+
+
+def prayer_time(day, prayer, location):
+    times = core.calculate_prayer_times(day, location, allow_network=False)
+    return datetime.datetime.combine(day, datetime.time.fromisoformat(times[prayer]))
+
+
+def test_prayer_passed_before_startup_is_not_alerted_late(temp_db, virtual_clock):
+    location = {"city": "Chicago", "country": "USA"}
+    fajr = prayer_time(virtual_clock.today(), "Fajr", location)
+    virtual_clock.set(fajr + datetime.timedelta(seconds=60))
+    scheduler = gui.TkScheduler(StubWidget())
+    frame = HeadlessPrayerFrame(scheduler, location)
+
+    run_until(scheduler, virtual_clock, fajr + datetime.timedelta(minutes=10))
+    assert frame.audio.played == []
+
+
+def test_alert_missed_while_running_fires_late(temp_db, virtual_clock):
+    location = {"city": "Chicago", "country": "USA"}
+    fajr = prayer_time(virtual_clock.today(), "Fajr", location)
+    scheduler = gui.TkScheduler(StubWidget())
+    frame = HeadlessPrayerFrame(scheduler, location)
+
+    # The alerts job is late (e.g. the machine slept) and runs after Fajr
+    virtual_clock.set(fajr + datetime.timedelta(seconds=60))
+    scheduler.run_due()
+    assert frame.audio.played == ["Fajr"]
+
+
+def test_worker_results_arrive_at_fixed_clock_time(virtual_clock):
+    scheduler = gui.TkScheduler(StubWidget())
+    worker = gui.BackgroundWorker(scheduler)
+    start = virtual_clock.monotonic()
+    delivered = []
+
+    def slow_job(value):
+        time.sleep(0.2)
+        return value
+
+    worker.submit(slow_job, 1, key="slow", on_success=lambda v: delivered.append((v, virtual_clock.monotonic())))
+    assert worker.is_busy("slow")
+    while scheduler.next_due() is not None:
+        virtual_clock.advance(scheduler.next_due() - virtual_clock.monotonic())
+        scheduler.run_due()
+
+    # The first poll waited out the job's 0.2 s of real time
+    assert delivered == [(1, start + gui.BackgroundWorker.POLL_MS / 1000)]
+    assert not worker.is_busy("slow")
+    assert scheduler.pending() == []